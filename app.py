@@ -1,9 +1,21 @@
 from flask import Flask, render_template
+from flask.json.provider import DefaultJSONProvider
 from config.config import config
 from routes.api_routes import api_bp
+from services.lead_result import LeadResult
 import os
 
 
+class AppJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes lead results in their compact form"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, LeadResult):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
 def create_app(config_name=None):
     """Application factory pattern for creating Flask app"""
     if config_name is None:
@@ -11,6 +23,7 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = AppJSONProvider(app)
     
     # Configure JSON to not escape Unicode characters (for proper emoji display)
     # Note: Flask 3.x JSON configuration - commented out due to type checker issues
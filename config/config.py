@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -96,6 +97,36 @@ class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
     OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_TOKENS', '1000'))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))  # Retries for rate limit/connection/server errors
+    OPENAI_RETRY_BACKOFF_SECONDS = float(os.getenv('OPENAI_RETRY_BACKOFF_SECONDS', '0.5'))  # Base delay, doubled per retry
+    
+    # Model Routing Configuration
+    MODEL_ROUTING_ENABLED = os.getenv('MODEL_ROUTING_ENABLED', 'True').lower() == 'true'
+    OPENAI_MODEL_FAST = os.getenv('OPENAI_MODEL_FAST', OPENAI_MODEL)  # Model tried first for simple leads (defaults to OPENAI_MODEL)
+    OPENAI_MODEL_STRONG = os.getenv('OPENAI_MODEL_STRONG', OPENAI_MODEL)  # Stronger model for hard leads and escalations (defaults to OPENAI_MODEL, i.e. no routing)
+    OPENAI_FAST_CONCURRENCY = int(os.getenv('OPENAI_FAST_CONCURRENCY', '8'))  # Max concurrent fast-tier calls
+    OPENAI_STRONG_CONCURRENCY = int(os.getenv('OPENAI_STRONG_CONCURRENCY', '4'))  # Max concurrent strong-tier calls
+    ROUTING_COMPLETENESS_GAP = int(os.getenv('ROUTING_COMPLETENESS_GAP', '40'))  # Acquisition/enrichment gap that routes straight to strong
+    ROUTING_ESCALATION_EDGES = [int(edge) for edge in os.getenv('ROUTING_ESCALATION_EDGES', '60,80').split(',') if edge.strip()]  # Rubric band edges where fast-tier scores are ambiguous
+    ROUTING_ESCALATION_MARGIN = int(os.getenv('ROUTING_ESCALATION_MARGIN', '2'))  # Fast-tier scores within this many points of an edge are escalated
+    
+    # Timeouts, Hedging and Deadlines
+    OPENAI_CALL_TIMEOUT_SECONDS = float(os.getenv('OPENAI_CALL_TIMEOUT_SECONDS', '30'))  # Per-call timeout (not retried)
+    OPENAI_HEDGING_ENABLED = os.getenv('OPENAI_HEDGING_ENABLED', 'False').lower() == 'true'  # Send a duplicate request for slow calls
+    OPENAI_HEDGE_DELAY_SECONDS = float(os.getenv('OPENAI_HEDGE_DELAY_SECONDS', '10'))  # Hedge delay until enough latency samples exist for p95
+    OPENAI_HEDGE_MIN_SAMPLES = int(os.getenv('OPENAI_HEDGE_MIN_SAMPLES', '20'))  # Latency samples needed before hedging at observed p95
+    OPENAI_HEDGE_MAX_WORKERS = int(os.getenv('OPENAI_HEDGE_MAX_WORKERS', '16'))  # Worker threads for hedged duplicate calls (no hedge is sent while all are busy)
+    AI_JOB_DEADLINE_SECONDS = float(os.getenv('AI_JOB_DEADLINE_SECONDS', '0'))  # Overall AI time budget per batch job (0 = no deadline)
+    
+    # Export Configuration
+    EXPORT_DIR = os.getenv('EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'zi_enrichment_exports'))  # Where export files are spooled
+    EXPORT_RETENTION_SECONDS = int(os.getenv('EXPORT_RETENTION_SECONDS', '3600'))  # How long export files are kept for download
+    
+    # Upload Cache Configuration
+    UPLOAD_DIR = os.getenv('UPLOAD_DIR', os.path.join(tempfile.gettempdir(), 'zi_enrichment_uploads'))  # Where uploaded workbooks and parsed sheets are cached
+    UPLOAD_CACHE_MAX_ENTRIES = int(os.getenv('UPLOAD_CACHE_MAX_ENTRIES', '20'))  # Uploads kept before least recently used ones are evicted
+    UPLOAD_RETENTION_SECONDS = int(os.getenv('UPLOAD_RETENTION_SECONDS', '7200'))  # How long an unused upload stays available
+    UPLOAD_READ_CHUNK_ROWS = int(os.getenv('UPLOAD_READ_CHUNK_ROWS', '50000'))  # Rows per chunk when streaming uploads (CSV reads, Excel exports)
     
     # Batch Processing Configuration
     BATCH_SIZE_SALESFORCE = int(os.getenv('BATCH_SIZE_SALESFORCE', '150'))  # Conservative default for Salesforce queries
@@ -105,6 +136,10 @@ class Config:
     BATCH_DELAY_MS = int(os.getenv('BATCH_DELAY_MS', '50'))  # Delay between batches in milliseconds
     AI_BATCH_DELAY_MS = int(os.getenv('AI_BATCH_DELAY_MS', '100'))  # Delay between AI batches in milliseconds
     
+    # Rule-based Pre-screen Configuration
+    PRESCREEN_ENABLED = os.getenv('PRESCREEN_ENABLED', 'True').lower() == 'true'  # Settle trivially decidable leads without the LLM
+    PRESCREEN_CONFIDENCE_THRESHOLD = float(os.getenv('PRESCREEN_CONFIDENCE_THRESHOLD', '0.9'))  # Minimum rule confidence to skip the LLM
+    
     @staticmethod
     def validate_salesforce_config():
         """Validate that all required Salesforce credentials are present"""
@@ -1,7 +1,9 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, jsonify, request, send_file, url_for
 from services.salesforce_service import SalesforceService
 from services.openai_service import test_openai_connection, test_openai_completion, get_openai_config, generate_lead_confidence_assessment
 from services.excel_service import ExcelService
+from services import file_formats
+from services.ai_metrics import global_ai_metrics
 from config.config import Config
 
 # Create blueprint for API routes
@@ -11,6 +13,65 @@ api_bp = Blueprint('api', __name__)
 sf_service = SalesforceService()
 excel_service = ExcelService()
 
+def send_export_file(file_path, filename):
+    """Serve a spooled export file from disk; X-Export-Url allows resumable (range) re-downloads via GET"""
+    response = send_file(
+        file_path,
+        as_attachment=True,
+        download_name=filename,
+        mimetype=file_formats.mimetype_for(filename),
+        conditional=True
+    )
+    export_name = excel_service.export_store.export_name(file_path)
+    response.headers['X-Export-Url'] = url_for('api.download_export', export_name=export_name)
+    return response
+
+def get_excel_upload():
+    """
+    Resolve the workbook for an Excel step: either an upload_id returned by /excel/parse
+    or a file upload (stored in the upload cache so later steps can reuse it).
+    
+    Returns:
+        upload_id, filename, error_response (error_response is None on success)
+    """
+    upload_id = request.form.get('upload_id')
+    if upload_id:
+        upload = excel_service.upload_store.get_upload(upload_id)
+        if not upload:
+            return None, None, (jsonify({
+                'status': 'error',
+                'message': 'Upload not found or expired. Please upload the Excel file again.'
+            }), 404)
+        return upload_id, upload['filename'], None
+    
+    # Check if file is present
+    if 'file' not in request.files:
+        return None, None, (jsonify({
+            'status': 'error',
+            'message': 'No file uploaded'
+        }), 400)
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, None, (jsonify({
+            'status': 'error',
+            'message': 'No file selected'
+        }), 400)
+    
+    upload_id = excel_service.upload_store.save_upload(file.stream, file.filename)
+    return upload_id, file.filename, None
+
+def get_output_format(value):
+    """Validate a requested export format (defaults to xlsx); returns (output_format, error_response)"""
+    output_format = (value or file_formats.FORMAT_XLSX).lower()
+    if output_format not in file_formats.OUTPUT_FORMATS:
+        return None, (jsonify({
+            'status': 'error',
+            'message': f"output_format must be one of: {', '.join(file_formats.OUTPUT_FORMATS)}"
+        }), 400)
+    return output_format, None
+
 @api_bp.route('/')
 def index():
     """API root endpoint"""
@@ -30,7 +91,8 @@ def index():
             "analyze_query": "/leads/analyze-query",
             "lead_confidence": "/lead/<lead_id>/confidence",
             "excel_analyze": "/excel/analyze",
-            "excel_analyze_batch": "/excel/analyze-batch-optimized"
+            "excel_analyze_batch": "/excel/analyze-batch-optimized",
+            "ai_metrics": "/metrics/ai"
         }
     })
 
@@ -58,6 +120,9 @@ def debug_config():
                 "api_key_length": len(Config.OPENAI_API_KEY) if Config.OPENAI_API_KEY else 0,
                 "api_key_starts_with_sk": Config.OPENAI_API_KEY.startswith('sk-') if Config.OPENAI_API_KEY else False,
                 "model": Config.OPENAI_MODEL,
+                "model_fast": Config.OPENAI_MODEL_FAST,
+                "model_strong": Config.OPENAI_MODEL_STRONG,
+                "model_routing_enabled": Config.MODEL_ROUTING_ENABLED,
                 "max_tokens": Config.OPENAI_MAX_TOKENS
             }
         })
@@ -67,6 +132,42 @@ def debug_config():
             "message": f"Configuration error: {str(e)}"
         }), 500
 
+@api_bp.route('/metrics/ai', methods=['GET', 'DELETE'])
+def ai_metrics():
+    """OpenAI token usage, estimated cost, latency and retry metrics since startup (DELETE resets them)"""
+    try:
+        if request.method == 'DELETE':
+            global_ai_metrics.reset()
+        
+        return jsonify({
+            "status": "success",
+            "model": Config.OPENAI_MODEL,
+            "metrics": global_ai_metrics.to_dict()
+        })
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Unexpected error: {str(e)}"
+        }), 500
+
+@api_bp.route('/exports/<export_name>')
+def download_export(export_name):
+    """Download a previously generated export (supports range and conditional requests)"""
+    file_path = excel_service.export_store.resolve(export_name)
+    if not file_path:
+        return jsonify({
+            "status": "error",
+            "message": "Export not found or expired"
+        }), 404
+    
+    return send_file(
+        file_path,
+        as_attachment=True,
+        download_name=excel_service.export_store.download_name(export_name),
+        mimetype=file_formats.mimetype_for(export_name),
+        conditional=True
+    )
+
 @api_bp.route('/test-salesforce-connection')
 def test_salesforce_connection():
     """Test endpoint to verify Salesforce connection"""
@@ -235,6 +336,7 @@ def get_lead_confidence_assessment(lead_id):
             "confidence_assessment": assessment,  # AI coherence assessment
             "acquisition_completeness_score": lead_data.get('acquisition_completeness_score', 0),
             "enrichment_completeness_score": lead_data.get('enrichment_completeness_score', 0),
+            "coherence_score": lead_data.get('coherence_score', 0),
             "joseph_scoring_details": lead_data.get('joseph_scoring_details', {}),
             "processing_info": {
                 "salesforce_message": sf_message,
@@ -398,19 +500,14 @@ def export_analysis_data():
         
         # Generate Excel file using the provided analysis data
         try:
-            file_buffer, filename = excel_service.create_lead_analysis_excel(
+            file_path, filename = excel_service.create_lead_analysis_excel(
                 analysis_data=analysis_data['leads'],
                 summary_data=analysis_data['summary'],
                 query_info=analysis_data.get('query_info'),
                 filename_prefix="lead_query_analysis"
             )
             
-            return send_file(
-                file_buffer,
-                as_attachment=True,
-                download_name=filename,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            return send_export_file(file_path, filename)
             
         except Exception as excel_error:
             return jsonify({
@@ -473,17 +570,12 @@ def export_single_lead_data():
         # Generate Excel file using the provided single lead data
         try:
             lead_id = lead_info.get('Id', 'unknown')
-            file_buffer, filename = excel_service.create_single_lead_excel(
+            file_path, filename = excel_service.create_single_lead_excel(
                 lead_data=merged_lead_data,
                 filename_prefix=f"lead_confidence_{lead_id}"
             )
             
-            return send_file(
-                file_buffer,
-                as_attachment=True,
-                download_name=filename,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            return send_export_file(file_path, filename)
             
         except Exception as excel_error:
             return jsonify({
@@ -547,19 +639,14 @@ def export_analyze_query_excel():
         
         # Generate Excel file
         try:
-            file_buffer, filename = excel_service.create_lead_analysis_excel(
+            file_path, filename = excel_service.create_lead_analysis_excel(
                 analysis_data=result['leads'],
                 summary_data=result['summary'],
                 query_info=result['query_info'],
                 filename_prefix="lead_query_analysis"
             )
             
-            return send_file(
-                file_buffer,
-                as_attachment=True,
-                download_name=filename,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            return send_export_file(file_path, filename)
             
         except Exception as excel_error:
             return jsonify({
@@ -601,17 +688,12 @@ def export_lead_confidence_excel(lead_id):
         
         # Generate Excel file
         try:
-            file_buffer, filename = excel_service.create_single_lead_excel(
+            file_path, filename = excel_service.create_single_lead_excel(
                 lead_data=lead_data,
                 filename_prefix=f"lead_confidence_{lead_id}"
             )
             
-            return send_file(
-                file_buffer,
-                as_attachment=True,
-                download_name=filename,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            return send_export_file(file_path, filename)
             
         except Exception as excel_error:
             return jsonify({
@@ -645,30 +727,34 @@ def parse_excel_file():
             }), 400
         
         # Validate file extension
-        if not file.filename.lower().endswith(('.xlsx', '.xls')):
+        if not file_formats.detect_format(file.filename):
             return jsonify({
                 'status': 'error',
-                'message': 'File must be an Excel file (.xlsx or .xls)'
+                'message': 'File must be an Excel, CSV or Parquet file (.xlsx, .xls, .csv or .parquet)'
             }), 400
         
-        # Read file content
-        file_content = file.read()
+        # Cache the file so the validate/analyze/export steps can use upload_id instead of re-uploading
+        upload_id = excel_service.upload_store.save_upload(file.stream, file.filename)
         
-        # Parse the Excel file
-        result = excel_service.parse_excel_file(file_content)
+        # Parse the uploaded file
+        result = excel_service.parse_upload(upload_id)
         
         if result['success']:
             return jsonify({
                 'status': 'success',
                 'message': 'Excel file parsed successfully',
                 'data': {
+                    'upload_id': upload_id,
+                    'file_format': result['file_format'],
                     'sheet_names': result['sheet_names'],
                     'headers': result['headers'],
                     'preview_data': result['preview_data'],
-                    'total_rows': result['total_rows']
+                    'total_rows': result['total_rows'],
+                    'sheets': result['sheets']
                 }
             })
         else:
+            excel_service.upload_store.delete_upload(upload_id)
             return jsonify({
                 'status': 'error',
                 'message': result['error']
@@ -684,20 +770,9 @@ def parse_excel_file():
 def validate_excel_lead_ids():
     """Validate Lead IDs from Excel file upload"""
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({
-                'status': 'error',
-                'message': 'No file uploaded'
-            }), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({
-                'status': 'error',
-                'message': 'No file selected'
-            }), 400
+        upload_id, filename, error_response = get_excel_upload()
+        if error_response:
+            return error_response
         
         # Get form data
         sheet_name = request.form.get('sheet_name')
@@ -716,12 +791,9 @@ def validate_excel_lead_ids():
                 'message': 'Lead ID column is required'
             }), 400
         
-        # Read file content
-        file_content = file.read()
-        
-        # Extract Lead IDs from Excel
-        extraction_result = excel_service.extract_lead_ids_from_excel(
-            file_content, sheet_name, lead_id_column
+        # Extract Lead IDs from the cached upload
+        extraction_result = excel_service.extract_lead_ids_from_upload(
+            upload_id, sheet_name, lead_id_column
         )
         
         if not extraction_result['success']:
@@ -782,6 +854,7 @@ def validate_excel_lead_ids():
                 'invalid_lead_ids': len(invalid_lead_ids),
                 'invalid_lead_ids_list': invalid_lead_ids,
                 'original_data_rows': extraction_result['total_rows'],
+                'upload_id': upload_id,
                 'validation_summary': {
                     'can_proceed': len(valid_lead_ids) > 0,
                     'all_valid': len(invalid_lead_ids) == 0,
@@ -800,20 +873,9 @@ def validate_excel_lead_ids():
 def analyze_excel_leads():
     """Analyze leads from Excel file upload"""
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({
-                'status': 'error',
-                'message': 'No file uploaded'
-            }), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({
-                'status': 'error',
-                'message': 'No file selected'
-            }), 400
+        upload_id, filename, error_response = get_excel_upload()
+        if error_response:
+            return error_response
         
         # Get form data
         sheet_name = request.form.get('sheet_name')
@@ -834,12 +896,9 @@ def analyze_excel_leads():
                 'message': 'Lead ID column is required'
             }), 400
         
-        # Read file content
-        file_content = file.read()
-        
-        # Extract Lead IDs from Excel
-        extraction_result = excel_service.extract_lead_ids_from_excel(
-            file_content, sheet_name, lead_id_column
+        # Extract Lead IDs from the cached upload
+        extraction_result = excel_service.extract_lead_ids_from_upload(
+            upload_id, sheet_name, lead_id_column
         )
         
         if not extraction_result['success']:
@@ -904,7 +963,8 @@ def analyze_excel_leads():
         result['excel_metadata'] = {
             'lead_id_column': lead_id_column,
             'sheet_name': sheet_name,
-            'filename': file.filename,
+            'filename': filename,
+            'upload_id': upload_id,
             'has_original_data': True,  # Flag that original data is available for export
             'validation_summary': {
                 'total_lead_ids': len(lead_ids),
@@ -958,6 +1018,9 @@ def export_excel_analysis():
         original_data = data['original_data']
         lead_id_column = data['lead_id_column']
         filename_prefix = data.get('filename_prefix', 'excel_analysis')
+        output_format, error_response = get_output_format(data.get('output_format'))
+        if error_response:
+            return error_response
         
         # Validate data types
         if not isinstance(analysis_results, list):
@@ -975,9 +1038,9 @@ def export_excel_analysis():
         # Get invalid Lead IDs from the request if available
         invalid_lead_ids = data.get('invalid_lead_ids', [])
         
-        # Generate Excel file with combined data
-        result = excel_service.create_excel_with_analysis(
-            original_data, analysis_results, lead_id_column, filename_prefix, invalid_lead_ids
+        # Generate export file with combined data
+        result = excel_service.create_file_with_analysis(
+            original_data, analysis_results, lead_id_column, filename_prefix, invalid_lead_ids, output_format
         )
         
         if not result['success']:
@@ -986,12 +1049,7 @@ def export_excel_analysis():
                 'message': result['error']
             }), 500
         
-        return send_file(
-            result['file_buffer'],
-            as_attachment=True,
-            download_name=result['filename'],
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        return send_export_file(result['file_path'], result['filename'])
         
     except Exception as e:
         return jsonify({
@@ -1001,22 +1059,11 @@ def export_excel_analysis():
 
 @api_bp.route('/excel/export-analysis-with-file', methods=['POST'])
 def export_excel_analysis_with_file():
-    """Export Excel analysis results by re-extracting original data from file"""
+    """Export Excel analysis results by re-extracting original data from the uploaded file (upload_id or file)"""
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({
-                'status': 'error',
-                'message': 'No file uploaded'
-            }), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({
-                'status': 'error',
-                'message': 'No file selected'
-            }), 400
+        upload_id, filename, error_response = get_excel_upload()
+        if error_response:
+            return error_response
         
         # Get form data
         sheet_name = request.form.get('sheet_name')
@@ -1029,33 +1076,27 @@ def export_excel_analysis_with_file():
                 'message': 'Missing required parameters'
             }), 400
         
+        output_format, error_response = get_output_format(request.form.get('output_format'))
+        if error_response:
+            return error_response
+        
         # Parse analysis results
         import json
         analysis_results = json.loads(analysis_results_json)
         
-        # Read file content and extract original data fresh
-        file_content = file.read()
-        extraction_result = excel_service.extract_lead_ids_from_excel(
-            file_content, sheet_name, lead_id_column
-        )
-        
-        if not extraction_result['success']:
-            return jsonify({
-                'status': 'error',
-                'message': extraction_result['error']
-            }), 400
-        
         # Get invalid Lead IDs from the request if available
         invalid_lead_ids_json = request.form.get('invalid_lead_ids', '[]')
         invalid_lead_ids = json.loads(invalid_lead_ids_json)
         
-        # Generate Excel file with combined data
-        result = excel_service.create_excel_with_analysis(
-            extraction_result['original_data'], 
-            analysis_results, 
-            lead_id_column, 
+        # Stream the original sheet from the cached upload in chunks (memory does not grow with row count)
+        result = excel_service.create_file_with_analysis_from_upload(
+            upload_id,
+            sheet_name,
+            lead_id_column,
+            analysis_results,
             'excel_analysis',
-            invalid_lead_ids
+            invalid_lead_ids,
+            output_format
         )
         
         if not result['success']:
@@ -1064,12 +1105,7 @@ def export_excel_analysis_with_file():
                 'message': result['error']
             }), 500
         
-        return send_file(
-            result['file_buffer'],
-            as_attachment=True,
-            download_name=result['filename'],
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        return send_export_file(result['file_path'], result['filename'])
         
     except Exception as e:
         return jsonify({
@@ -1138,26 +1174,16 @@ def test_lead_validation():
 def analyze_excel_leads_batch_optimized():
     """Analyze leads from Excel file upload using optimized batch processing for large datasets (50k+ leads)"""
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({
-                'status': 'error',
-                'message': 'No file uploaded'
-            }), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({
-                'status': 'error',
-                'message': 'No file selected'
-            }), 400
+        upload_id, filename, error_response = get_excel_upload()
+        if error_response:
+            return error_response
         
         # Get form data
         sheet_name = request.form.get('sheet_name')
         lead_id_column = request.form.get('lead_id_column')
         batch_size = int(request.form.get('batch_size', 200))  # Salesforce batch size
         ai_batch_size = int(request.form.get('ai_batch_size', 50))  # AI processing batch size
+        deadline_seconds = request.form.get('deadline_seconds', type=float)  # Optional AI time budget for the job
         include_ai_assessment = True  # Always include AI assessment
         
         # Validate parameters
@@ -1186,12 +1212,15 @@ def analyze_excel_leads_batch_optimized():
                 'message': 'ai_batch_size must be between 10 and 100'
             }), 400
         
-        # Read file content
-        file_content = file.read()
+        if deadline_seconds is not None and deadline_seconds < 0:
+            return jsonify({
+                'status': 'error',
+                'message': 'deadline_seconds must be 0 (no deadline) or greater'
+            }), 400
         
-        # Extract Lead IDs from Excel
-        extraction_result = excel_service.extract_lead_ids_from_excel(
-            file_content, sheet_name, lead_id_column
+        # Extract Lead IDs from the cached upload
+        extraction_result = excel_service.extract_lead_ids_from_upload(
+            upload_id, sheet_name, lead_id_column
         )
         
         if not extraction_result['success']:
@@ -1252,7 +1281,8 @@ def analyze_excel_leads_batch_optimized():
             include_ai_assessment=include_ai_assessment,
             batch_size=batch_size,
             ai_batch_size=ai_batch_size,
-            progress_callback=progress_callback
+            progress_callback=progress_callback,
+            deadline_seconds=deadline_seconds
         )
         
         if result is None:
@@ -1265,7 +1295,8 @@ def analyze_excel_leads_batch_optimized():
         result['excel_metadata'] = {
             'lead_id_column': lead_id_column,
             'sheet_name': sheet_name,
-            'filename': file.filename,
+            'filename': filename,
+            'upload_id': upload_id,
             'has_original_data': True,
             'batch_processing_config': {
                 'salesforce_batch_size': batch_size,
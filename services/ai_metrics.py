@@ -0,0 +1,170 @@
+import threading
+from collections import deque
+
+# Token accounting and latency telemetry for OpenAI calls.
+# A process-wide tracker backs the /metrics/ai endpoint, and each analysis run
+# gets its own AIUsageMetrics so results can report per-run cost and latency.
+
+# Estimated USD price per 1M tokens (input, output), matched by model-name prefix
+MODEL_PRICING_PER_1M_TOKENS = {
+    'gpt-3.5-turbo': (0.50, 1.50),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4.1-nano': (0.10, 0.40),
+    'gpt-4.1-mini': (0.40, 1.60),
+    'gpt-4.1': (2.00, 8.00),
+    'gpt-4-turbo': (10.00, 30.00),
+    'gpt-4': (30.00, 60.00),
+}
+
+# Number of recent call latencies kept for percentile calculations
+LATENCY_SAMPLE_SIZE = 1000
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Estimate the USD cost of a call, or None when the model has no known pricing"""
+    if not model:
+        return None
+    # Longest matching prefix wins (e.g. gpt-4o-mini before gpt-4o before gpt-4)
+    matches = [prefix for prefix in MODEL_PRICING_PER_1M_TOKENS if model.startswith(prefix)]
+    if not matches:
+        return None
+    input_price, output_price = MODEL_PRICING_PER_1M_TOKENS[max(matches, key=len)]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def _percentile(sorted_values, percentile):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(percentile / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class AIUsageMetrics:
+    """
+    Thread-safe aggregate of OpenAI call telemetry (tokens, latency, model, retries).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all recorded calls"""
+        with self._lock:
+            self.calls = 0
+            self.successful_calls = 0
+            self.failed_calls = 0
+            self.retries = 0
+            self.escalations = 0
+            self.hedged_requests = 0
+            self.timeouts = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.estimated_cost_usd = 0.0
+            self.unpriced_calls = 0
+            self.total_latency = 0.0
+            self.max_latency = 0.0
+            self.latencies = deque(maxlen=LATENCY_SAMPLE_SIZE)
+            self.models = {}
+
+    def record_call(self, model, prompt_tokens=0, completion_tokens=0, latency=0.0, retries=0, success=True, timed_out=False):
+        """
+        Record a single OpenAI call.
+
+        Args:
+            model: Model name reported by the API (or requested model on failure)
+            prompt_tokens: Prompt tokens from completion.usage
+            completion_tokens: Completion tokens from completion.usage
+            latency: Wall-clock seconds for the call, including retries
+            retries: Number of retried attempts before the final result
+            success: Whether the call returned a completion
+            timed_out: Whether the call failed on its per-call timeout
+        """
+        prompt_tokens = prompt_tokens or 0
+        completion_tokens = completion_tokens or 0
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+
+        with self._lock:
+            self.calls += 1
+            if success:
+                self.successful_calls += 1
+            else:
+                self.failed_calls += 1
+            if timed_out:
+                self.timeouts += 1
+            self.retries += retries
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            if cost is None:
+                if success:
+                    self.unpriced_calls += 1
+            else:
+                self.estimated_cost_usd += cost
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self.latencies.append(latency)
+
+            model_stats = self.models.setdefault(model or 'unknown', {
+                'calls': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'estimated_cost_usd': 0.0
+            })
+            model_stats['calls'] += 1
+            model_stats['prompt_tokens'] += prompt_tokens
+            model_stats['completion_tokens'] += completion_tokens
+            if cost is not None:
+                model_stats['estimated_cost_usd'] += cost
+
+    def record_escalation(self):
+        """Record a lead re-assessed on the strong model after a fast-tier response"""
+        with self._lock:
+            self.escalations += 1
+
+    def record_hedge(self):
+        """Record a duplicate request sent because the primary call was slower than p95"""
+        with self._lock:
+            self.hedged_requests += 1
+
+    def latency_percentile(self, percentile, min_samples=1):
+        """Latency percentile over recent calls, or None until min_samples calls are recorded"""
+        with self._lock:
+            if len(self.latencies) < max(1, min_samples):
+                return None
+            return _percentile(sorted(self.latencies), percentile)
+
+    def to_dict(self):
+        """Return a JSON-serializable snapshot of the aggregated metrics"""
+        with self._lock:
+            sorted_latencies = sorted(self.latencies)
+            total_tokens = self.prompt_tokens + self.completion_tokens
+            return {
+                'calls': self.calls,
+                'successful_calls': self.successful_calls,
+                'failed_calls': self.failed_calls,
+                'retries': self.retries,
+                'escalations': self.escalations,
+                'hedged_requests': self.hedged_requests,
+                'timeouts': self.timeouts,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'total_tokens': total_tokens,
+                'avg_prompt_tokens': round(self.prompt_tokens / self.successful_calls, 1) if self.successful_calls else 0,
+                'avg_completion_tokens': round(self.completion_tokens / self.successful_calls, 1) if self.successful_calls else 0,
+                'estimated_cost_usd': round(self.estimated_cost_usd, 6),
+                'unpriced_calls': self.unpriced_calls,
+                'avg_latency': round(self.total_latency / self.calls, 3) if self.calls else 0,
+                'p50_latency': round(_percentile(sorted_latencies, 50), 3),
+                'p95_latency': round(_percentile(sorted_latencies, 95), 3),
+                'max_latency': round(self.max_latency, 3),
+                'models': {
+                    model: dict(stats, estimated_cost_usd=round(stats['estimated_cost_usd'], 6))
+                    for model, stats in self.models.items()
+                }
+            }
+
+
+# Process-wide metrics for every OpenAI call made by this app
+global_ai_metrics = AIUsageMetrics()
@@ -0,0 +1,115 @@
+from functools import lru_cache
+from config.config import BAD_EMAIL_DOMAINS
+
+# Shared, memoized domain normalization used by the OpenAI, Salesforce and Joseph services.
+# Lead data repeats the same websites and email domains heavily, so every helper caches
+# on the raw string value and non-string inputs are converted before hitting the cache.
+
+DOMAIN_CACHE_SIZE = 65536
+
+# Placeholder values that should be treated as "no domain"
+_EMPTY_DOMAIN_VALUES = frozenset(['null', 'none', 'n/a', ''])
+
+
+def _as_text(value):
+    """Convert a field value to a cacheable string (None stays None)"""
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _extract_core_domain(url):
+    url = url.strip().lower()
+
+    # Handle edge cases
+    if url in _EMPTY_DOMAIN_VALUES:
+        return None
+
+    # Remove protocols
+    url = url.replace('https://', '').replace('http://', '')
+
+    # Remove www prefix
+    if url.startswith('www.'):
+        url = url[4:]
+
+    # Remove trailing slash and paths
+    url = url.split('/')[0]
+
+    # Remove trailing dots
+    url = url.rstrip('.')
+
+    return url if url else None
+
+
+def extract_core_domain(url):
+    """Extract core domain from URL, removing protocol, www, paths, etc."""
+    if not url:
+        return None
+    return _extract_core_domain(_as_text(url))
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _extract_website_domain(website):
+    website = website.lower()
+    if website.startswith('http://'):
+        website = website[7:]
+    elif website.startswith('https://'):
+        website = website[8:]
+    if website.startswith('www.'):
+        website = website[4:]
+    if '/' in website:
+        website = website.split('/')[0]
+    return website
+
+
+def extract_website_domain(website):
+    """Extract domain from a website field for Joseph's scoring (empty string when missing)"""
+    if not website:
+        return ''
+    return _extract_website_domain(_as_text(website))
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def _extract_email_domain(email):
+    try:
+        domain = email.split('@')[1].lower().strip()
+        return domain if domain else None
+    except IndexError:
+        return None
+
+
+def extract_email_domain(email):
+    """Extract domain from email address"""
+    if not email or not isinstance(email, str):
+        return None
+    return _extract_email_domain(email)
+
+
+def normalize_url_for_comparison(url):
+    """Normalize URL for exact string comparison (handles case, whitespace)"""
+    if not url:
+        return None
+    return _as_text(url).strip().lower()
+
+
+def is_free_email_domain(domain):
+    """Check if a domain is a free email provider"""
+    core_domain = extract_core_domain(domain)
+    if not core_domain:
+        return False
+    return core_domain in BAD_EMAIL_DOMAINS
+
+
+def normalize_lead_domains(values):
+    """
+    Normalize a mapping of field name -> website/URL value once per lead.
+
+    Returns a dict of field name -> (original value, core domain, comparison string)
+    for every populated field, so callers can compare candidates without re-normalizing.
+    """
+    normalized = {}
+    for field, value in values.items():
+        if value:
+            normalized[field] = (value, extract_core_domain(value), normalize_url_for_comparison(value))
+    return normalized
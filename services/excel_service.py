@@ -1,62 +1,100 @@
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
+from openpyxl.utils.exceptions import InvalidFileException
 from datetime import datetime
 import json
 import io
+import itertools
+import numpy as np
 import pandas as pd
+from config.config import Config
+from .export_store import ExportStore
+from .upload_store import UploadStore
+from . import file_formats
+from . import excel_styles
+from .file_formats import FORMAT_XLSX, FLAT_FILE_SHEET_NAME
+from .workbook_preview import preview_workbook
+
+# Final Confidence Score weights: 15% acquisition + 15% enrichment + 70% AI coherence
+FINAL_SCORE_WEIGHTS = (0.15, 0.15, 0.70)
+
+# Rows per worksheet allowed by Excel; longer exports continue on additional sheets
+EXCEL_MAX_ROWS = 1048576
+
+class StreamingSheet:
+    """
+    Write-only worksheet wrapper. Rows are appended as they are produced and cells reuse
+    each named style's resolved style array instead of creating per-cell style objects.
+    """
+    
+    def __init__(self, wb, title, named_styles):
+        self.ws = wb.create_sheet(title)
+        # Named styles are bound to the workbook at this point, so their style arrays are final
+        self._style_arrays = {style.name: style.as_tuple() for style in named_styles}
+        self.rows_written = 0
+    
+    def cell(self, value, style):
+        """Create a write-only cell using a registered named style"""
+        cell = WriteOnlyCell(self.ws, value=value)
+        cell._style = self._style_arrays[style]
+        return cell
+    
+    def append(self, row):
+        """Write a row (list of values and/or cells)"""
+        self.ws.append(row)
+        self.rows_written += 1
+    
+    def add_sheet(self, title):
+        """Create another sheet in the same workbook that reuses this sheet's resolved styles"""
+        sheet = StreamingSheet(self.ws.parent, title, [])
+        sheet._style_arrays = self._style_arrays
+        return sheet
+    
+    def merge(self, cell_range):
+        """Merge a cell range (e.g. 'A1:D1')"""
+        self.ws.merged_cells.add(cell_range)
 
 class ExcelService:
     """Service for exporting lead analysis data to Excel format"""
     
     def __init__(self):
-        # RingCentral Brand Colors
-        self.rc_cerulean = "0684BC"      # RingCentral primary blue
-        self.rc_orange = "FF7A00"        # RingCentral orange
-        self.rc_ocean = "002855"         # RingCentral dark blue
-        self.rc_linen = "F1EFEC"         # RingCentral background
-        self.rc_ash = "C8C2B4"           # RingCentral light gray
-        self.rc_warm_black = "2B2926"    # RingCentral dark gray
-        
-        # Excel Styling with RingCentral Colors
-        self.header_font = Font(bold=True, color="FFFFFF")
-        self.header_fill = PatternFill(start_color=self.rc_cerulean, end_color=self.rc_cerulean, fill_type="solid")
-        self.summary_font = Font(bold=True, color=self.rc_ocean)
-        self.summary_fill = PatternFill(start_color=self.rc_linen, end_color=self.rc_linen, fill_type="solid")
-        self.title_font = Font(bold=True, size=16, color=self.rc_ocean)
-        self.accent_fill = PatternFill(start_color=self.rc_orange, end_color=self.rc_orange, fill_type="solid")
-        self.border = Border(
-            left=Side(style='thin', color=self.rc_ash),
-            right=Side(style='thin', color=self.rc_ash),
-            top=Side(style='thin', color=self.rc_ash),
-            bottom=Side(style='thin', color=self.rc_ash)
-        )
-        self.center_alignment = Alignment(horizontal='center', vertical='center')
-        self.wrap_alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+        # Exports are spooled to disk and served from there
+        self.export_store = ExportStore()
+        # Uploaded workbooks are cached so later steps can reference them by upload ID
+        self.upload_store = UploadStore()
+    
+    def _create_streaming_workbook(self, sheet_title):
+        """Create a write-only workbook with the shared named styles registered"""
+        wb = Workbook(write_only=True)
+        named_styles = excel_styles.build_named_styles()
+        for style in named_styles:
+            wb.add_named_style(style)
+        return wb, StreamingSheet(wb, sheet_title, named_styles)
+    
+    def _add_title_rows(self, sheet, title, title_span, timestamp_span):
+        """Append the report title and generation timestamp rows; returns the next row number"""
+        sheet.merge(f'A1:{title_span}1')
+        sheet.append([sheet.cell(title, 'rc_title')])
+        sheet.merge(f'A2:{timestamp_span}2')
+        sheet.append([sheet.cell(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 'rc_center')])
+        sheet.append([])
+        return 4
     
     def create_lead_analysis_excel(self, analysis_data, summary_data, query_info=None, filename_prefix="lead_analysis"):
-        """Create Excel file from lead analysis data"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Lead Analysis"
+        """Create Excel file from lead analysis data (rows are streamed with a write-only workbook to the export directory)"""
+        wb, sheet = self._create_streaming_workbook("Lead Analysis")
         
-        # Add title and metadata
-        current_row = 1
-        ws.merge_cells(f'A{current_row}:AA{current_row}')
-        ws[f'A{current_row}'] = "ZoomInfo Lead Quality Analysis Report"
-        ws[f'A{current_row}'].font = self.title_font
-        ws[f'A{current_row}'].alignment = self.center_alignment
-        current_row += 1
+        # Column widths and row height must be set before any rows are written
+        self._auto_adjust_columns(sheet.ws)
         
-        # Add generation timestamp
-        ws.merge_cells(f'A{current_row}:R{current_row}')
-        ws[f'A{current_row}'] = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        ws[f'A{current_row}'].alignment = self.center_alignment
-        current_row += 2
+        # Add title and metadata
+        current_row = self._add_title_rows(sheet, "ZoomInfo Lead Quality Analysis Report", 'AB', 'R')
         
         # Add summary section if provided
         if summary_data:
-            current_row = self._add_summary_section(ws, summary_data, query_info, current_row)
+            current_row = self._add_summary_section(sheet, summary_data, query_info, current_row)
+            sheet.append([])
             current_row += 1
         
         # Add headers for all lead data fields plus assessment outputs
@@ -64,44 +102,38 @@ class ExcelService:
             "Lead ID", "First Name", "Last Name", "Phone", "Country", "Title", "Industry",
             "Email", "First Channel", "Segment Name", "Company Size Range",
             "Website", "Company", "ZI Website", "ZI Company Name", "ZI Employees", "Email Domain",
-            "Not in TAM", "Suspicious Enrichment", "Acquisition Score", "Enrichment Score", 
+            "Not in TAM", "Suspicious Enrichment", "Acquisition Score", "Enrichment Score", "Coherence Score",
             "AI Coherence Score", "Final Confidence Score", "Explanation", "Corrections", "Inferences", "AI Status"
         ]
         
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=current_row, column=col, value=header)
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.alignment = self.center_alignment
-            cell.border = self.border
-        
-        current_row += 1
+        sheet.append([sheet.cell(header, 'rc_header') for header in headers])
+        header_row = sheet.rows_written
         
-        # Add data rows
+        # Add data rows as they are produced
         for lead in analysis_data:
-            self._add_lead_row(ws, lead, current_row)
-            current_row += 1
+            self._add_lead_row(sheet, lead)
         
-        # Auto-adjust column widths
-        self._auto_adjust_columns(ws)
+        # Score colours: Joseph's scores (Acquisition, Enrichment, Coherence) use purple for high scores,
+        # AI Coherence and Final Confidence use cerulean
+        if sheet.rows_written > header_row:
+            for column in ['T', 'U', 'V']:
+                excel_styles.add_score_formatting(sheet.ws, f'{column}{header_row + 1}:{column}{sheet.rows_written}',
+                                                  high_fill=excel_styles.SCORE_HIGH_JOSEPH_FILL)
+            for column in ['W', 'X']:
+                excel_styles.add_score_formatting(sheet.ws, f'{column}{header_row + 1}:{column}{sheet.rows_written}')
         
-        # Create file buffer
-        file_buffer = io.BytesIO()
-        wb.save(file_buffer)
-        file_buffer.seek(0)
-        
-        # Generate filename
+        # Generate filename and write the workbook straight to the export directory
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{filename_prefix}_{timestamp}.xlsx"
+        file_path = self.export_store.new_export_path(filename)
+        wb.save(file_path)
         
-        return file_buffer, filename
+        return file_path, filename
     
-    def _add_summary_section(self, ws, summary_data, query_info, start_row):
-        """Add summary statistics section to the worksheet"""
-        ws.merge_cells(f'A{start_row}:D{start_row}')
-        ws[f'A{start_row}'] = "Analysis Summary"
-        ws[f'A{start_row}'].font = self.summary_font
-        ws[f'A{start_row}'].fill = self.summary_fill
+    def _add_summary_section(self, sheet, summary_data, query_info, start_row):
+        """Append summary statistics section to the worksheet; returns the row after a trailing spacer row"""
+        sheet.merge(f'A{start_row}:D{start_row}')
+        sheet.append([sheet.cell("Analysis Summary", 'rc_section')])
         start_row += 1
         
         # Summary statistics
@@ -130,31 +162,26 @@ class ExcelService:
             ])
         
         for label, value in summary_items:
-            ws[f'A{start_row}'] = label
-            ws[f'B{start_row}'] = value
-            ws[f'A{start_row}'].font = Font(bold=True)
+            sheet.append([sheet.cell(label, 'rc_label'), value])
             start_row += 1
         
         # Query info if available
         if query_info:
+            sheet.append([])
             start_row += 1
-            ws.merge_cells(f'A{start_row}:D{start_row}')
-            ws[f'A{start_row}'] = "Query Information"
-            ws[f'A{start_row}'].font = self.summary_font
-            ws[f'A{start_row}'].fill = self.summary_fill
+            sheet.merge(f'A{start_row}:D{start_row}')
+            sheet.append([sheet.cell("Query Information", 'rc_section')])
             start_row += 1
             
             if query_info.get('original_query'):
-                ws[f'A{start_row}'] = "Original Query"
-                ws[f'B{start_row}'] = query_info['original_query']
-                ws[f'B{start_row}'].alignment = self.wrap_alignment
+                sheet.append(["Original Query", sheet.cell(query_info['original_query'], 'rc_wrap')])
                 start_row += 1
             
             if query_info.get('execution_time'):
-                ws[f'A{start_row}'] = "Execution Time"
-                ws[f'B{start_row}'] = query_info['execution_time']
+                sheet.append(["Execution Time", query_info['execution_time']])
                 start_row += 1
         
+        sheet.append([])
         return start_row + 1
     
     def _calculate_final_confidence_score(self, acquisition_score, enrichment_score, ai_coherence_score):
@@ -162,12 +189,19 @@ class ExcelService:
         if not all([acquisition_score, enrichment_score, ai_coherence_score]):
             return ''
         
-        # Weighted formula: 15% acquisition + 15% enrichment + 70% AI coherence  
-        final_score = (acquisition_score * 0.15) + (enrichment_score * 0.15) + (ai_coherence_score * 0.70)
+        acquisition_weight, enrichment_weight, ai_weight = FINAL_SCORE_WEIGHTS
+        final_score = (acquisition_score * acquisition_weight) + (enrichment_score * enrichment_weight) + (ai_coherence_score * ai_weight)
         return round(final_score, 1)
     
-    def _add_lead_row(self, ws, lead, row):
-        """Add a single lead's data to the worksheet"""
+    def _calculate_final_confidence_scores(self, acquisition_scores, enrichment_scores, ai_coherence_scores):
+        """Column version of _calculate_final_confidence_score ('' where any score is missing, zero or non-numeric)"""
+        scores = [pd.to_numeric(values, errors='coerce') for values in (acquisition_scores, enrichment_scores, ai_coherence_scores)]
+        has_all_scores = np.logical_and.reduce([values.notna() & values.ne(0) for values in scores])
+        final_scores = sum(values * weight for values, weight in zip(scores, FINAL_SCORE_WEIGHTS)).round(1)
+        return final_scores.astype(object).where(has_all_scores, '')
+    
+    def _add_lead_row(self, sheet, lead):
+        """Append a single lead's data to the worksheet"""
         # Extract confidence assessment data
         confidence_assessment = lead.get('confidence_assessment', {})
         confidence_score = confidence_assessment.get('confidence_score', '') if confidence_assessment else ''
@@ -183,6 +217,12 @@ class ExcelService:
         inferences = confidence_assessment.get('inferences', {}) if confidence_assessment else {}
         inferences_text = json.dumps(inferences, indent=2) if inferences else ''
         
+        # The final score weighs in the AI coherence score; with the AI assessment disabled (no AI status)
+        # Joseph's coherence score stands in for it
+        final_coherence_score = confidence_score if isinstance(confidence_score, (int, float)) else None
+        if final_coherence_score is None and not lead.get('ai_assessment_status'):
+            final_coherence_score = lead.get('coherence_score')
+        
         # Data for each column (matching header order)
         row_data = [
             lead.get('Id', ''),                          # Lead ID
@@ -206,11 +246,12 @@ class ExcelService:
             'Yes' if lead.get('suspicious_enrichment') else 'No',  # Suspicious Enrichment
             lead.get('acquisition_completeness_score', ''),  # Acquisition Score (Joseph's)
             lead.get('enrichment_completeness_score', ''),   # Enrichment Score (Joseph's)
+            lead.get('coherence_score', ''),             # Coherence Score (Joseph's)
             confidence_score,                            # AI Coherence Score
             self._calculate_final_confidence_score(
                 lead.get('acquisition_completeness_score'),
                 lead.get('enrichment_completeness_score'),
-                confidence_score if isinstance(confidence_score, (int, float)) else None
+                final_coherence_score
             ),                                           # Final Confidence Score (Weighted)
             explanation_text,                            # Explanation
             corrections_text,                            # Corrections
@@ -218,48 +259,23 @@ class ExcelService:
             lead.get('ai_assessment_status', '')         # AI Status
         ]
         
+        cells = []
         for col, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row, column=col, value=value)
-            cell.border = self.border
-            
             # Special formatting for certain columns with RingCentral colors
-            if col in [18, 19]:  # Boolean flags (Not in TAM, Suspicious Enrichment) - now columns 18, 19
-                cell.alignment = self.center_alignment
-                if value == 'Yes':
-                    # Light red background for issues (softer than pure red)
-                    cell.fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
-                    cell.font = Font(bold=True, color=self.rc_warm_black)
-            elif col in [20, 21]:  # Joseph's scores (Acquisition, Enrichment) - now columns 20, 21
-                cell.alignment = self.center_alignment
-                cell.font = Font(bold=True, color="FFFFFF")
-                if isinstance(value, (int, float)) and value > 0:
-                    if value >= 80:
-                        # High score: RingCentral Purple (dark purple)
-                        cell.fill = PatternFill(start_color="663399", end_color="663399", fill_type="solid")
-                    elif value >= 60:
-                        # Medium score: RingCentral Orange
-                        cell.fill = PatternFill(start_color=self.rc_orange, end_color=self.rc_orange, fill_type="solid")
-                    else:
-                        # Low score: Muted red with white text
-                        cell.fill = PatternFill(start_color="DC3545", end_color="DC3545", fill_type="solid")
-            elif col in [22, 23]:  # AI Coherence (22) and Final Confidence (23) scores with RingCentral color scheme
-                cell.alignment = self.center_alignment
-                cell.font = Font(bold=True, color="FFFFFF")
-                if isinstance(value, (int, float)) and value > 0:
-                    if value >= 80:
-                        # High confidence: RingCentral Cerulean (primary blue)
-                        cell.fill = PatternFill(start_color=self.rc_cerulean, end_color=self.rc_cerulean, fill_type="solid")
-                    elif value >= 60:
-                        # Medium confidence: RingCentral Orange
-                        cell.fill = PatternFill(start_color=self.rc_orange, end_color=self.rc_orange, fill_type="solid")
-                    else:
-                        # Low confidence: Muted red with dark text
-                        cell.fill = PatternFill(start_color="DC3545", end_color="DC3545", fill_type="solid")
-            elif col in [24, 25, 26]:  # Text fields that might be long (Explanation, Corrections, Inferences) - now columns 24, 25, 26
-                cell.alignment = self.wrap_alignment
+            if col in [18, 19]:  # Boolean flags (Not in TAM, Suspicious Enrichment)
+                style = 'rc_flag_issue' if value == 'Yes' else 'rc_flag'
+            elif col in [20, 21, 22, 23, 24]:  # Scores - band colours come from the column's conditional formatting
+                style = 'rc_score'
+            elif col in [25, 26, 27]:  # Text fields that might be long (Explanation, Corrections, Inferences)
+                style = 'rc_text'
+            else:
+                style = 'rc_cell'
+            cells.append(sheet.cell(value, style))
+        
+        sheet.append(cells)
     
     def _auto_adjust_columns(self, ws):
-        """Auto-adjust column widths based on content"""
+        """Set column widths and the default row height (must run before rows are written)"""
         column_widths = {
             1: 20,   # Lead ID
             2: 15,   # First Name
@@ -282,20 +298,21 @@ class ExcelService:
             19: 15,  # Suspicious Enrichment
             20: 12,  # Acquisition Score
             21: 12,  # Enrichment Score
-            22: 12,  # AI Coherence Score
-            23: 12,  # Final Confidence Score
-            24: 40,  # Explanation
-            25: 25,  # Corrections
-            26: 25,  # Inferences
-            27: 12   # AI Status
+            22: 12,  # Coherence Score
+            23: 12,  # AI Coherence Score
+            24: 12,  # Final Confidence Score
+            25: 40,  # Explanation
+            26: 25,  # Corrections
+            27: 25,  # Inferences
+            28: 12   # AI Status
         }
         
         for col, width in column_widths.items():
             ws.column_dimensions[get_column_letter(col)].width = width
         
-        # Set row heights for better readability
-        for row in ws.iter_rows():
-            ws.row_dimensions[row[0].row].height = 25
+        # One sheet-level row height for better readability instead of one entry per row
+        ws.sheet_format.defaultRowHeight = 25
+        ws.sheet_format.customHeight = True
     
     def create_single_lead_excel(self, lead_data, filename_prefix="lead_confidence"):
         """Create Excel file for a single lead confidence assessment"""
@@ -306,44 +323,92 @@ class ExcelService:
             filename_prefix=filename_prefix
         )
     
-    def parse_excel_file(self, file_content):
-        """Parse uploaded Excel file and return sheet names and preview data"""
+    def _file_source(self, file_content):
+        """Readable source for openpyxl/pandas from raw bytes or a file path"""
+        if isinstance(file_content, (bytes, bytearray)):
+            return io.BytesIO(file_content)
+        return file_content
+    
+    def _upload_format(self, upload_id):
+        """Input format of a cached upload (from its filename), or None if the upload is gone"""
+        upload = self.upload_store.get_upload(upload_id)
+        if not upload:
+            return None
+        return file_formats.detect_format(upload['filename']) or FORMAT_XLSX
+    
+    def parse_upload(self, upload_id):
+        """Parse a cached upload (xlsx, CSV or Parquet) and return sheet names and preview data"""
+        file_format = self._upload_format(upload_id)
+        source_path = self.upload_store.source_path(upload_id)
+        if not file_format or not source_path:
+            return {
+                'success': False,
+                'error': 'Upload not found or expired. Please upload the file again.'
+            }
+        
+        if file_format == FORMAT_XLSX:
+            result = self.parse_excel_file(source_path)
+        else:
+            try:
+                headers, preview_data, total_rows = file_formats.read_preview(source_path, file_format)
+                result = {
+                    'success': True,
+                    'sheet_names': [FLAT_FILE_SHEET_NAME],
+                    'headers': headers,
+                    'preview_data': preview_data,
+                    'total_rows': total_rows,
+                    'sheets': [{
+                        'name': FLAT_FILE_SHEET_NAME,
+                        'headers': headers,
+                        'preview_data': preview_data,
+                        'total_rows': total_rows,
+                        # Parquet footers carry the exact row count; CSVs are counted while previewing
+                        'row_count_source': 'metadata' if file_format == file_formats.FORMAT_PARQUET else 'scan'
+                    }]
+                }
+            except Exception as e:
+                result = {
+                    'success': False,
+                    'error': f"Error parsing {file_format.upper()} file: {str(e)}"
+                }
+        
+        if result['success']:
+            result['file_format'] = file_format
+        return result
+    
+    def parse_excel_file(self, file_content, preview_rows=10):
+        """
+        Parse uploaded Excel file and return sheet names and preview data.
+        Every sheet gets headers, its first preview_rows rows and a row count
+        (see workbook_preview); the top-level headers/preview_data/total_rows
+        describe the first sheet.
+        """
         try:
-            # Load workbook from file content
-            wb = load_workbook(io.BytesIO(file_content), read_only=True)
-            sheet_names = wb.sheetnames
+            # Preview straight from the package parts (bytes or a path to the uploaded file)
+            sheets = preview_workbook(self._file_source(file_content), preview_rows)
+            if not sheets:
+                raise ValueError("Workbook has no worksheets")
             
-            # Get preview data from first sheet
-            first_sheet = wb[sheet_names[0]]
-            
-            # Read first 10 rows for preview
-            preview_data = []
-            headers = []
-            
-            for row_idx, row in enumerate(first_sheet.iter_rows(values_only=True)):
-                if row_idx == 0:
-                    # First row as headers
-                    headers = [cell if cell is not None else f"Column_{i+1}" for i, cell in enumerate(row)]
-                elif row_idx < 11:  # First 10 data rows
+            for sheet in sheets:
+                # First row as headers
+                headers = [cell if cell is not None else f"Column_{i+1}" for i, cell in enumerate(sheet['headers'])]
+                preview_data = []
+                for row in sheet['preview_data']:
                     row_data = [cell if cell is not None else "" for cell in row]
                     # Pad row to match header length
-                    while len(row_data) < len(headers):
-                        row_data.append("")
+                    row_data.extend([""] * (len(headers) - len(row_data)))
                     preview_data.append(row_data[:len(headers)])  # Trim to header length
-                else:
-                    break
-            
-            wb.close()
-            
-            # Calculate total rows safely (max_row can be None for empty sheets)
-            total_rows = (first_sheet.max_row - 1) if first_sheet.max_row else 0
+                sheet['headers'] = headers
+                sheet['preview_data'] = preview_data
             
+            first_sheet = sheets[0]
             return {
                 'success': True,
-                'sheet_names': sheet_names,
-                'headers': headers,
-                'preview_data': preview_data,
-                'total_rows': max(total_rows, len(preview_data))  # Use actual data count if max_row is unreliable
+                'sheet_names': [sheet['name'] for sheet in sheets],
+                'headers': first_sheet['headers'],
+                'preview_data': first_sheet['preview_data'],
+                'total_rows': first_sheet['total_rows'],
+                'sheets': sheets
             }
             
         except Exception as e:
@@ -355,52 +420,218 @@ class ExcelService:
     def extract_lead_ids_from_excel(self, file_content, sheet_name, lead_id_column):
         """Extract Lead IDs from specified column in Excel file"""
         try:
-            # Use pandas for easier data extraction - read as string to preserve Lead ID format
-            df = pd.read_excel(io.BytesIO(file_content), sheet_name=sheet_name, dtype={lead_id_column: str})
-            
-            if lead_id_column not in df.columns:
+            df = self._read_sheet(file_content, sheet_name, lead_id_column)
+            return self._extract_lead_ids_from_frame(df, sheet_name, lead_id_column)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"Error extracting Lead IDs: {str(e)}"
+            }
+    
+    def extract_lead_ids_from_upload(self, upload_id, sheet_name, lead_id_column):
+        """
+        Extract Lead IDs from a workbook in the upload cache.
+        Only the Lead ID column is read (and cached per upload); the full sheet is streamed
+        later when the export needs it.
+        """
+        try:
+            df = self._lead_id_frame(upload_id, sheet_name, lead_id_column)
+            if df is None:
+                return {
+                    'success': False,
+                    'error': 'Upload not found or expired. Please upload the Excel file again.'
+                }
+            if df.attrs.get('column_missing'):
                 return {
                     'success': False,
                     'error': f"Column '{lead_id_column}' not found in sheet '{sheet_name}'"
                 }
-            
-            # Extract Lead IDs and remove null/empty values
-            lead_ids = df[lead_id_column].dropna().astype(str).tolist()
-            # Remove empty strings and whitespace-only strings, and handle Excel formatting issues
-            cleaned_lead_ids = []
-            for lid in lead_ids:
-                lid_str = str(lid).strip()
-                # Remove any Excel formatting artifacts
-                if lid_str and lid_str.lower() not in ['nan', 'none', 'null']:
-                    # Handle potential floating point conversion (e.g., "1.23456789012345e+17")
-                    if 'e+' in lid_str.lower():
-                        try:
-                            # Convert scientific notation back to full number
-                            lid_str = f"{float(lid_str):.0f}"
-                        except:
-                            pass
-                    cleaned_lead_ids.append(lid_str)
-            
-            lead_ids = cleaned_lead_ids
-            
-            # Get original data for later merging - handle NaN values
-            # Replace NaN with empty string to avoid JSON serialization issues
-            df_clean = df.where(pd.notnull(df), '')  # Replace NaN with empty string
-            original_data = df_clean.to_dict('records')
-            
             return {
                 'success': True,
-                'lead_ids': lead_ids,
-                'original_data': original_data,
-                'total_rows': len(df)
+                'lead_ids': self._clean_lead_ids(df[lead_id_column].dropna().tolist()),
+                'total_rows': df.attrs['total_rows']
             }
-            
         except Exception as e:
             return {
                 'success': False,
                 'error': f"Error extracting Lead IDs: {str(e)}"
             }
     
+    def _lead_id_frame(self, upload_id, sheet_name, lead_id_column):
+        """Non-empty Lead ID column of an upload (see _read_lead_id_column), parsed once per upload"""
+        file_format = self._upload_format(upload_id)
+        if file_format == FORMAT_XLSX:
+            loader = lambda source_path: self._read_lead_id_column(source_path, sheet_name, lead_id_column)
+        else:
+            loader = lambda source_path: self._read_flat_file_lead_id_column(source_path, file_format, lead_id_column)
+        return self.upload_store.get_frame(upload_id, ('lead_ids', sheet_name, lead_id_column), loader)
+    
+    def _read_lead_id_column(self, file_content, sheet_name, lead_id_column):
+        """
+        Stream a single column out of an xlsx sheet with openpyxl's read-only mode.
+        Cells are converted to strings the same way pd.read_excel(dtype=str) does, and
+        attrs carries total_rows (data rows up to the last non-empty row) and column_missing.
+        """
+        try:
+            wb = load_workbook(self._file_source(file_content), read_only=True, data_only=True)
+        except InvalidFileException:
+            # Not an xlsx workbook (e.g. legacy .xls) - fall back to pandas for this column
+            df = self._read_sheet(file_content, sheet_name, lead_id_column)
+            column_missing = lead_id_column not in df.columns
+            df = pd.DataFrame({lead_id_column: [] if column_missing else df[lead_id_column]}, dtype=object)
+            df.attrs['total_rows'] = 0 if column_missing else len(df)
+            df.attrs['column_missing'] = column_missing
+            return df
+        
+        try:
+            rows = wb[sheet_name].iter_rows(values_only=True)
+            headers = next(rows, ())
+            column_index = next((i for i, header in enumerate(headers) if header is not None and str(header) == lead_id_column), None)
+            
+            values = []
+            total_rows = 0
+            if column_index is not None:
+                for row_number, row in enumerate(rows, 1):
+                    value = row[column_index] if column_index < len(row) else None
+                    if value is not None:
+                        values.append(self._excel_value_to_str(value))
+                        total_rows = row_number
+                    elif any(cell is not None for cell in row):
+                        total_rows = row_number
+        finally:
+            wb.close()
+        
+        df = pd.DataFrame({lead_id_column: values}, dtype=object)
+        df.attrs['total_rows'] = total_rows
+        df.attrs['column_missing'] = column_index is None
+        return df
+    
+    def _read_flat_file_lead_id_column(self, source_path, file_format, lead_id_column):
+        """Read the Lead ID column of a CSV (in chunks) or Parquet file, in the same shape as _read_lead_id_column"""
+        values, total_rows = file_formats.read_column(source_path, file_format, lead_id_column)
+        df = pd.DataFrame({lead_id_column: [] if values is None else values}, dtype=object)
+        df.attrs['total_rows'] = total_rows
+        df.attrs['column_missing'] = values is None
+        return df
+    
+    def _excel_value_to_str(self, value):
+        """String form of a cell value as pd.read_excel(dtype=str) would produce it"""
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        elif isinstance(value, datetime):
+            value = pd.Timestamp(value)
+        return str(value)
+    
+    def _read_sheet(self, file_content, sheet_name, lead_id_column):
+        """Read a sheet into a DataFrame, keeping the Lead ID column as strings"""
+        # Use pandas for easier data extraction - read as string to preserve Lead ID format
+        return pd.read_excel(self._file_source(file_content), sheet_name=sheet_name, dtype={lead_id_column: str})
+    
+    def _iter_sheet_chunks(self, file_content, sheet_name, lead_id_column, chunk_rows):
+        """
+        Stream an xlsx sheet as DataFrames of up to chunk_rows rows with openpyxl's read-only mode.
+        Rows match pd.read_excel(dtype={lead_id_column: str}) closely enough for the export: the
+        Lead ID column holds strings, blank headers become 'Unnamed: n', duplicate headers get
+        '.n' suffixes and trailing empty rows are dropped. Columns beyond the last header cell
+        are ignored. At least one (possibly empty) chunk is always yielded.
+        """
+        try:
+            wb = load_workbook(self._file_source(file_content), read_only=True, data_only=True)
+        except InvalidFileException:
+            # Not an xlsx workbook (e.g. legacy .xls) - pandas reads it in one go
+            yield self._read_sheet(file_content, sheet_name, lead_id_column)
+            return
+        
+        try:
+            rows = wb[sheet_name].iter_rows(values_only=True)
+            header_row = list(next(rows, ()))
+            while header_row and header_row[-1] is None:
+                header_row.pop()
+            
+            headers = []
+            seen = {}
+            for i, header in enumerate(header_row):
+                header = f"Unnamed: {i}" if header is None else header
+                if header in seen:
+                    seen[header] += 1
+                    header = f"{header}.{seen[header]}"
+                seen.setdefault(header, 0)
+                headers.append(header)
+            width = len(headers)
+            lead_id_index = headers.index(lead_id_column) if lead_id_column in headers else None
+            
+            chunk = []
+            pending_empty_rows = 0
+            yielded = False
+            for row in rows:
+                values = [
+                    int(value) if isinstance(value, float) and value.is_integer() else value
+                    for value in row[:width]
+                ]
+                if not any(value is not None for value in values):
+                    # Only kept if a non-empty row follows
+                    pending_empty_rows += 1
+                    continue
+                chunk.extend([[None] * width] * pending_empty_rows)
+                pending_empty_rows = 0
+                
+                values.extend([None] * (width - len(values)))
+                if lead_id_index is not None and values[lead_id_index] is not None:
+                    values[lead_id_index] = self._excel_value_to_str(values[lead_id_index])
+                chunk.append(values)
+                
+                if len(chunk) >= chunk_rows:
+                    yield pd.DataFrame(chunk[:chunk_rows], columns=headers, dtype=object)
+                    chunk = chunk[chunk_rows:]
+                    yielded = True
+            
+            if chunk or not yielded:
+                yield pd.DataFrame(chunk, columns=headers, dtype=object)
+        finally:
+            wb.close()
+    
+    def _extract_lead_ids_from_frame(self, df, sheet_name, lead_id_column):
+        """Clean Lead IDs and original rows out of a parsed sheet"""
+        if lead_id_column not in df.columns:
+            return {
+                'success': False,
+                'error': f"Column '{lead_id_column}' not found in sheet '{sheet_name}'"
+            }
+        
+        # Extract Lead IDs and remove null/empty values
+        lead_ids = self._clean_lead_ids(df[lead_id_column].dropna().astype(str).tolist())
+        
+        # Get original data for later merging - handle NaN values
+        # Replace NaN with empty string to avoid JSON serialization issues
+        df_clean = df.where(pd.notnull(df), '')  # Replace NaN with empty string
+        original_data = df_clean.to_dict('records')
+        
+        return {
+            'success': True,
+            'lead_ids': lead_ids,
+            'original_data': original_data,
+            'total_rows': len(df)
+        }
+    
+    def _clean_lead_ids(self, lead_ids):
+        """Drop blank/placeholder Lead IDs and undo Excel scientific-notation formatting"""
+        # Remove empty strings and whitespace-only strings, and handle Excel formatting issues
+        cleaned_lead_ids = []
+        for lid in lead_ids:
+            lid_str = str(lid).strip()
+            # Remove any Excel formatting artifacts
+            if lid_str and lid_str.lower() not in ['nan', 'none', 'null']:
+                # Handle potential floating point conversion (e.g., "1.23456789012345e+17")
+                if 'e+' in lid_str.lower():
+                    try:
+                        # Convert scientific notation back to full number
+                        lid_str = f"{float(lid_str):.0f}"
+                    except:
+                        pass
+                cleaned_lead_ids.append(lid_str)
+        
+        return cleaned_lead_ids
+    
     def _convert_15_to_18_char_id(self, id_15):
         """Convert 15-character Salesforce ID to 18-character format"""
         if len(id_15) != 15:
@@ -423,426 +654,478 @@ class ExcelService:
         
         return id_15 + suffix
 
-    def create_excel_with_analysis(self, original_data, analysis_results, lead_id_column, filename_prefix="excel_analysis", invalid_lead_ids=None):
-        """Create Excel file combining original data with AI analysis results, handling invalid Lead IDs"""
+    def _lead_id_keys(self, lead_ids):
+        """Normalize a Series of Lead IDs to 18-character upper-case join keys"""
+        lead_ids = lead_ids.astype(str).str.strip()
+        # 15-character IDs are case-sensitive, so convert them before upper-casing
+        is_short_id = lead_ids.str.len() == 15
+        conversions = {lead_id: self._convert_15_to_18_char_id(lead_id) for lead_id in lead_ids[is_short_id].unique()}
+        return lead_ids.mask(is_short_id, lead_ids.map(conversions)).str.upper()
+    
+    def _build_analysis_frame(self, leads_data):
+        """
+        Build one row per analyzed lead with the Excel analysis columns already derived.
+        Keyed by _lead_key (see _lead_id_keys); the last result wins for duplicate Lead IDs.
+        """
+        records = []
+        for result in leads_data:
+            lead_id = str(result.get('Id') or '').strip()
+            if not lead_id:
+                continue
+            confidence_assessment = result.get('confidence_assessment') or {}
+            records.append((
+                lead_id,
+                result.get('acquisition_completeness_score', ''),
+                result.get('enrichment_completeness_score', ''),
+                result.get('coherence_score', ''),
+                confidence_assessment.get('confidence_score', ''),
+                confidence_assessment.get('explanation_bullets') or [],
+                confidence_assessment.get('corrections') or {},
+                confidence_assessment.get('inferences') or {},
+                bool(result.get('not_in_TAM')),
+                bool(result.get('suspicious_enrichment')),
+                result.get('ai_assessment_status') or ''
+            ))
+        
+        df = pd.DataFrame(records, dtype=object, columns=[
+            '_lead_id', 'Acquisition_Score', 'Enrichment_Score', 'Coherence_Score', 'AI_Coherence_Score',
+            '_bullets', '_corrections', '_inferences', '_not_in_tam', '_suspicious', '_ai_assessment_status'
+        ])
+        df['_lead_key'] = self._lead_id_keys(df['_lead_id'])
+        df = df.drop_duplicates('_lead_key', keep='last').reset_index(drop=True)
+        df['_matched'] = True
+        df['_not_in_tam'] = df['_not_in_tam'].astype(bool)
+        df['_suspicious'] = df['_suspicious'].astype(bool)
+        
+        # Only numeric values count as AI confidence scores
+        is_numeric_score = df['AI_Coherence_Score'].map(lambda value: isinstance(value, (int, float))).astype(bool)
+        df['_confidence_numeric'] = pd.to_numeric(df['AI_Coherence_Score'].where(is_numeric_score), errors='coerce')
+        
+        # With the AI assessment disabled (no AI status) Joseph's coherence score stands in for the AI one
+        ai_disabled = ~is_numeric_score & df['_ai_assessment_status'].eq('')
+        final_coherence = df['_confidence_numeric'].mask(ai_disabled, pd.to_numeric(df['Coherence_Score'], errors='coerce'))
+        
+        df['Final_Confidence_Score'] = self._calculate_final_confidence_scores(
+            df['Acquisition_Score'], df['Enrichment_Score'], final_coherence
+        )
+        df['AI_Explanation'] = df['_bullets'].str.join('\n').fillna('')
+        has_corrections = df['_corrections'].astype(bool)
+        has_inferences = df['_inferences'].astype(bool)
+        df['AI_Corrections'] = df['_corrections'][has_corrections].map(lambda value: json.dumps(value, indent=2))
+        df['AI_Inferences'] = df['_inferences'][has_inferences].map(lambda value: json.dumps(value, indent=2))
+        df[['AI_Corrections', 'AI_Inferences']] = df[['AI_Corrections', 'AI_Inferences']].fillna('')
+        df['AI_Not_in_TAM'] = np.where(df['_not_in_tam'], 'Yes', 'No')
+        df['AI_Suspicious_Enrichment'] = np.where(df['_suspicious'], 'Yes', 'No')
+        
+        status = df['_ai_assessment_status'].astype(str)
+        has_ai_data = df['_bullets'].astype(bool) | has_corrections | has_inferences
+        df['AI_Status'] = np.select(
+            [is_numeric_score, status == 'success', status.str.startswith('failed:'), status != ''],
+            ['Analyzed', 'Analyzed', 'AI Assessment Failed', status],
+            default=np.where(has_ai_data, 'Analyzed', 'Analysis Available')
+        )
+        return df
+    
+    def _leads_from_results(self, analysis_results):
+        """Handle both list of leads and full analysis result object"""
+        if isinstance(analysis_results, dict) and 'leads' in analysis_results:
+            return analysis_results['leads']
+        return analysis_results
+    
+    def _invalid_lead_id_set(self, invalid_lead_ids):
+        """Invalid Lead IDs are matched case-insensitively against the raw column values"""
+        return {str(lid).strip().upper() for lid in (invalid_lead_ids or [])}
+    
+    def _merge_analysis_columns(self, df_original, analysis_df, lead_id_column, invalid_lead_ids_set):
+        """
+        Append the analysis columns to rows of original data with one join on the Lead ID key.
+        
+        Returns:
+            df_original: Original rows with the analysis columns added
+            is_invalid: Boolean Series marking rows whose Lead ID failed validation
+            counts: Quality counts over matched rows (used when no Salesforce summary is available)
+        """
+        raw_lead_ids = df_original[lead_id_column].astype(str).str.strip()
+        is_invalid = raw_lead_ids.str.upper().isin(invalid_lead_ids_set)
+        
+        # Join key: 18-character upper-case Lead ID (invalid rows never match)
+        row_keys = self._lead_id_keys(raw_lead_ids)
+        # Fall back to the 15-character prefix for IDs whose case was changed in the sheet
+        prefix_keys = pd.Series(analysis_df['_lead_key'].to_numpy(), index=analysis_df['_lead_key'].str[:15])
+        prefix_keys = prefix_keys[~prefix_keys.index.duplicated(keep='last')]
+        use_prefix = ~row_keys.isin(analysis_df['_lead_key']) & raw_lead_ids.str.len().isin([15, 18])
+        row_keys = row_keys.mask(use_prefix, raw_lead_ids.str.upper().str[:15].map(prefix_keys))
+        row_keys = row_keys.mask(is_invalid)
+        
+        merged = pd.DataFrame({'_lead_key': row_keys.to_numpy()}).merge(
+            analysis_df, on='_lead_key', how='left', validate='many_to_one'
+        )
+        matched = merged['_matched'].eq(True).to_numpy()
+        
+        # Rows without analysis results get blank scores/text and 'No' flags
+        for col_name in ['Acquisition_Score', 'Enrichment_Score', 'Coherence_Score', 'AI_Coherence_Score', 'Final_Confidence_Score',
+                         'AI_Explanation', 'AI_Corrections', 'AI_Inferences']:
+            df_original[col_name] = merged[col_name].where(matched, '').to_numpy()
+        for col_name in ['AI_Not_in_TAM', 'AI_Suspicious_Enrichment']:
+            df_original[col_name] = merged[col_name].where(matched, 'No').to_numpy()
+        df_original['AI_Status'] = np.where(
+            is_invalid.to_numpy(), 'Invalid Lead ID',
+            merged['AI_Status'].where(matched, 'Not Analyzed').to_numpy()
+        )
+        
+        matched_rows = merged[matched]
+        scored_rows = matched_rows['_confidence_numeric'].dropna()
+        counts = {
+            'matched_rows': int(matched.sum()),
+            'leads_with_issues': int((matched_rows['_not_in_tam'] | matched_rows['_suspicious']).sum()),
+            'not_in_tam_count': int(matched_rows['_not_in_tam'].sum()),
+            'suspicious_enrichment_count': int(matched_rows['_suspicious'].sum()),
+            'total_confidence_score': float(scored_rows.sum()),
+            'successful_ai_assessments': len(scored_rows)
+        }
+        return df_original, is_invalid, counts
+    
+    def create_file_with_analysis(self, original_data, analysis_results, lead_id_column, filename_prefix="excel_analysis", invalid_lead_ids=None, output_format=FORMAT_XLSX):
+        """
+        Combine original data with AI analysis results in the requested output format.
+        xlsx gets the formatted report from create_excel_with_analysis; CSV and Parquet carry
+        the same analysis columns without any spreadsheet formatting.
+        """
+        if output_format == FORMAT_XLSX:
+            return self.create_excel_with_analysis(original_data, analysis_results, lead_id_column, filename_prefix, invalid_lead_ids)
+        
         try:
-            # Convert original data to DataFrame and handle NaN values
+            if output_format not in file_formats.OUTPUT_FORMATS:
+                raise ValueError(f"Unsupported output format '{output_format}'")
+            
             df_original = pd.DataFrame(original_data)
-            # Ensure no NaN values that could cause JSON serialization issues
             df_original = df_original.where(pd.notnull(df_original), '')
             
-            # Convert invalid_lead_ids to set for fast lookup
-            invalid_lead_ids_set = set()
-            if invalid_lead_ids:
-                print(f"🔍 DEBUG: Processing {len(invalid_lead_ids)} invalid Lead IDs")
-                for lid in invalid_lead_ids:
-                    lid_str = str(lid).strip()
-                    invalid_lead_ids_set.add(lid_str)
-                    invalid_lead_ids_set.add(lid_str.upper())
-                    invalid_lead_ids_set.add(lid_str.lower())
-                    print(f"🔍 DEBUG: Added to set: '{lid_str}', '{lid_str.upper()}', '{lid_str.lower()}'")
-                print(f"🔍 DEBUG: Invalid Lead IDs set contains {len(invalid_lead_ids_set)} entries")
-            else:
-                print(f"🔍 DEBUG: No invalid Lead IDs provided")
-            
-            # Handle both list of leads and full analysis result object
-            leads_data = analysis_results
-            if isinstance(analysis_results, dict) and 'leads' in analysis_results:
-                leads_data = analysis_results['leads']
-            
-            # Create analysis dictionary for fast lookup with both 15 and 18 char Lead IDs
-            analysis_dict = {}
-            print(f"🔍 DEBUG: Creating analysis dictionary from {len(leads_data)} results")
-            for i, result in enumerate(leads_data):
-                lead_id = result.get('Id', '')
-                if lead_id:
-                    lead_id_str = str(lead_id).strip()
-                    print(f"   Result {i+1}: Lead ID '{lead_id_str}' (length: {len(lead_id_str)})")
-                    
-                    # Store with the original ID format
-                    analysis_dict[lead_id_str] = result
-                    analysis_dict[lead_id_str.upper()] = result
-                    analysis_dict[lead_id_str.lower()] = result
-                    
-                    # If it's 18 characters, also store the 15-character version
-                    if len(lead_id_str) == 18:
-                        lead_id_15 = lead_id_str[:15]
-                        analysis_dict[lead_id_15] = result
-                        analysis_dict[lead_id_15.upper()] = result
-                        analysis_dict[lead_id_15.lower()] = result
-                        print(f"      Also stored as 15-char: '{lead_id_15}'")
-                    
-                    # If it's 15 characters, also store the 18-character version
-                    elif len(lead_id_str) == 15:
-                        lead_id_18 = self._convert_15_to_18_char_id(lead_id_str)
-                        analysis_dict[lead_id_18] = result
-                        analysis_dict[lead_id_18.upper()] = result
-                        analysis_dict[lead_id_18.lower()] = result
-                        print(f"      Also stored as 18-char: '{lead_id_18}'")
-            
-            print(f"🔍 DEBUG: Analysis dictionary contains {len(analysis_dict)} total entries")
-            
-            # 🔍 DEBUG: Show what Lead IDs are available in analysis dictionary
-            print(f"🔍 DEBUG: Analysis dictionary contains {len(analysis_dict)} Lead ID entries:")
-            unique_ids = set()
-            for key in analysis_dict.keys():
-                if len(key) in [15, 18]:  # Only show actual Lead IDs, not upper/lower variants
-                    unique_ids.add(key)
-            for i, unique_id in enumerate(sorted(unique_ids)[:5]):  # Show first 5
-                print(f"   {i+1}. '{unique_id}' (length: {len(unique_id)})")
-            if len(unique_ids) > 5:
-                print(f"   ... and {len(unique_ids) - 5} more")
-            
-            # Initialize counters for Excel-specific calculations
-            # Note: We'll use Salesforce summary data for the final metrics
-            leads_with_issues = 0
-            not_in_tam_count = 0
-            suspicious_enrichment_count = 0
-            total_confidence_score = 0
-            successful_ai_assessments = 0
-            
-            # Add analysis columns - updated to include hybrid scoring system
-            analysis_columns = {
-                'Acquisition_Score': [],
-                'Enrichment_Score': [],
-                'AI_Coherence_Score': [],
-                'Final_Confidence_Score': [],
-                'AI_Explanation': [],
-                'AI_Corrections': [],
-                'AI_Inferences': [],
-                'AI_Not_in_TAM': [],
-                'AI_Suspicious_Enrichment': [],
-                'AI_Status': []
+            analysis_df = self._build_analysis_frame(self._leads_from_results(analysis_results))
+            df_original, _, _ = self._merge_analysis_columns(
+                df_original, analysis_df, lead_id_column, self._invalid_lead_id_set(invalid_lead_ids)
+            )
+            
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"{filename_prefix}_{timestamp}{file_formats.OUTPUT_FORMATS[output_format][0]}"
+            file_path = self.export_store.new_export_path(filename)
+            file_formats.write_table(df_original, file_path, output_format)
+            
+            return {
+                'success': True,
+                'file_path': file_path,
+                'filename': filename
             }
             
-            for _, row in df_original.iterrows():
-                original_lead_id = str(row[lead_id_column]).strip()
-                
-                # Check if this Lead ID is invalid
-                is_invalid_lead_id = False
-                for potential_id in [original_lead_id, original_lead_id.upper(), original_lead_id.lower()]:
-                    if potential_id in invalid_lead_ids_set:
-                        is_invalid_lead_id = True
-                        break
-                
-                # Try multiple formats to find a match (only for valid Lead IDs)
-                analysis = None
-                if not is_invalid_lead_id:
-                    for potential_id in [original_lead_id, original_lead_id.upper(), original_lead_id.lower()]:
-                        if potential_id in analysis_dict:
-                            analysis = analysis_dict[potential_id]
-                            break
-                
-                if not analysis:
-                    analysis = {}
-                
-                # 🔍 DEBUG: Log what we found for this lead
-                print(f"🔍 DEBUG: Lead ID '{original_lead_id}' analysis:")
-                print(f"   - Found analysis: {bool(analysis)}")
-                if analysis:
-                    print(f"   - Has confidence_assessment: {bool(analysis.get('confidence_assessment'))}")
-                    print(f"   - AI assessment status: {analysis.get('ai_assessment_status', 'NONE')}")
-                    print(f"   - not_in_TAM: {analysis.get('not_in_TAM', 'NONE')}")
-                    print(f"   - suspicious_enrichment: {analysis.get('suspicious_enrichment', 'NONE')}")
-                    confidence_assessment = analysis.get('confidence_assessment', {})
-                    if confidence_assessment:
-                        print(f"   - Confidence score: {confidence_assessment.get('confidence_score', 'NONE')}")
-                        print(f"   - Explanation bullets: {len(confidence_assessment.get('explanation_bullets', []))}")
-                        print(f"   - Corrections: {confidence_assessment.get('corrections', {})}")
-                        print(f"   - Inferences: {confidence_assessment.get('inferences', {})}")
-                
-                # Extract analysis data safely
-                confidence_assessment = analysis.get('confidence_assessment', {})
-                
-                # Handle case where confidence_assessment might be None
-                if confidence_assessment is None:
-                    confidence_assessment = {}
-                
-                # Update summary statistics (for debugging only - final metrics come from Salesforce)
-                if analysis:
-                    # Count quality issues
-                    if analysis.get('not_in_TAM') or analysis.get('suspicious_enrichment'):
-                        leads_with_issues += 1
-                    if analysis.get('not_in_TAM'):
-                        not_in_tam_count += 1
-                    if analysis.get('suspicious_enrichment'):
-                        suspicious_enrichment_count += 1
-                    
-                    # Count successful AI assessments
-                    if (confidence_assessment and 
-                        isinstance(confidence_assessment.get('confidence_score'), (int, float)) and 
-                        confidence_assessment.get('confidence_score') is not None):
-                        total_confidence_score += confidence_assessment.get('confidence_score', 0)
-                        successful_ai_assessments += 1
-                
-                # Joseph's Scores
-                acquisition_score = analysis.get('acquisition_completeness_score', '') if analysis else ''
-                enrichment_score = analysis.get('enrichment_completeness_score', '') if analysis else ''
-                analysis_columns['Acquisition_Score'].append(acquisition_score)
-                analysis_columns['Enrichment_Score'].append(enrichment_score)
-                
-                # AI Coherence Score
-                confidence_score = confidence_assessment.get('confidence_score', '') if confidence_assessment else ''
-                analysis_columns['AI_Coherence_Score'].append(confidence_score)
-                
-                # Final Confidence Score (weighted combination)
-                final_score = ''
-                if (acquisition_score and enrichment_score and confidence_score and 
-                    isinstance(acquisition_score, (int, float)) and 
-                    isinstance(enrichment_score, (int, float)) and 
-                    isinstance(confidence_score, (int, float))):
-                    final_score = round((acquisition_score * 0.15) + (enrichment_score * 0.15) + (confidence_score * 0.70), 1)
-                analysis_columns['Final_Confidence_Score'].append(final_score)
-                
-                # Explanation
-                explanation_bullets = confidence_assessment.get('explanation_bullets', []) if confidence_assessment else []
-                explanation_text = '\n'.join(explanation_bullets) if explanation_bullets else ''
-                analysis_columns['AI_Explanation'].append(explanation_text)
-                
-                # Corrections - handle empty dict properly
-                corrections = confidence_assessment.get('corrections', {}) if confidence_assessment else {}
-                corrections_text = json.dumps(corrections, indent=2) if corrections else ''
-                analysis_columns['AI_Corrections'].append(corrections_text)
-                
-                # Inferences - handle empty dict properly  
-                inferences = confidence_assessment.get('inferences', {}) if confidence_assessment else {}
-                inferences_text = json.dumps(inferences, indent=2) if inferences else ''
-                analysis_columns['AI_Inferences'].append(inferences_text)
-                
-                # Quality flags
-                analysis_columns['AI_Not_in_TAM'].append(
-                    'Yes' if analysis.get('not_in_TAM') else 'No'
-                )
-                
-                analysis_columns['AI_Suspicious_Enrichment'].append(
-                    'Yes' if analysis.get('suspicious_enrichment') else 'No'
-                )
-                
-                # AI Status - improved logic
-                if is_invalid_lead_id:
-                    ai_status = 'Invalid Lead ID'
-                elif analysis:
-                    # Debug logging for AI assessment status
-                    ai_assessment_status = analysis.get('ai_assessment_status', 'NONE')
-                    print(f"🔍 DEBUG: Lead ID '{original_lead_id}' - AI Assessment Status: '{ai_assessment_status}'")
-                    print(f"🔍 DEBUG: Lead ID '{original_lead_id}' - Has confidence score: {bool(confidence_assessment and isinstance(confidence_assessment.get('confidence_score'), (int, float)) and confidence_assessment.get('confidence_score') is not None)}")
-                    # Check if we have a valid confidence assessment
-                    has_confidence_score = (confidence_assessment and 
-                                          isinstance(confidence_assessment.get('confidence_score'), (int, float)) and 
-                                          confidence_assessment.get('confidence_score') is not None)
-                    
-                    if has_confidence_score:
-                        ai_status = 'Analyzed'
-                    elif analysis.get('ai_assessment_status') == 'success':
-                        ai_status = 'Analyzed'
-                    elif analysis.get('ai_assessment_status') and analysis.get('ai_assessment_status').startswith('failed:'):
-                        ai_status = 'AI Assessment Failed'
-                    elif analysis.get('ai_assessment_status'):
-                        ai_status = str(analysis.get('ai_assessment_status'))
-                    else:
-                        # If we have analysis data but no AI assessment, check if we have any AI data
-                        has_ai_data = (confidence_assessment and 
-                                     (confidence_assessment.get('explanation_bullets') or 
-                                      confidence_assessment.get('corrections') or 
-                                      confidence_assessment.get('inferences')))
-                        ai_status = 'Analyzed' if has_ai_data else 'Analysis Available'
-                else:
-                    ai_status = 'Not Analyzed'
-                
-                analysis_columns['AI_Status'].append(ai_status)
-            
-            # Add analysis columns to original DataFrame
-            for col_name, col_data in analysis_columns.items():
-                df_original[col_name] = col_data
-            
-            # Add a flag column for invalid Lead IDs
-            invalid_lead_id_flags = []
-            invalid_count = 0
-            for idx, (_, row) in enumerate(df_original.iterrows()):
-                original_lead_id = str(row[lead_id_column]).strip()
-                is_invalid = False
-                for potential_id in [original_lead_id, original_lead_id.upper(), original_lead_id.lower()]:
-                    if potential_id in invalid_lead_ids_set:
-                        is_invalid = True
-                        break
-                invalid_lead_id_flags.append(is_invalid)
-                if is_invalid:
-                    invalid_count += 1
-                    print(f"🔍 DEBUG: Row {idx}: Marked Lead ID '{original_lead_id}' as invalid")
-                else:
-                    print(f"🔍 DEBUG: Row {idx}: Lead ID '{original_lead_id}' is valid")
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"Error creating {str(output_format).upper()} with analysis: {str(e)}"
+            }
+    
+    def create_excel_with_analysis(self, original_data, analysis_results, lead_id_column, filename_prefix="excel_analysis", invalid_lead_ids=None):
+        """
+        Create Excel file combining original data with AI analysis results, handling invalid Lead IDs.
+        original_data can be a list of row dicts or a DataFrame; uploads too large to hold in memory
+        go through create_excel_with_analysis_from_upload instead.
+        """
+        try:
+            # Convert original data to DataFrame and handle NaN values
+            df_original = pd.DataFrame(original_data)
+            # Ensure no NaN values that could cause JSON serialization issues
+            df_original = df_original.where(pd.notnull(df_original), '')
             
-            print(f"🔍 DEBUG: Total invalid Lead IDs flagged: {invalid_count}")
-            df_original['_is_invalid_lead_id'] = invalid_lead_id_flags
+            analysis_df = self._build_analysis_frame(self._leads_from_results(analysis_results))
+            invalid_lead_ids_set = self._invalid_lead_id_set(invalid_lead_ids)
+            df_original, is_invalid, counts = self._merge_analysis_columns(df_original, analysis_df, lead_id_column, invalid_lead_ids_set)
             
-            # Remove the flag column from display (it's only used for styling)
-            df_display = df_original.drop(columns=['_is_invalid_lead_id'])
+            print(f"📊 Matched {counts['matched_rows']} of {len(df_original)} rows to analysis results "
+                  f"({int(is_invalid.sum())} invalid Lead IDs)")
             
-            # Create summary data for the summary section
-            # Calculate correct metrics based on the user's requirements
-            total_lead_ids = len(df_original)  # Total rows in input Excel file
-            invalid_lead_ids_count = len(invalid_lead_ids) if invalid_lead_ids else 0
-            valid_lead_ids_count = total_lead_ids - invalid_lead_ids_count  # Valid Lead IDs from validation step
+            summary_data = self._analysis_summary_data(analysis_results, len(df_original), invalid_lead_ids, counts)
+            return self._write_analysis_workbook([(df_original, is_invalid)], summary_data, filename_prefix)
             
-            # Get Salesforce summary data for analysis metrics
-            if hasattr(analysis_results, 'get') and isinstance(analysis_results, dict) and 'summary' in analysis_results:
-                sf_summary = analysis_results['summary']
-                
-                # AI assessments successful = valid Lead IDs that were successfully analyzed
-                ai_assessments_successful = valid_lead_ids_count
-                
-                # AI assessments failed = invalid Lead IDs (leads that couldn't be analyzed)
-                ai_assessments_failed = invalid_lead_ids_count
-                
-                summary_data = {
-                    'total_lead_ids': total_lead_ids,  # Total rows in input Excel file
-                    'valid_lead_ids': valid_lead_ids_count,  # Valid Lead IDs from validation step
-                    'invalid_lead_ids_count': invalid_lead_ids_count,  # Invalid Lead IDs from validation step
-                    'leads_with_issues': sf_summary.get('leads_with_issues', 0),  # Quality issues in valid leads
-                    'issue_percentage': sf_summary.get('issue_percentage', 0),
-                    'avg_confidence_score': sf_summary.get('avg_confidence_score', 0),  # Average of successful AI assessments
-                    'not_in_tam_count': sf_summary.get('not_in_tam_count', 0),
-                    'suspicious_enrichment_count': sf_summary.get('suspicious_enrichment_count', 0),
-                    'ai_assessments_successful': ai_assessments_successful,  # Successfully analyzed leads
-                    'ai_assessments_failed': ai_assessments_failed  # Invalid Lead IDs + AI failures
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"Error creating Excel with analysis: {str(e)}"
+            }
+    
+    def create_excel_with_analysis_from_upload(self, upload_id, sheet_name, lead_id_column, analysis_results, filename_prefix="excel_analysis", invalid_lead_ids=None, chunk_rows=None):
+        """
+        Create the Excel analysis export for a cached upload without loading the whole sheet.
+        The summary is computed from the (cached) Lead ID column, then the sheet is read in
+        chunks of chunk_rows rows, each chunk is joined with the analysis results and streamed
+        into the write-only workbook, so memory does not grow with the number of rows.
+        """
+        try:
+            lead_id_df = self._lead_id_frame(upload_id, sheet_name, lead_id_column)
+            if lead_id_df is None:
+                return {
+                    'success': False,
+                    'error': 'Upload not found or expired. Please upload the Excel file again.'
                 }
-                print(f"🔍 DEBUG: Calculated summary data: {summary_data}")
-            else:
-                # Fallback (should not happen with current implementation)
-                print(f"🔍 WARNING: No Salesforce summary data found, using calculated values")
-                
-                # Calculate AI assessments failed for fallback case
-                ai_assessments_failed = invalid_lead_ids_count
-                
-                summary_data = {
-                    'total_lead_ids': total_lead_ids,
-                    'valid_lead_ids': valid_lead_ids_count,
-                    'invalid_lead_ids_count': invalid_lead_ids_count,
-                    'leads_with_issues': leads_with_issues,
-                    'issue_percentage': round((leads_with_issues / valid_lead_ids_count) * 100, 2) if valid_lead_ids_count > 0 else 0,
-                    'avg_confidence_score': round((total_confidence_score / successful_ai_assessments) if successful_ai_assessments > 0 else 0, 1),
-                    'not_in_tam_count': not_in_tam_count,
-                    'suspicious_enrichment_count': suspicious_enrichment_count,
-                    'ai_assessments_successful': valid_lead_ids_count,
-                    'ai_assessments_failed': ai_assessments_failed
+            if lead_id_df.attrs.get('column_missing'):
+                return {
+                    'success': False,
+                    'error': f"Column '{lead_id_column}' not found in sheet '{sheet_name}'"
                 }
             
-            # Create Excel file with formatting
-            wb = Workbook()
-            ws = wb.active
-            assert ws is not None  # Type assertion for linter
-            ws.title = "Analysis Results"
-            
-            # Add title with RingCentral styling
-            current_row = 1
-            ws.merge_cells(f'A{current_row}:{get_column_letter(len(df_display.columns))}{current_row}')
-            ws[f'A{current_row}'] = "Excel Upload Analysis Results"
-            ws[f'A{current_row}'].font = self.title_font
-            ws[f'A{current_row}'].alignment = self.center_alignment
-            current_row += 1
-            
-            # Add timestamp
-            ws.merge_cells(f'A{current_row}:{get_column_letter(len(df_display.columns))}{current_row}')
-            ws[f'A{current_row}'] = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            ws[f'A{current_row}'].alignment = self.center_alignment
-            current_row += 2
+            analysis_df = self._build_analysis_frame(self._leads_from_results(analysis_results))
+            invalid_lead_ids_set = self._invalid_lead_id_set(invalid_lead_ids)
+            chunk_rows = chunk_rows or Config.UPLOAD_READ_CHUNK_ROWS
             
-            # Add summary section
-            current_row = self._add_summary_section(ws, summary_data, None, current_row)
-            current_row += 1
+            # The summary is written above the rows, so count matches first - blank Lead IDs never
+            # match, so the non-empty Lead ID column is enough (counts are summed chunk by chunk)
+            counts = {}
+            invalid_rows = 0
+            for start in range(0, max(len(lead_id_df), 1), chunk_rows):
+                _, is_invalid, chunk_counts = self._merge_analysis_columns(
+                    lead_id_df.iloc[start:start + chunk_rows].copy(), analysis_df, lead_id_column, invalid_lead_ids_set
+                )
+                invalid_rows += int(is_invalid.sum())
+                for key, value in chunk_counts.items():
+                    counts[key] = counts.get(key, 0) + value
+            total_rows = lead_id_df.attrs['total_rows']
+            print(f"📊 Matched {counts['matched_rows']} of {total_rows} rows to analysis results "
+                  f"({invalid_rows} invalid Lead IDs)")
+            summary_data = self._analysis_summary_data(analysis_results, total_rows, invalid_lead_ids, counts)
             
-            # Add headers 
-            header_row = current_row
-            for col_idx, header in enumerate(df_display.columns, 1):
-                cell = ws.cell(row=header_row, column=col_idx, value=header)
-                cell.font = self.header_font
-                cell.fill = self.header_fill
-                cell.alignment = self.center_alignment
-                cell.border = self.border
+            chunks = self._iter_upload_chunks(upload_id, sheet_name, lead_id_column, chunk_rows)
+            if chunks is None:
+                return {
+                    'success': False,
+                    'error': 'Upload not found or expired. Please upload the Excel file again.'
+                }
+            merged_chunks = self._iter_merged_chunks(chunks, analysis_df, lead_id_column, invalid_lead_ids_set)
+            return self._write_analysis_workbook(merged_chunks, summary_data, filename_prefix)
             
-            current_row += 1
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"Error creating Excel with analysis: {str(e)}"
+            }
+    
+    def create_file_with_analysis_from_upload(self, upload_id, sheet_name, lead_id_column, analysis_results, filename_prefix="excel_analysis", invalid_lead_ids=None, output_format=FORMAT_XLSX, chunk_rows=None):
+        """
+        Create the analysis export for a cached upload in the requested output format.
+        xlsx goes through create_excel_with_analysis_from_upload; CSV and Parquet are streamed
+        chunk by chunk the same way (see file_formats.write_table_chunks), without a summary section.
+        """
+        if output_format == FORMAT_XLSX:
+            return self.create_excel_with_analysis_from_upload(
+                upload_id, sheet_name, lead_id_column, analysis_results, filename_prefix, invalid_lead_ids, chunk_rows
+            )
+        
+        try:
+            if output_format not in file_formats.OUTPUT_FORMATS:
+                raise ValueError(f"Unsupported output format '{output_format}'")
             
-            # Add data rows
-            for row_idx, (_, row) in enumerate(df_original.iterrows(), current_row):
-                # Check if this row has an invalid Lead ID
-                is_invalid_row = row['_is_invalid_lead_id'] if '_is_invalid_lead_id' in row else False
-                
-                # Debug logging for invalid rows
-                if is_invalid_row:
-                    print(f"🔍 DEBUG: Row {row_idx} is marked as invalid Lead ID")
-                    print(f"🔍 DEBUG: Row data keys: {list(row.keys())}")
-                    print(f"🔍 DEBUG: Invalid flag value: {row['_is_invalid_lead_id']}")
-                
-                # Get display row (without the flag column)
-                display_row = row.drop('_is_invalid_lead_id')
-                
-                for col_idx, value in enumerate(display_row, 1):
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                    cell.border = self.border
-                    
-                    # Apply red background for invalid Lead ID rows (PRIORITY 1)
-                    header = df_display.columns[col_idx - 1]
-                    if is_invalid_row:
-                        # Light red background for invalid Lead ID rows - this takes priority
-                        cell.fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")  # Light red
-                        cell.font = Font(color="CC0000", bold=True)  # Dark red text, bold for contrast
-                        cell.alignment = self.center_alignment
-                        print(f"🔍 DEBUG: Applied light red styling to row {row_idx}, column {col_idx} ({header})")
-                        continue  # Skip other styling for invalid rows
-                    
-                    # Special formatting for AI columns with RingCentral colors (only for valid rows)
-                    if header in ['AI_Not_in_TAM', 'AI_Suspicious_Enrichment']:
-                        cell.alignment = self.center_alignment
-                        if value == 'Yes':
-                            # Light red background for issues
-                            cell.fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
-                            cell.font = Font(bold=True, color=self.rc_warm_black)
-                    elif header == 'AI_Confidence_Score':
-                        cell.alignment = self.center_alignment
-                        cell.font = Font(bold=True, color="FFFFFF")
-                        if isinstance(value, (int, float)) and value > 0:
-                            if value >= 80:
-                                # High confidence: RingCentral Cerulean (primary blue)
-                                cell.fill = PatternFill(start_color=self.rc_cerulean, end_color=self.rc_cerulean, fill_type="solid")
-                            elif value >= 60:
-                                # Medium confidence: RingCentral Orange
-                                cell.fill = PatternFill(start_color=self.rc_orange, end_color=self.rc_orange, fill_type="solid")
-                            else:
-                                # Low confidence: Muted red
-                                cell.fill = PatternFill(start_color="DC3545", end_color="DC3545", fill_type="solid")
-                    elif header in ['AI_Explanation', 'AI_Corrections', 'AI_Inferences']:
-                        cell.alignment = self.wrap_alignment
-            
-            # Auto-adjust column widths
-            for col_idx, header in enumerate(df_display.columns, 1):
-                if header.startswith('AI_'):
-                    if header in ['AI_Explanation', 'AI_Corrections', 'AI_Inferences']:
-                        ws.column_dimensions[get_column_letter(col_idx)].width = 40
-                    elif header == 'AI_Confidence_Score':
-                        ws.column_dimensions[get_column_letter(col_idx)].width = 15
-                    else:
-                        ws.column_dimensions[get_column_letter(col_idx)].width = 18
-                else:
-                    # Auto-size original columns
-                    ws.column_dimensions[get_column_letter(col_idx)].width = 20
+            lead_id_df = self._lead_id_frame(upload_id, sheet_name, lead_id_column)
+            chunks = self._iter_upload_chunks(upload_id, sheet_name, lead_id_column, chunk_rows)
+            if lead_id_df is None or chunks is None:
+                return {
+                    'success': False,
+                    'error': 'Upload not found or expired. Please upload the Excel file again.'
+                }
+            if lead_id_df.attrs.get('column_missing'):
+                return {
+                    'success': False,
+                    'error': f"Column '{lead_id_column}' not found in sheet '{sheet_name}'"
+                }
             
-            # Create file buffer
-            file_buffer = io.BytesIO()
-            wb.save(file_buffer)
-            file_buffer.seek(0)
+            analysis_df = self._build_analysis_frame(self._leads_from_results(analysis_results))
+            invalid_lead_ids_set = self._invalid_lead_id_set(invalid_lead_ids)
+            merged_chunks = self._iter_merged_chunks(chunks, analysis_df, lead_id_column, invalid_lead_ids_set)
             
-            # Generate filename
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{filename_prefix}_{timestamp}.xlsx"
+            filename = f"{filename_prefix}_{timestamp}{file_formats.OUTPUT_FORMATS[output_format][0]}"
+            file_path = self.export_store.new_export_path(filename)
+            file_formats.write_table_chunks((chunk for chunk, _ in merged_chunks), file_path, output_format)
             
             return {
                 'success': True,
-                'file_buffer': file_buffer,
+                'file_path': file_path,
                 'filename': filename
             }
             
         except Exception as e:
             return {
                 'success': False,
-                'error': f"Error creating Excel with analysis: {str(e)}"
-            } 
\ No newline at end of file
+                'error': f"Error creating {str(output_format).upper()} with analysis: {str(e)}"
+            }
+    
+    def _iter_upload_chunks(self, upload_id, sheet_name, lead_id_column, chunk_rows=None):
+        """Row chunks of a cached upload's sheet (xlsx, CSV or Parquet), or None if the upload is gone"""
+        file_format = self._upload_format(upload_id)
+        source_path = self.upload_store.source_path(upload_id)
+        if not file_format or not source_path:
+            return None
+        chunk_rows = chunk_rows or Config.UPLOAD_READ_CHUNK_ROWS
+        if file_format == FORMAT_XLSX:
+            return self._iter_sheet_chunks(source_path, sheet_name, lead_id_column, chunk_rows)
+        return file_formats.iter_table_chunks(source_path, file_format, lead_id_column, chunk_rows)
+    
+    def _iter_merged_chunks(self, chunks, analysis_df, lead_id_column, invalid_lead_ids_set):
+        """Join each chunk of original rows with the analysis results, yielding (DataFrame, is_invalid) pairs"""
+        for chunk in chunks:
+            chunk = chunk.where(pd.notnull(chunk), '')
+            chunk, chunk_is_invalid, _ = self._merge_analysis_columns(chunk, analysis_df, lead_id_column, invalid_lead_ids_set)
+            yield chunk, chunk_is_invalid
+    
+    def _analysis_summary_data(self, analysis_results, total_lead_ids, invalid_lead_ids, counts):
+        """Summary section values for the Excel analysis export"""
+        # Create summary data for the summary section
+        # Calculate correct metrics based on the user's requirements
+        invalid_lead_ids_count = len(invalid_lead_ids) if invalid_lead_ids else 0
+        valid_lead_ids_count = total_lead_ids - invalid_lead_ids_count  # Valid Lead IDs from validation step
+        
+        # Get Salesforce summary data for analysis metrics
+        if hasattr(analysis_results, 'get') and isinstance(analysis_results, dict) and 'summary' in analysis_results:
+            sf_summary = analysis_results['summary']
+            
+            # AI assessments successful = valid Lead IDs that were successfully analyzed
+            ai_assessments_successful = valid_lead_ids_count
+            
+            # AI assessments failed = invalid Lead IDs (leads that couldn't be analyzed)
+            ai_assessments_failed = invalid_lead_ids_count
+            
+            summary_data = {
+                'total_lead_ids': total_lead_ids,  # Total rows in input Excel file
+                'valid_lead_ids': valid_lead_ids_count,  # Valid Lead IDs from validation step
+                'invalid_lead_ids_count': invalid_lead_ids_count,  # Invalid Lead IDs from validation step
+                'leads_with_issues': sf_summary.get('leads_with_issues', 0),  # Quality issues in valid leads
+                'issue_percentage': sf_summary.get('issue_percentage', 0),
+                'avg_confidence_score': sf_summary.get('avg_confidence_score', 0),  # Average of successful AI assessments
+                'not_in_tam_count': sf_summary.get('not_in_tam_count', 0),
+                'suspicious_enrichment_count': sf_summary.get('suspicious_enrichment_count', 0),
+                'ai_assessments_successful': ai_assessments_successful,  # Successfully analyzed leads
+                'ai_assessments_failed': ai_assessments_failed  # Invalid Lead IDs + AI failures
+            }
+            print(f"🔍 DEBUG: Calculated summary data: {summary_data}")
+        else:
+            # Fallback (should not happen with current implementation)
+            print(f"🔍 WARNING: No Salesforce summary data found, using calculated values")
+            
+            # Calculate AI assessments failed for fallback case
+            ai_assessments_failed = invalid_lead_ids_count
+            
+            summary_data = {
+                'total_lead_ids': total_lead_ids,
+                'valid_lead_ids': valid_lead_ids_count,
+                'invalid_lead_ids_count': invalid_lead_ids_count,
+                'leads_with_issues': counts['leads_with_issues'],
+                'issue_percentage': round((counts['leads_with_issues'] / valid_lead_ids_count) * 100, 2) if valid_lead_ids_count > 0 else 0,
+                'avg_confidence_score': round((counts['total_confidence_score'] / counts['successful_ai_assessments']) if counts['successful_ai_assessments'] > 0 else 0, 1),
+                'not_in_tam_count': counts['not_in_tam_count'],
+                'suspicious_enrichment_count': counts['suspicious_enrichment_count'],
+                'ai_assessments_successful': valid_lead_ids_count,
+                'ai_assessments_failed': ai_assessments_failed
+            }
+        return summary_data
+    
+    def _start_analysis_sheet(self, sheet, columns):
+        """Set the column widths of an analysis results sheet (must happen before any rows are written)"""
+        for col_idx, header in enumerate(columns, 1):
+            header = str(header)
+            if header.startswith('AI_'):
+                if header in ['AI_Explanation', 'AI_Corrections', 'AI_Inferences']:
+                    sheet.ws.column_dimensions[get_column_letter(col_idx)].width = 40
+                elif header == 'AI_Confidence_Score':
+                    sheet.ws.column_dimensions[get_column_letter(col_idx)].width = 15
+                else:
+                    sheet.ws.column_dimensions[get_column_letter(col_idx)].width = 18
+            else:
+                # Auto-size original columns
+                sheet.ws.column_dimensions[get_column_letter(col_idx)].width = 20
+    
+    def _write_analysis_workbook(self, merged_chunks, summary_data, filename_prefix):
+        """
+        Stream merged rows into the Excel analysis export.
+        
+        Args:
+            merged_chunks: Iterable of (DataFrame, is_invalid) pairs from _merge_analysis_columns,
+                with at least one (possibly empty) chunk so the columns are known
+            summary_data: Values for the summary section (see _analysis_summary_data)
+            filename_prefix: Prefix of the export filename
+        """
+        merged_chunks = iter(merged_chunks)
+        first_chunk = next(merged_chunks)
+        columns = list(first_chunk[0].columns)
+        
+        # Create Excel file with a streaming write-only workbook
+        wb, sheet = self._create_streaming_workbook("Analysis Results")
+        last_column = get_column_letter(len(columns))
+        
+        # Column widths must be set before any rows are written
+        self._start_analysis_sheet(sheet, columns)
+        
+        # Add title and timestamp with RingCentral styling
+        current_row = self._add_title_rows(sheet, "Excel Upload Analysis Results", last_column, last_column)
+        
+        # Add summary section
+        current_row = self._add_summary_section(sheet, summary_data, None, current_row)
+        sheet.append([])
+        current_row += 1
+        
+        # Add headers 
+        header_cells = [sheet.cell(header, 'rc_header') for header in columns]
+        sheet.append(header_cells)
+        
+        # Per-column styles for valid rows (invalid Lead ID rows are styled red across the board)
+        column_styles = []
+        score_columns = []
+        for col_idx, header in enumerate(columns, 1):
+            if header in ['AI_Not_in_TAM', 'AI_Suspicious_Enrichment']:
+                column_styles.append('flag')
+            elif header in ['AI_Coherence_Score', 'Final_Confidence_Score', 'AI_Confidence_Score']:
+                column_styles.append('rc_score')
+                score_columns.append(get_column_letter(col_idx))
+            elif header in ['AI_Explanation', 'AI_Corrections', 'AI_Inferences']:
+                column_styles.append('rc_text')
+            else:
+                column_styles.append('rc_cell')
+        
+        # Add data rows chunk by chunk
+        data_ranges = [(sheet, sheet.rows_written + 1)]
+        for df_chunk, is_invalid in itertools.chain([first_chunk], merged_chunks):
+            invalid_flags = is_invalid.tolist()
+            for is_invalid_row, row_values in zip(invalid_flags, df_chunk.itertuples(index=False, name=None)):
+                if sheet.rows_written >= EXCEL_MAX_ROWS:
+                    # Sheet is full - continue on a new sheet with the same headers
+                    sheet = sheet.add_sheet(f"Analysis Results ({len(data_ranges) + 1})")
+                    self._start_analysis_sheet(sheet, columns)
+                    sheet.append([sheet.cell(header, 'rc_header') for header in columns])
+                    data_ranges.append((sheet, sheet.rows_written + 1))
+                
+                if is_invalid_row:
+                    sheet.append([sheet.cell(value, 'rc_invalid') for value in row_values])
+                    continue
+                
+                cells = []
+                for value, column_style in zip(row_values, column_styles):
+                    if column_style == 'flag':
+                        style = 'rc_flag_issue' if value == 'Yes' else 'rc_flag'
+                    else:
+                        style = column_style
+                    cells.append(sheet.cell(value, style))
+                sheet.append(cells)
+        
+        # Score colours as one conditional-formatting range per score column and sheet
+        # (invalid Lead ID rows have no scores, so the rules leave them untouched)
+        for data_sheet, first_row in data_ranges:
+            if data_sheet.rows_written >= first_row:
+                for column in score_columns:
+                    excel_styles.add_score_formatting(data_sheet.ws, f'{column}{first_row}:{column}{data_sheet.rows_written}')
+        
+        # Generate filename and write the workbook straight to the export directory
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"{filename_prefix}_{timestamp}.xlsx"
+        file_path = self.export_store.new_export_path(filename)
+        wb.save(file_path)
+        
+        return {
+            'success': True,
+            'file_path': file_path,
+            'filename': filename
+        }
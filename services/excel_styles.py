@@ -0,0 +1,106 @@
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.formatting.rule import FormulaRule
+
+# Shared style registry for Excel exports.
+# Fonts, fills, borders and alignments are built once and reused by every export; each
+# workbook registers its own NamedStyle objects built from them (openpyxl binds a named
+# style to the workbook it is added to). Score colours are native conditional-formatting
+# rules added once per column range, so score cells all share the plain 'rc_score' style.
+
+# RingCentral Brand Colors
+RC_CERULEAN = "0684BC"      # RingCentral primary blue
+RC_ORANGE = "FF7A00"        # RingCentral orange
+RC_OCEAN = "002855"         # RingCentral dark blue
+RC_LINEN = "F1EFEC"         # RingCentral background
+RC_ASH = "C8C2B4"           # RingCentral light gray
+RC_WARM_BLACK = "2B2926"    # RingCentral dark gray
+
+# Score bands: >= high is high, >= medium is medium, anything else above 0 is low
+SCORE_HIGH_THRESHOLD = 80
+SCORE_MEDIUM_THRESHOLD = 60
+
+
+def _solid_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+# Excel Styling with RingCentral Colors
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = _solid_fill(RC_CERULEAN)
+SUMMARY_FONT = Font(bold=True, color=RC_OCEAN)
+SUMMARY_FILL = _solid_fill(RC_LINEN)
+TITLE_FONT = Font(bold=True, size=16, color=RC_OCEAN)
+LABEL_FONT = Font(bold=True)
+SCORE_FONT = Font(bold=True, color="FFFFFF")
+FLAG_ISSUE_FONT = Font(bold=True, color=RC_WARM_BLACK)
+INVALID_FONT = Font(color="CC0000", bold=True)
+ISSUE_FILL = _solid_fill("FFE6E6")
+THIN_BORDER = Border(
+    left=Side(style='thin', color=RC_ASH),
+    right=Side(style='thin', color=RC_ASH),
+    top=Side(style='thin', color=RC_ASH),
+    bottom=Side(style='thin', color=RC_ASH)
+)
+CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+WRAP_ALIGNMENT = Alignment(horizontal='left', vertical='top', wrap_text=True)
+
+# Score fills (Joseph's scores use purple for the high band)
+SCORE_HIGH_FILL = _solid_fill(RC_CERULEAN)
+SCORE_HIGH_JOSEPH_FILL = _solid_fill("663399")
+SCORE_MEDIUM_FILL = _solid_fill(RC_ORANGE)
+SCORE_LOW_FILL = _solid_fill("DC3545")
+
+
+def _named_style(name, font=None, fill=None, alignment=None, border=None):
+    style = NamedStyle(name=name)
+    if font is not None:
+        style.font = font
+    if fill is not None:
+        style.fill = fill
+    if alignment is not None:
+        style.alignment = alignment
+    if border is not None:
+        style.border = border
+    return style
+
+
+def build_named_styles():
+    """Named styles used by the export engine (a new set per workbook, built from the shared objects)"""
+    return [
+        _named_style('rc_title', font=TITLE_FONT, alignment=CENTER_ALIGNMENT),
+        _named_style('rc_center', alignment=CENTER_ALIGNMENT),
+        _named_style('rc_section', font=SUMMARY_FONT, fill=SUMMARY_FILL),
+        _named_style('rc_label', font=LABEL_FONT),
+        _named_style('rc_wrap', alignment=WRAP_ALIGNMENT),
+        _named_style('rc_header', font=HEADER_FONT, fill=HEADER_FILL, alignment=CENTER_ALIGNMENT, border=THIN_BORDER),
+        _named_style('rc_cell', border=THIN_BORDER),
+        _named_style('rc_text', alignment=WRAP_ALIGNMENT, border=THIN_BORDER),
+        _named_style('rc_flag', alignment=CENTER_ALIGNMENT, border=THIN_BORDER),
+        _named_style('rc_flag_issue', font=FLAG_ISSUE_FONT, fill=ISSUE_FILL, alignment=CENTER_ALIGNMENT, border=THIN_BORDER),
+        _named_style('rc_invalid', font=INVALID_FONT, fill=ISSUE_FILL, alignment=CENTER_ALIGNMENT, border=THIN_BORDER),
+        # Scores: white bold text; the band fill comes from add_score_formatting
+        _named_style('rc_score', font=SCORE_FONT, alignment=CENTER_ALIGNMENT, border=THIN_BORDER),
+    ]
+
+
+def add_score_formatting(ws, cell_range, high_fill=SCORE_HIGH_FILL):
+    """
+    Colour a range of score cells by band with conditional-formatting rules.
+
+    Args:
+        ws: Worksheet (write-only worksheets work too; rules are written when the sheet is closed)
+        cell_range: Range of score cells, e.g. 'T6:T5005'
+        high_fill: Fill for the high band
+    """
+    # Formulas are relative to the top-left cell; ISNUMBER keeps text and blank cells unfilled
+    first_cell = cell_range.split(':')[0]
+    bands = [
+        (f'{first_cell}>={SCORE_HIGH_THRESHOLD}', high_fill),
+        (f'{first_cell}>={SCORE_MEDIUM_THRESHOLD}', SCORE_MEDIUM_FILL),
+        (f'{first_cell}>0', SCORE_LOW_FILL),
+    ]
+    for condition, fill in bands:
+        ws.conditional_formatting.add(
+            cell_range,
+            FormulaRule(formula=[f'AND(ISNUMBER({first_cell}),{condition})'], fill=fill, stopIfTrue=True)
+        )
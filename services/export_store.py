@@ -0,0 +1,66 @@
+import os
+import time
+import uuid
+import threading
+from config.config import Config
+
+
+class ExportStore:
+    """
+    Managed directory for generated export files.
+    Exports are written straight to disk and served from there, so a download never
+    keeps a full copy of the workbook in worker memory. Old files are removed after
+    the retention period (kept long enough for resumed/range downloads).
+    """
+
+    def __init__(self, export_dir=None, retention_seconds=None, cleanup_interval_seconds=60):
+        self.export_dir = export_dir or Config.EXPORT_DIR
+        self.retention_seconds = retention_seconds if retention_seconds is not None else Config.EXPORT_RETENTION_SECONDS
+        self.cleanup_interval_seconds = cleanup_interval_seconds
+        self._last_cleanup = 0
+        self._lock = threading.Lock()
+
+    def new_export_path(self, filename):
+        """Reserve a unique path in the export directory for a new export file"""
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.cleanup_expired()
+        return os.path.join(self.export_dir, f"{uuid.uuid4().hex}_{filename}")
+
+    def resolve(self, export_name):
+        """Resolve an export name (as returned by export_name()) to its path, or None if missing/expired"""
+        if not export_name or os.path.basename(export_name) != export_name:
+            return None
+        file_path = os.path.join(self.export_dir, export_name)
+        return file_path if os.path.isfile(file_path) else None
+
+    def export_name(self, file_path):
+        """Public name of an export file (used in download URLs)"""
+        return os.path.basename(file_path)
+
+    def download_name(self, export_name):
+        """Original filename of an export (without the unique prefix)"""
+        return export_name.split('_', 1)[1] if '_' in export_name else export_name
+
+    def cleanup_expired(self, force=False):
+        """Delete export files older than the retention period (at most once per cleanup interval)"""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_cleanup < self.cleanup_interval_seconds:
+                return 0
+            self._last_cleanup = now
+
+        removed = 0
+        try:
+            entries = list(os.scandir(self.export_dir))
+        except FileNotFoundError:
+            return 0
+
+        for entry in entries:
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > self.retention_seconds:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                # Already removed by another worker
+                continue
+        return removed
@@ -0,0 +1,190 @@
+import os
+import pandas as pd
+from config.config import Config
+
+# Input/output formats for lead files alongside xlsx.
+# CSV is read in row chunks so multi-hundred-MB exports never sit in memory twice;
+# Parquet support needs pyarrow, which is imported only when a Parquet file is used.
+
+FORMAT_XLSX = 'xlsx'
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+
+INPUT_EXTENSIONS = {
+    '.xlsx': FORMAT_XLSX,
+    '.xls': FORMAT_XLSX,
+    '.csv': FORMAT_CSV,
+    '.parquet': FORMAT_PARQUET
+}
+
+# Output format -> (file extension, mimetype)
+OUTPUT_FORMATS = {
+    FORMAT_XLSX: ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    FORMAT_CSV: ('.csv', 'text/csv'),
+    FORMAT_PARQUET: ('.parquet', 'application/vnd.apache.parquet')
+}
+
+# CSV and Parquet files have a single table; it is exposed under this sheet name
+FLAT_FILE_SHEET_NAME = 'Data'
+
+CSV_ENCODING = 'utf-8-sig'
+
+# Analysis columns written as numbers in Parquet output
+NUMERIC_ANALYSIS_COLUMNS = ['Acquisition_Score', 'Enrichment_Score', 'Coherence_Score', 'AI_Coherence_Score', 'Final_Confidence_Score']
+
+
+def detect_format(filename):
+    """Input format for a filename based on its extension, or None if unsupported"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    return INPUT_EXTENSIONS.get(extension)
+
+
+def mimetype_for(filename):
+    """Mimetype of an export file based on its extension"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    for output_extension, mimetype in OUTPUT_FORMATS.values():
+        if extension == output_extension:
+            return mimetype
+    return 'application/octet-stream'
+
+
+def _parquet():
+    """Import pyarrow.parquet, with a clear error when Parquet support is not installed"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet support requires pyarrow (pip install pyarrow)")
+    return pq
+
+
+def read_preview(path, file_format, preview_rows=10):
+    """
+    Headers, first rows and total row count of a CSV or Parquet file.
+
+    Returns:
+        headers: Column names
+        preview_data: Up to preview_rows rows as lists of strings
+        total_rows: Number of data rows
+    """
+    if file_format == FORMAT_PARQUET:
+        parquet_file = _parquet().ParquetFile(path)
+        headers = parquet_file.schema_arrow.names
+        preview = next(parquet_file.iter_batches(batch_size=preview_rows), None)
+        preview_df = preview.to_pandas() if preview is not None else pd.DataFrame(columns=headers)
+        preview_df = preview_df.astype(str).where(preview_df.notna(), '')
+        return headers, preview_df.values.tolist(), parquet_file.metadata.num_rows
+
+    headers = list(pd.read_csv(path, nrows=0, encoding=CSV_ENCODING).columns)
+    preview_data = []
+    total_rows = 0
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, encoding=CSV_ENCODING,
+                             chunksize=Config.UPLOAD_READ_CHUNK_ROWS):
+        if len(preview_data) < preview_rows:
+            preview_data.extend(chunk.head(preview_rows - len(preview_data)).values.tolist())
+        total_rows += len(chunk)
+    return headers, preview_data, total_rows
+
+
+def read_column(path, file_format, column):
+    """
+    Read a single column as strings (missing values stay NaN).
+
+    Returns:
+        values: Series of the column values, or None if the column does not exist
+        total_rows: Number of data rows
+    """
+    if file_format == FORMAT_PARQUET:
+        parquet_file = _parquet().ParquetFile(path)
+        if column not in parquet_file.schema_arrow.names:
+            return None, 0
+        values = pd.read_parquet(path, columns=[column])[column]
+        return values.astype(str).where(values.notna()), len(values)
+
+    if column not in pd.read_csv(path, nrows=0, encoding=CSV_ENCODING).columns:
+        return None, 0
+    chunks = [
+        chunk[column] for chunk in pd.read_csv(path, usecols=[column], dtype=str, encoding=CSV_ENCODING,
+                                               chunksize=Config.UPLOAD_READ_CHUNK_ROWS)
+    ]
+    values = pd.concat(chunks, ignore_index=True) if chunks else pd.Series([], dtype=object)
+    return values, len(values)
+
+
+def iter_table_chunks(path, file_format, lead_id_column, chunk_rows=None):
+    """
+    Read a CSV or Parquet file in row chunks, keeping the Lead ID column as strings.
+    At least one (possibly empty) chunk is always yielded.
+    """
+    chunk_rows = chunk_rows or Config.UPLOAD_READ_CHUNK_ROWS
+    if file_format == FORMAT_PARQUET:
+        parquet_file = _parquet().ParquetFile(path)
+        yielded = False
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            df = batch.to_pandas()
+            if lead_id_column in df.columns:
+                df[lead_id_column] = df[lead_id_column].astype(str).where(df[lead_id_column].notna())
+            yielded = True
+            yield df
+        if not yielded:
+            yield pd.DataFrame(columns=parquet_file.schema_arrow.names)
+        return
+
+    yielded = False
+    for chunk in pd.read_csv(path, dtype={lead_id_column: str}, encoding=CSV_ENCODING, chunksize=chunk_rows):
+        yielded = True
+        yield chunk
+    if not yielded:
+        yield pd.read_csv(path, nrows=0, encoding=CSV_ENCODING)
+
+
+def _parquet_frame(df, strings=False):
+    """
+    Parquet-ready copy of a DataFrame: analysis scores as numbers and object columns as strings
+    (Excel-sourced columns can mix types, which Parquet columns cannot). With strings=True every
+    other column is written as strings too, so chunks with differently inferred types share a schema.
+    """
+    df = df.copy()
+    for column in df.columns:
+        if column in NUMERIC_ANALYSIS_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+        elif strings or df[column].dtype == object:
+            df[column] = df[column].astype(str)
+    return df
+
+
+def write_table(df, path, file_format):
+    """Write a DataFrame with analysis columns as CSV or Parquet"""
+    if file_format == FORMAT_PARQUET:
+        _parquet()
+        _parquet_frame(df).to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def write_table_chunks(chunks, path, file_format):
+    """
+    Write DataFrame chunks with analysis columns as one CSV or Parquet file without
+    holding more than one chunk in memory. At least one (possibly empty) chunk is expected.
+    Streamed Parquet output stores the original columns as strings: types inferred per
+    chunk can disagree, and every row group must share the schema of the first.
+    """
+    if file_format == FORMAT_PARQUET:
+        pq = _parquet()
+        import pyarrow as pa
+        writer = None
+        try:
+            for chunk in chunks:
+                chunk = _parquet_frame(chunk, strings=True)
+                if writer is None:
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(path, index=False, header=header, mode='w' if header else 'a')
+        header = False
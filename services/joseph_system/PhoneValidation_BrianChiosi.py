@@ -1,6 +1,503 @@
 import re
 import csv
+import os
+import sys
 import time
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+# Normalization patterns, compiled once at import
+MULTI_SPACE_RE = re.compile(r" +")
+EXTENSION_MARKER_RE = re.compile(r" *(extension|x?ext\.|ext:|ext|xt|ex|x+|loc|wzr|\*|#) *")
+PLUS_RE = re.compile(r"\++ *")
+NON_DIGIT_RE = re.compile(r"\D")
+DIGIT_RE = re.compile(r"\d")
+EXTENSION_JUNK_RE = re.compile(r"[^\d x]")
+EXTENSION_SPACING_RE = re.compile(r"x[ ]+")
+# Runs of anything other than + and digits collapse to a single space
+NON_DIAL_RUN_RE = re.compile(r"[^\+\d]+")
+
+# Trailing extensions written without a marker: (number pattern, number group, extension group)
+TRAILING_EXTENSION_PATTERNS = [
+    (re.compile(r"(\d{10}) \(?(\d+)\)?"), 1, 2),  # DDDDDDDDDD (E+)
+    (re.compile(r"(\d{3}[-\.]\d{3}[-\.]\d{4}) \(?(\d+)\)?"), 1, 2),  # DDD-DDD-DDDD (E+)
+    (
+        re.compile(r"(\(\d{3}\)[-\. ]?\d{3}[-\. ]?\d{4}) -?\(?(\d+)\)?"),
+        1,
+        2,
+    ),  # (DDD) DDD-DDDD (E+)
+]
+
+# US & CA Phone Numbers: (pattern, area code group, exchange group, line group)
+US_CA_PATTERNS = [
+    (
+        re.compile(r"^(\+1|1)?[-\. ]?\(?(\d{3})\)?[-\. ]?(\d{3})[-\. ]?(\d{4})$"),
+        2,
+        3,
+        4,
+    ),  # 10 Digit NSN
+    (
+        re.compile(r"^\(?(\+1|1)?\)?[-\. ]?(\d{3})[-\. ]?(\d{3})[-\. ]?(\d{4})$"),
+        2,
+        3,
+        4,
+    ),  # 10 Digit NSN
+]
+
+# UK Phone Numbers: general prefix followed by the specific number types
+UK_NUMBER_PATTERNS = [
+    r"1\d{9}",  # 10 Digit NSN
+    r"2\d{9}",  # 10 Digit NSN
+    r"3\d{9}",  # 10 Digit NSN
+    r"7\d{9}",  # 10 Digit NSN
+    r"8\d{9}",  # 10 Digit NSN
+    r"9\d{9}",  # 10 Digit NSN
+    r"55\d{8}",  # 10 Digit NSN
+    r"56\d{8}",  # 10 Digit NSN
+    r"1\d{8}",  # 9 Digit NSN
+    r"800\d{6}",  # 9 Digit NSN
+]
+UK_RE = re.compile(r"^(?:44|0|440)(" + "|".join(UK_NUMBER_PATTERNS) + ")$")
+
+# +1 North America Valid Area Codes
+AREA_CODES_1 = [
+    ("North America", "United States", "Alabama", r"(205|251|256|334|659|938)"),
+    ("North America", "United States", "Alaska", r"(907)"),
+    ("North America", "United States", "Arizona", r"(480|520|602|623|928)"),
+    ("North America", "United States", "Arkansas", r"(327|479|501|870)"),
+    (
+        "North America",
+        "United States",
+        "California",
+        r"(209|213|279|310|323|341|350|369|408|415|424|442|510|530|559|562|619|626|628|650|657|661|669|707|714|747|760|805|818|820|831|840|858|909|916|925|949|951)",
+    ),
+    ("North America", "United States", "Colorado", r"(303|719|720|970|983)"),
+    ("North America", "United States", "Connecticut", r"(203|475|860|959)"),
+    ("North America", "United States", "Delaware", r"(302)"),
+    ("North America", "United States", "District of Columbia", r"(202|771)"),
+    (
+        "North America",
+        "United States",
+        "Florida",
+        r"(239|305|321|324|352|386|407|448|561|645|656|689|727|728|754|772|786|813|850|863|904|941|954)",
+    ),
+    (
+        "North America",
+        "United States",
+        "Georgia",
+        r"(229|404|470|478|678|706|762|770|912|943)",
+    ),
+    ("North America", "United States", "Hawaii", r"(808)"),
+    ("North America", "United States", "Idaho", r"(208|986)"),
+    (
+        "North America",
+        "United States",
+        "Illinois",
+        r"(217|224|309|312|331|447|464|618|630|708|730|773|779|815|847|861|872)",
+    ),
+    (
+        "North America",
+        "United States",
+        "Indiana",
+        r"(219|260|317|463|574|765|812|930)",
+    ),
+    ("North America", "United States", "Iowa", r"(319|515|563|641|712)"),
+    ("North America", "United States", "Kansas", r"(316|620|785|913)"),
+    ("North America", "United States", "Kentucky", r"(270|364|502|606|859)"),
+    ("North America", "United States", "Louisiana", r"(225|318|337|504|985)"),
+    ("North America", "United States", "Maine", r"(207)"),
+    ("North America", "United States", "Maryland", r"(227|240|301|410|443|667)"),
+    (
+        "North America",
+        "United States",
+        "Massachusetts",
+        r"(339|351|413|508|617|774|781|857|978)",
+    ),
+    (
+        "North America",
+        "United States",
+        "Michigan",
+        r"(231|248|269|313|517|586|616|679|734|810|906|947|989)",
+    ),
+    (
+        "North America",
+        "United States",
+        "Minnesota",
+        r"(218|320|507|612|651|763|952)",
+    ),
+    ("North America", "United States", "Mississippi", r"(228|601|662|769)"),
+    (
+        "North America",
+        "United States",
+        "Missouri",
+        r"(235|314|417|557|573|636|660|816|975)",
+    ),
+    ("North America", "United States", "Montana", r"(406)"),
+    ("North America", "United States", "Nebraska", r"(308|402|531)"),
+    ("North America", "United States", "Nevada", r"(702|725|775)"),
+    ("North America", "United States", "New Hampshire", r"(603)"),
+    (
+        "North America",
+        "United States",
+        "New Jersey",
+        r"(201|551|609|640|732|848|856|862|908|973)",
+    ),
+    ("North America", "United States", "New Mexico", r"(505|575)"),
+    (
+        "North America",
+        "United States",
+        "New York",
+        r"(212|315|329|332|347|363|516|518|585|607|624|631|646|680|716|718|838|845|914|917|929|934)",
+    ),
+    (
+        "North America",
+        "United States",
+        "North Carolina",
+        r"(252|336|472|704|743|828|910|919|980|984)",
+    ),
+    ("North America", "United States", "North Dakota", r"(701)"),
+    (
+        "North America",
+        "United States",
+        "Ohio",
+        r"(216|220|234|283|326|330|380|419|436|440|513|567|614|740|937)",
+    ),
+    ("North America", "United States", "Oklahoma", r"(405|539|572|580|918)"),
+    ("North America", "United States", "Oregon", r"(458|503|541|971)"),
+    (
+        "North America",
+        "United States",
+        "Pennsylvania",
+        r"(215|223|267|272|412|445|484|570|582|610|717|724|814|835|878)",
+    ),
+    ("North America", "United States", "Rhode Island", r"(401)"),
+    (
+        "North America",
+        "United States",
+        "South Carolina",
+        r"(803|821|839|843|854|864)",
+    ),
+    ("North America", "United States", "South Dakota", r"(605)"),
+    (
+        "North America",
+        "United States",
+        "Tennessee",
+        r"(423|615|629|731|865|901|931)",
+    ),
+    (
+        "North America",
+        "United States",
+        "Texas",
+        r"(210|214|254|281|325|346|361|409|430|432|469|512|682|713|726|737|806|817|830|832|903|915|936|940|945|956|972|979)",
+    ),
+    ("North America", "United States", "Utah", r"(385|435|801)"),
+    ("North America", "United States", "Vermont", r"(802)"),
+    (
+        "North America",
+        "United States",
+        "Virginia",
+        r"(276|434|540|571|686|703|757|804|826|948)",
+    ),
+    ("North America", "United States", "Washington", r"(206|253|360|425|509|564)"),
+    ("North America", "United States", "West Virginia", r"(304|681)"),
+    (
+        "North America",
+        "United States",
+        "Wisconsin",
+        r"(262|274|353|414|534|608|715|920)",
+    ),
+    ("North America", "United States", "Wyoming", r"(307)"),
+    ("North America", "Canada", "Alberta", r"(368|403|587|780|825)"),
+    ("North America", "Canada", "British Columbia", r"(236|250|257|604|672|778)"),
+    ("North America", "Canada", "Manitoba", r"(204|431|584)"),
+    ("North America", "Canada", "New Brunswick", r"(428|506)"),
+    ("North America", "Canada", "Newfoundland and Labrador", r"(709|879)"),
+    ("North America", "Canada", "Northwest Territories", r"(867)"),
+    ("North America", "Canada", "Nova Scotia", r"(782|902)"),
+    ("North America", "Canada", "Nunavut", r"(867)"),
+    (
+        "North America",
+        "Canada",
+        "Ontario",
+        r"(226|249|289|343|365|382|387|416|437|519|548|613|647|683|705|742|753|807|905|942)",
+    ),
+    ("North America", "Canada", "Prince Edward Island", r"(782|902)"),
+    (
+        "North America",
+        "Canada",
+        "Quebec",
+        r"(263|354|367|418|438|450|468|514|579|581|819|873)",
+    ),
+    ("North America", "Canada", "Saskatchewan", r"(306|474|639)"),
+    ("North America", "Canada", "Yukon", r"(867)"),
+    ("Caribbean", "Anguilla", "Anguilla", r"(264)"),
+    ("Caribbean", "Antigua and Barbuda", "Antigua and Barbuda", r"(268)"),
+    ("Caribbean", "The Bahamas", "The Bahamas", r"(242)"),
+    ("Caribbean", "Barbados", "Barbados", r"(246)"),
+    ("Caribbean", "Bermuda", "Bermuda", r"(441)"),
+    ("Caribbean", "British Virgin Islands", "British Virgin Islands", r"(284)"),
+    ("Caribbean", "Cayman Islands", "Cayman Islands", r"(345)"),
+    ("Caribbean", "Dominica", "Dominica", r"(767)"),
+    ("Caribbean", "Dominican Republic", "Dominican Republic", r"(809|829|849)"),
+    ("Caribbean", "Grenada", "Grenada", r"(473)"),
+    ("Caribbean", "Jamaica", "Jamaica", r"(658|876)"),
+    ("Caribbean", "Montserrat", "Montserrat", r"(664)"),
+    ("Caribbean", "Puerto Rico", "Puerto Rico", r"(787|939)"),
+    ("Caribbean", "Saint Kitts and Nevis", "Saint Kitts and Nevis", r"(869)"),
+    ("Caribbean", "Saint Lucia", "Saint Lucia", r"(758)"),
+    (
+        "Caribbean",
+        "Saint Vincent and the Grenadines",
+        "Saint Vincent and the Grenadines",
+        r"(784)",
+    ),
+    ("Caribbean", "Sint Maarten", "Sint Maarten", r"(721)"),
+    ("Caribbean", "Trinidad and Tobago", "Trinidad and Tobago", r"(868)"),
+    ("Caribbean", "Turks and Caicos Islands", "Turks and Caicos Islands", r"(649)"),
+    ("Caribbean", "U.S. Virgin Islands", "U.S. Virgin Islands", r"(340)"),
+    ("U.S. Pacific Territory", "American Samoa", "American Samoa", r"(684)"),
+    ("U.S. Pacific Territory", "Guam", "Guam", r"(671)"),
+    (
+        "U.S. Pacific Territory",
+        "Northern Mariana Islands",
+        "Northern Mariana Islands",
+        r"(670)",
+    ),
+    (
+        "North America",
+        "Canada",
+        "Canada Special Services",
+        r"(600|622|633|644|655|677|688)",
+    ),
+    (
+        "North America",
+        "Non Geographic",
+        "Interexchange Carrier-Specific Services",
+        r"(700)",
+    ),
+    (
+        "North America",
+        "Non Geographic",
+        "Personal Communications Services",
+        r"(500|521|522|523|524|525|526|527|528|529|532|533|535|538|542|543|544|545|546|547|549|550|552|553|554|556|566|558|569|577|578|588|589)",
+    ),
+    ("North America", "Non Geographic", "Premium Call Services", r"(900)"),
+    (
+        "North America",
+        "Non Geographic",
+        "Toll-Free",
+        r"(800|822|833|844|855|866|877|880|881|882|883|884|885|886|887|888|889)",
+    ),
+    ("North America", "United States", "US Government", r"(710)"),
+]
+
+# Area code -> (region, country, location). Codes shared by several locations keep the
+# first listing, matching the order the list used to be scanned in.
+AREA_CODE_LOOKUP = {}
+for _region, _country, _location, _codes in AREA_CODES_1:
+    for _code in _codes.strip("()").split("|"):
+        AREA_CODE_LOOKUP.setdefault(_code, (_region, _country, _location))
+
+# Country Codes: (code, "Region | Country", min NSN digits, max NSN digits)
+COUNTRY_CODES = [
+    ("1", "North America | US/CA", 10, 10),
+    ("7", "Asia | Russia/Kazakhstan", 10, 10),
+    ("20", "Africa | Egypt", 8, 9),
+    ("27", "Africa | South Africa", 9, 9),
+    ("30", "Europe | Greece", 10, 10),
+    ("31", "Europe | Netherlands", 9, 10),
+    ("32", "Europe | Belgium", 9, 9),
+    ("33", "Europe | France", 9, 9),
+    ("34", "Europe | Spain", 9, 9),
+    ("36", "Europe | Hungary", 9, 9),
+    ("39", "Europe | Italy", 9, 10),
+    ("40", "Europe | Romania", 9, 9),
+    ("41", "Europe | Switzerland", 9, 9),
+    ("43", "Europe | Austria", 9, 9),
+    ("44", "Europe | United Kingdom", 9, 10),
+    ("45", "Europe | Denmark", 8, 8),
+    ("46", "Europe | Sweden", 9, 9),
+    ("47", "Europe | Norway", 8, 8),
+    ("48", "Europe | Poland", 9, 9),
+    ("49", "Europe | Germany", 10, 11),
+    ("51", "South America | Peru", 9, 9),
+    ("52", "North America | Mexico", 10, 10),
+    ("53", "Caribbean | Cuba", 8, 8),
+    ("54", "South America | Argentina", 10, 10),
+    ("55", "South America | Brazil", 10, 11),
+    ("56", "South America | Chile", 9, 9),
+    ("57", "South America | Colombia", 10, 10),
+    ("58", "South America | Venezuela", 10, 10),
+    ("60", "Asia | Malaysia", 9, 9),
+    ("61", "Oceania | Australia", 9, 10),
+    ("62", "Asia | Indonesia", 10, 11),
+    ("63", "Asia | Philippines", 10, 10),
+    ("64", "Oceania | New Zealand", 8, 10),
+    ("65", "Asia | Singapore", 8, 8),
+    ("66", "Asia | Thailand", 9, 9),
+    ("81", "Asia | Japan", 10, 10),
+    ("82", "Asia | South Korea", 9, 12),
+    ("84", "Asia | Vietnam", 9, 10),
+    ("86", "Asia | China", 11, 11),
+    ("90", "Europe | Turkey", 10, 10),
+    ("91", "Asia | India", 10, 10),
+    ("92", "Asia | Pakistan", 10, 10),
+    ("93", "Middle East | Afghanistan", 9, 9),
+    ("94", "Asia | Sri Lanka", 9, 9),
+    ("95", "Asia | Myanmar", 8, 10),
+    ("98", "Asia | Iran", 10, 10),
+    ("211", "Africa | South Sudan", 9, 9),
+    ("212", "Africa | Morocco", 9, 9),
+    ("213", "Africa | Algeria", 9, 9),
+    ("216", "Africa | Tunisia", 8, 8),
+    ("218", "Africa | Libya", 9, 9),
+    ("220", "Africa | Gambia", 7, 7),
+    ("221", "Africa | Senegal", 9, 9),
+    ("222", "Africa | Mauritania", 8, 8),
+    ("223", "Africa | Mali", 8, 8),
+    ("224", "Africa | Guinea", 8, 8),
+    ("225", "Africa | Ivory Coast", 8, 8),
+    ("226", "Africa | Burkina Faso", 8, 8),
+    ("227", "Africa | Niger", 8, 8),
+    ("228", "Africa | Togo", 8, 8),
+    ("229", "Africa | Benin", 8, 8),
+    ("230", "Africa | Mauritius", 7, 7),
+    ("231", "Africa | Liberia", 7, 8),
+    ("232", "Africa | Sierra Leone", 8, 8),
+    ("233", "Africa | Ghana", 9, 9),
+    ("234", "Africa | Nigeria", 7, 10),
+    ("235", "Africa | Chad", 8, 8),
+    ("236", "Africa | Central African Republic", 8, 8),
+    ("237", "Africa | Cameroon", 8, 9),
+    ("238", "Africa | Cape Verde", 7, 7),
+    ("239", "Africa | Sao Tome and Principe", 7, 7),
+    ("240", "Africa | Equatorial Guinea", 9, 9),
+    ("241", "Africa | Gabon", 8, 8),
+    ("242", "Africa | Republic of the Congo", 9, 9),
+    ("243", "Africa | Democratic Republic of the Congo", 9, 9),
+    ("244", "Africa | Angola", 9, 9),
+    ("245", "Africa | Guinea-Bissau", 7, 7),
+    ("246", "Asia | British Indian Ocean Territory", 7, 7),
+    ("247", "Africa | Ascension Island", 4, 4),
+    ("254", "Africa | Kenya", 9, 9),
+    ("255", "Africa | Tanzania", 9, 9),
+    ("256", "Africa | Uganda", 9, 9),
+    ("267", "Africa | Botswana", 7, 9),
+    ("298", "Europe | Faroe Islands", 6, 6),
+    ("299", "North America | Greenland", 6, 6),
+    ("350", "Europe | Gibraltar", 8, 8),
+    ("351", "Europe | Portugal", 9, 9),
+    ("352", "Europe | Luxembourg", 6, 9),
+    ("353", "Europe | Ireland", 7, 9),
+    ("355", "Europe | Albania", 9, 9),
+    ("356", "Europe | Malta", 8, 8),
+    ("357", "Europe | Cyprus", 8, 8),
+    ("358", "Europe | Finland", 5, 12),
+    ("359", "Europe | Bulgaria", 7, 9),
+    ("360", "Europe | Vatican City", 4, 4),
+    ("370", "Europe | Lithuania", 8, 8),
+    ("371", "Europe | Latvia", 8, 8),
+    ("372", "Europe | Estonia", 7, 7),
+    ("373", "Europe | Moldova", 8, 8),
+    ("374", "Asia | Armenia", 8, 8),
+    ("375", "Europe | Belarus", 9, 9),
+    ("377", "Europe | Monaco", 6, 9),
+    ("378", "Europe | San Marino", 6, 9),
+    ("380", "Europe | Ukraine", 9, 9),
+    ("381", "Europe | Serbia", 6, 9),
+    ("382", "Europe | Montenegro", 6, 9),
+    ("385", "Europe | Croatia", 7, 9),
+    ("386", "Europe | Slovenia", 8, 8),
+    ("387", "Europe | Bosnia and Herzegovina", 8, 8),
+    ("389", "Europe | North Macedonia", 8, 8),
+    ("421", "Europe | Slovakia", 9, 9),
+    ("423", "Europe | Liechtenstein", 7, 7),
+    ("500", "South America | Falkland Islands", 5, 5),
+    ("501", "Central America | Belize", 7, 7),
+    ("502", "Central America | Guatemala", 8, 8),
+    ("503", "Central America | El Salvador", 8, 8),
+    ("504", "Central America | Honduras", 8, 8),
+    ("505", "Central America | Nicaragua", 8, 8),
+    ("506", "Central America | Costa Rica", 8, 8),
+    ("507", "Central America | Panama", 8, 8),
+    ("508", "North America | Saint Pierre and Miquelon", 6, 6),
+    ("509", "Caribbean | Haiti", 8, 8),
+    ("590", "North America | Guadeloupe", 9, 9),
+    ("591", "South America | Bolivia", 8, 8),
+    ("593", "South America | Ecuador", 9, 9),
+    ("594", "South America | French Guiana", 9, 9),
+    ("595", "South America | Paraguay", 9, 9),
+    ("597", "South America | Suriname", 6, 7),
+    ("599", "North America | Caribbean Netherlands", 7, 7),
+    ("670", "Asia | East Timor", 7, 8),
+    ("672", "Oceania | Norfolk Island", 5, 5),
+    ("673", "Asia | Brunei", 7, 7),
+    ("675", "Oceania | Papua New Guinea", 7, 7),
+    ("676", "Oceania | Tonga", 5, 5),
+    ("677", "Oceania | Solomon Islands", 5, 5),
+    ("678", "Oceania | Vanuatu", 5, 5),
+    ("679", "Oceania | Fiji", 7, 7),
+    ("680", "Oceania | Palau", 7, 7),
+    ("681", "Oceania | Wallis and Futuna", 6, 6),
+    ("682", "Oceania | Cook Islands", 5, 5),
+    ("683", "Oceania | Niue", 4, 4),
+    ("685", "Oceania | Samoa", 7, 7),
+    ("686", "Oceania | Kiribati", 5, 5),
+    ("687", "Oceania | New Caledonia", 6, 6),
+    ("688", "Oceania | Tuvalu", 5, 5),
+    ("689", "Oceania | French Polynesia", 6, 6),
+    ("690", "Oceania | Tokelau", 4, 4),
+    ("691", "Oceania | Micronesia", 7, 7),
+    ("692", "Oceania | Marshall Islands", 7, 7),
+    ("852", "Asia | Hong Kong", 8, 8),
+    ("853", "Asia | Macau", 8, 8),
+    ("855", "Asia | Cambodia", 9, 9),
+    ("856", "Asia | Laos", 9, 9),
+    ("870", "Oceania | Pitcairn Islands", 6, 6),
+    ("880", "Asia | Bangladesh", 10, 10),
+    ("886", "Asia | Taiwan", 9, 9),
+    ("961", "Middle East | Lebanon", 8, 8),
+    ("962", "Middle East | Jordan", 9, 9),
+    ("963", "Middle East | Syria", 9, 9),
+    ("964", "Middle East | Iraq", 10, 10),
+    ("965", "Middle East | Kuwait", 8, 8),
+    ("966", "Middle East | Saudi Arabia", 9, 9),
+    ("967", "Middle East | Yemen", 9, 9),
+    ("968", "Middle East | Oman", 8, 8),
+    ("970", "Middle East | Palestine", 9, 9),
+    ("971", "Middle East | United Arab Emirates", 9, 9),
+    ("972", "Middle East | Israel", 7, 9),
+    ("973", "Middle East | Bahrain", 8, 8),
+    ("974", "Middle East | Qatar", 8, 8),
+    ("975", "Asia | Bhutan", 8, 8),
+    ("976", "Asia | Mongolia", 8, 8),
+    ("977", "Asia | Nepal", 8, 10),
+    ("992", "Asia | Tajikistan", 9, 9),
+    ("993", "Asia | Turkmenistan", 8, 8),
+    ("994", "Asia | Azerbaijan", 9, 9),
+    ("995", "Asia | Georgia", 9, 9),
+    ("996", "Asia | Kyrgyzstan", 9, 9),
+    ("998", "Asia | Uzbekistan", 9, 9),
+]
+
+COUNTRY_CODE_LOOKUP = {entry[0]: entry for entry in COUNTRY_CODES}
+COUNTRY_CODE_MAX_LENGTH = max(len(code) for code in COUNTRY_CODE_LOOKUP)
+
+
+def country_code_candidates(number):
+    """Country code entries whose code prefixes the number (after any +), longest code first"""
+    digits = number[1:] if number.startswith("+") else number
+    for length in range(min(COUNTRY_CODE_MAX_LENGTH, len(digits)), 0, -1):
+        entry = COUNTRY_CODE_LOOKUP.get(digits[:length])
+        if entry:
+            yield entry
 
 
 def validate_phone_number(input):
@@ -17,13 +514,11 @@ def validate_phone_number(input):
         }
 
     # Make Lowercase, Remove Trailing Spaces & Double+ Spaces
-    nCleanNumber = re.sub(r" +", " ", phone_number.lower().strip())
+    nCleanNumber = MULTI_SPACE_RE.sub(" ", phone_number.lower().strip())
 
     if nCleanNumber.count("*") > 1:
         nCleanNumber = nCleanNumber.replace("*", "-", 2)
-    nCleanNumber = re.sub(
-        r" *(extension|x?ext\.|ext:|ext|xt|ex|x+|loc|wzr|\*|#) *", " x", nCleanNumber
-    )
+    nCleanNumber = EXTENSION_MARKER_RE.sub(" x", nCleanNumber)
     nCleanNumber = nCleanNumber.replace("javascript:void(0);", "", 1)
 
     phone_parse = nCleanNumber.split("x")
@@ -44,32 +539,22 @@ def validate_phone_number(input):
         nCleanNumber = nCleanNumber.replace("00", "+", 1)
 
     # Process +
-    nCleanNumber = re.sub(r"\++ *", "+", nCleanNumber)
+    nCleanNumber = PLUS_RE.sub("+", nCleanNumber)
 
     # Process Extensions
     nExtension = None
     if len(phone_parse) > 1:
         nExtension = "x" + "x".join(phone_parse[1:])
-        digits = re.sub(r"\D", "", nExtension)
+        digits = NON_DIGIT_RE.sub("", nExtension)
         if not digits:
             nExtension = None
         else:
-            nExtension = re.sub(r"[^\d x]", "", nExtension)
-            nExtension = re.sub(r"x[ ]+", "", nExtension)
+            nExtension = EXTENSION_JUNK_RE.sub("", nExtension)
+            nExtension = EXTENSION_SPACING_RE.sub("", nExtension)
 
     if not nExtension:
-        patterns = [
-            (r"(\d{10}) \(?(\d+)\)?", 1, 2),  # DDDDDDDDDD (E+)
-            (r"(\d{3}[-\.]\d{3}[-\.]\d{4}) \(?(\d+)\)?", 1, 2),  # DDD-DDD-DDDD (E+)
-            (
-                r"(\(\d{3}\)[-\. ]?\d{3}[-\. ]?\d{4}) -?\(?(\d+)\)?",
-                1,
-                2,
-            ),  # (DDD) DDD-DDDD (E+)
-        ]
-
-        for pattern, g1, g2 in patterns:
-            mEX = re.search(pattern, nCleanNumber)
+        for pattern, g1, g2 in TRAILING_EXTENSION_PATTERNS:
+            mEX = pattern.search(nCleanNumber)
             if mEX:
                 if mEX.group(g1) and mEX.group(g2):
                     nCleanNumber = mEX.group(g1)
@@ -77,7 +562,7 @@ def validate_phone_number(input):
                 break
 
     # Invalid Check: All Same Digits
-    digits = re.sub(r"\D", "", nCleanNumber)
+    digits = NON_DIGIT_RE.sub("", nCleanNumber)
     if digits and len(digits) > 1 and all(d == digits[0] for d in digits):
         return {
             "nCleanNumber": None,
@@ -98,255 +583,8 @@ def validate_phone_number(input):
     nCountry = None
     clean_digits = None
     # US & CA Phone Numbers
-    patterns = [
-        (
-            r"^(\+1|1)?[-\. ]?\(?(\d{3})\)?[-\. ]?(\d{3})[-\. ]?(\d{4})$",
-            2,
-            3,
-            4,
-        ),  # 10 Digit NSN
-        (
-            r"^\(?(\+1|1)?\)?[-\. ]?(\d{3})[-\. ]?(\d{3})[-\. ]?(\d{4})$",
-            2,
-            3,
-            4,
-        ),  # 10 Digit NSN
-    ]
-
-    # +1 North America Valid Area Codes
-    areaCodes1 = [
-        ("North America", "United States", "Alabama", r"(205|251|256|334|659|938)"),
-        ("North America", "United States", "Alaska", r"(907)"),
-        ("North America", "United States", "Arizona", r"(480|520|602|623|928)"),
-        ("North America", "United States", "Arkansas", r"(327|479|501|870)"),
-        (
-            "North America",
-            "United States",
-            "California",
-            r"(209|213|279|310|323|341|350|369|408|415|424|442|510|530|559|562|619|626|628|650|657|661|669|707|714|747|760|805|818|820|831|840|858|909|916|925|949|951)",
-        ),
-        ("North America", "United States", "Colorado", r"(303|719|720|970|983)"),
-        ("North America", "United States", "Connecticut", r"(203|475|860|959)"),
-        ("North America", "United States", "Delaware", r"(302)"),
-        ("North America", "United States", "District of Columbia", r"(202|771)"),
-        (
-            "North America",
-            "United States",
-            "Florida",
-            r"(239|305|321|324|352|386|407|448|561|645|656|689|727|728|754|772|786|813|850|863|904|941|954)",
-        ),
-        (
-            "North America",
-            "United States",
-            "Georgia",
-            r"(229|404|470|478|678|706|762|770|912|943)",
-        ),
-        ("North America", "United States", "Hawaii", r"(808)"),
-        ("North America", "United States", "Idaho", r"(208|986)"),
-        (
-            "North America",
-            "United States",
-            "Illinois",
-            r"(217|224|309|312|331|447|464|618|630|708|730|773|779|815|847|861|872)",
-        ),
-        (
-            "North America",
-            "United States",
-            "Indiana",
-            r"(219|260|317|463|574|765|812|930)",
-        ),
-        ("North America", "United States", "Iowa", r"(319|515|563|641|712)"),
-        ("North America", "United States", "Kansas", r"(316|620|785|913)"),
-        ("North America", "United States", "Kentucky", r"(270|364|502|606|859)"),
-        ("North America", "United States", "Louisiana", r"(225|318|337|504|985)"),
-        ("North America", "United States", "Maine", r"(207)"),
-        ("North America", "United States", "Maryland", r"(227|240|301|410|443|667)"),
-        (
-            "North America",
-            "United States",
-            "Massachusetts",
-            r"(339|351|413|508|617|774|781|857|978)",
-        ),
-        (
-            "North America",
-            "United States",
-            "Michigan",
-            r"(231|248|269|313|517|586|616|679|734|810|906|947|989)",
-        ),
-        (
-            "North America",
-            "United States",
-            "Minnesota",
-            r"(218|320|507|612|651|763|952)",
-        ),
-        ("North America", "United States", "Mississippi", r"(228|601|662|769)"),
-        (
-            "North America",
-            "United States",
-            "Missouri",
-            r"(235|314|417|557|573|636|660|816|975)",
-        ),
-        ("North America", "United States", "Montana", r"(406)"),
-        ("North America", "United States", "Nebraska", r"(308|402|531)"),
-        ("North America", "United States", "Nevada", r"(702|725|775)"),
-        ("North America", "United States", "New Hampshire", r"(603)"),
-        (
-            "North America",
-            "United States",
-            "New Jersey",
-            r"(201|551|609|640|732|848|856|862|908|973)",
-        ),
-        ("North America", "United States", "New Mexico", r"(505|575)"),
-        (
-            "North America",
-            "United States",
-            "New York",
-            r"(212|315|329|332|347|363|516|518|585|607|624|631|646|680|716|718|838|845|914|917|929|934)",
-        ),
-        (
-            "North America",
-            "United States",
-            "North Carolina",
-            r"(252|336|472|704|743|828|910|919|980|984)",
-        ),
-        ("North America", "United States", "North Dakota", r"(701)"),
-        (
-            "North America",
-            "United States",
-            "Ohio",
-            r"(216|220|234|283|326|330|380|419|436|440|513|567|614|740|937)",
-        ),
-        ("North America", "United States", "Oklahoma", r"(405|539|572|580|918)"),
-        ("North America", "United States", "Oregon", r"(458|503|541|971)"),
-        (
-            "North America",
-            "United States",
-            "Pennsylvania",
-            r"(215|223|267|272|412|445|484|570|582|610|717|724|814|835|878)",
-        ),
-        ("North America", "United States", "Rhode Island", r"(401)"),
-        (
-            "North America",
-            "United States",
-            "South Carolina",
-            r"(803|821|839|843|854|864)",
-        ),
-        ("North America", "United States", "South Dakota", r"(605)"),
-        (
-            "North America",
-            "United States",
-            "Tennessee",
-            r"(423|615|629|731|865|901|931)",
-        ),
-        (
-            "North America",
-            "United States",
-            "Texas",
-            r"(210|214|254|281|325|346|361|409|430|432|469|512|682|713|726|737|806|817|830|832|903|915|936|940|945|956|972|979)",
-        ),
-        ("North America", "United States", "Utah", r"(385|435|801)"),
-        ("North America", "United States", "Vermont", r"(802)"),
-        (
-            "North America",
-            "United States",
-            "Virginia",
-            r"(276|434|540|571|686|703|757|804|826|948)",
-        ),
-        ("North America", "United States", "Washington", r"(206|253|360|425|509|564)"),
-        ("North America", "United States", "West Virginia", r"(304|681)"),
-        (
-            "North America",
-            "United States",
-            "Wisconsin",
-            r"(262|274|353|414|534|608|715|920)",
-        ),
-        ("North America", "United States", "Wyoming", r"(307)"),
-        ("North America", "Canada", "Alberta", r"(368|403|587|780|825)"),
-        ("North America", "Canada", "British Columbia", r"(236|250|257|604|672|778)"),
-        ("North America", "Canada", "Manitoba", r"(204|431|584)"),
-        ("North America", "Canada", "New Brunswick", r"(428|506)"),
-        ("North America", "Canada", "Newfoundland and Labrador", r"(709|879)"),
-        ("North America", "Canada", "Northwest Territories", r"(867)"),
-        ("North America", "Canada", "Nova Scotia", r"(782|902)"),
-        ("North America", "Canada", "Nunavut", r"(867)"),
-        (
-            "North America",
-            "Canada",
-            "Ontario",
-            r"(226|249|289|343|365|382|387|416|437|519|548|613|647|683|705|742|753|807|905|942)",
-        ),
-        ("North America", "Canada", "Prince Edward Island", r"(782|902)"),
-        (
-            "North America",
-            "Canada",
-            "Quebec",
-            r"(263|354|367|418|438|450|468|514|579|581|819|873)",
-        ),
-        ("North America", "Canada", "Saskatchewan", r"(306|474|639)"),
-        ("North America", "Canada", "Yukon", r"(867)"),
-        ("Caribbean", "Anguilla", "Anguilla", r"(264)"),
-        ("Caribbean", "Antigua and Barbuda", "Antigua and Barbuda", r"(268)"),
-        ("Caribbean", "The Bahamas", "The Bahamas", r"(242)"),
-        ("Caribbean", "Barbados", "Barbados", r"(246)"),
-        ("Caribbean", "Bermuda", "Bermuda", r"(441)"),
-        ("Caribbean", "British Virgin Islands", "British Virgin Islands", r"(284)"),
-        ("Caribbean", "Cayman Islands", "Cayman Islands", r"(345)"),
-        ("Caribbean", "Dominica", "Dominica", r"(767)"),
-        ("Caribbean", "Dominican Republic", "Dominican Republic", r"(809|829|849)"),
-        ("Caribbean", "Grenada", "Grenada", r"(473)"),
-        ("Caribbean", "Jamaica", "Jamaica", r"(658|876)"),
-        ("Caribbean", "Montserrat", "Montserrat", r"(664)"),
-        ("Caribbean", "Puerto Rico", "Puerto Rico", r"(787|939)"),
-        ("Caribbean", "Saint Kitts and Nevis", "Saint Kitts and Nevis", r"(869)"),
-        ("Caribbean", "Saint Lucia", "Saint Lucia", r"(758)"),
-        (
-            "Caribbean",
-            "Saint Vincent and the Grenadines",
-            "Saint Vincent and the Grenadines",
-            r"(784)",
-        ),
-        ("Caribbean", "Sint Maarten", "Sint Maarten", r"(721)"),
-        ("Caribbean", "Trinidad and Tobago", "Trinidad and Tobago", r"(868)"),
-        ("Caribbean", "Turks and Caicos Islands", "Turks and Caicos Islands", r"(649)"),
-        ("Caribbean", "U.S. Virgin Islands", "U.S. Virgin Islands", r"(340)"),
-        ("U.S. Pacific Territory", "American Samoa", "American Samoa", r"(684)"),
-        ("U.S. Pacific Territory", "Guam", "Guam", r"(671)"),
-        (
-            "U.S. Pacific Territory",
-            "Northern Mariana Islands",
-            "Northern Mariana Islands",
-            r"(670)",
-        ),
-        (
-            "North America",
-            "Canada",
-            "Canada Special Services",
-            r"(600|622|633|644|655|677|688)",
-        ),
-        (
-            "North America",
-            "Non Geographic",
-            "Interexchange Carrier-Specific Services",
-            r"(700)",
-        ),
-        (
-            "North America",
-            "Non Geographic",
-            "Personal Communications Services",
-            r"(500|521|522|523|524|525|526|527|528|529|532|533|535|538|542|543|544|545|546|547|549|550|552|553|554|556|566|558|569|577|578|588|589)",
-        ),
-        ("North America", "Non Geographic", "Premium Call Services", r"(900)"),
-        (
-            "North America",
-            "Non Geographic",
-            "Toll-Free",
-            r"(800|822|833|844|855|866|877|880|881|882|883|884|885|886|887|888|889)",
-        ),
-        ("North America", "United States", "US Government", r"(710)"),
-    ]
-
-    for pattern, g2, g3, g4 in patterns:
-        mUS = re.search(pattern, nCleanNumber)
+    for pattern, g2, g3, g4 in US_CA_PATTERNS:
+        mUS = pattern.search(nCleanNumber)
         if mUS:
             if mUS.group(g2) and mUS.group(g3) and mUS.group(g4):
                 nStatus = "Likely Not Valid"
@@ -354,48 +592,28 @@ def validate_phone_number(input):
                 # nCountry = "US/CA"
                 temp = "Unfamiliar Area Code: " + mUS.group(g2)
                 # nCleanNumber = "+1 (" + mUS.group(g2) + ") " + mUS.group(g3) + "-" + mUS.group(g4)
-                for iRegion, iCountry, location, areaCode in areaCodes1:
-                    mUS2 = re.search(areaCode, mUS.group(g2))
-                    if mUS2:
-                        nStatus = "Valid"
-                        nRegion = iRegion
-                        nCountry = iCountry
-                        temp = location + " Area Code: " + mUS.group(g2)
-                        nCleanNumber = (
-                            "+1 ("
-                            + mUS.group(g2)
-                            + ") "
-                            + mUS.group(g3)
-                            + "-"
-                            + mUS.group(g4)
-                        )
-                        break
+                areaCode = AREA_CODE_LOOKUP.get(mUS.group(g2))
+                if areaCode:
+                    nStatus = "Valid"
+                    nRegion, nCountry, location = areaCode
+                    temp = location + " Area Code: " + mUS.group(g2)
+                    nCleanNumber = (
+                        "+1 ("
+                        + mUS.group(g2)
+                        + ") "
+                        + mUS.group(g3)
+                        + "-"
+                        + mUS.group(g4)
+                    )
                 status_ad += "" if temp == "" else " - " + temp
                 nReason = temp
             break
 
     # UK Phone Numbers
-    uk_nCleanNumber = re.sub(r"\D", "", nCleanNumber).strip()
-
-    # General pattern for UK numbers
-    uk_number_pattern = r"^(?:44|0|440)"
-
-    # Patterns for specific types of UK numbers
-    patterns = [
-        r"1\d{9}",  # 10 Digit NSN
-        r"2\d{9}",  # 10 Digit NSN
-        r"3\d{9}",  # 10 Digit NSN
-        r"7\d{9}",  # 10 Digit NSN
-        r"8\d{9}",  # 10 Digit NSN
-        r"9\d{9}",  # 10 Digit NSN
-        r"55\d{8}",  # 10 Digit NSN
-        r"56\d{8}",  # 10 Digit NSN
-        r"1\d{8}",  # 9 Digit NSN
-        r"800\d{6}",  # 9 Digit NSN
-    ]
+    # (digits is still current unless the US/CA match reformatted the number)
+    uk_nCleanNumber = digits if nStatus != "Valid" else NON_DIGIT_RE.sub("", nCleanNumber)
 
-    uk_pattern = uk_number_pattern + "(" + "|".join(patterns) + ")$"
-    mUK = re.match(uk_pattern, uk_nCleanNumber)
+    mUK = UK_RE.match(uk_nCleanNumber)
     if mUK:
         if mUK.group(1):
             nStatus = "Valid"
@@ -408,192 +626,10 @@ def validate_phone_number(input):
     temp_number = None
 
     if not nCountry and nStatus != "Likely Not Valid":
-        nCleanNumber = re.sub(r"[^\+\d]", " ", nCleanNumber)
-        nCleanNumber = re.sub(r" +", " ", nCleanNumber).strip()
-
-        patterns = [
-            ("1", "North America | US/CA", 10, 10),
-            ("7", "Asia | Russia/Kazakhstan", 10, 10),
-            ("20", "Africa | Egypt", 8, 9),
-            ("27", "Africa | South Africa", 9, 9),
-            ("30", "Europe | Greece", 10, 10),
-            ("31", "Europe | Netherlands", 9, 10),
-            ("32", "Europe | Belgium", 9, 9),
-            ("33", "Europe | France", 9, 9),
-            ("34", "Europe | Spain", 9, 9),
-            ("36", "Europe | Hungary", 9, 9),
-            ("39", "Europe | Italy", 9, 10),
-            ("40", "Europe | Romania", 9, 9),
-            ("41", "Europe | Switzerland", 9, 9),
-            ("43", "Europe | Austria", 9, 9),
-            ("44", "Europe | United Kingdom", 9, 10),
-            ("45", "Europe | Denmark", 8, 8),
-            ("46", "Europe | Sweden", 9, 9),
-            ("47", "Europe | Norway", 8, 8),
-            ("48", "Europe | Poland", 9, 9),
-            ("49", "Europe | Germany", 10, 11),
-            ("51", "South America | Peru", 9, 9),
-            ("52", "North America | Mexico", 10, 10),
-            ("53", "Caribbean | Cuba", 8, 8),
-            ("54", "South America | Argentina", 10, 10),
-            ("55", "South America | Brazil", 10, 11),
-            ("56", "South America | Chile", 9, 9),
-            ("57", "South America | Colombia", 10, 10),
-            ("58", "South America | Venezuela", 10, 10),
-            ("60", "Asia | Malaysia", 9, 9),
-            ("61", "Oceania | Australia", 9, 10),
-            ("62", "Asia | Indonesia", 10, 11),
-            ("63", "Asia | Philippines", 10, 10),
-            ("64", "Oceania | New Zealand", 8, 10),
-            ("65", "Asia | Singapore", 8, 8),
-            ("66", "Asia | Thailand", 9, 9),
-            ("81", "Asia | Japan", 10, 10),
-            ("82", "Asia | South Korea", 9, 12),
-            ("84", "Asia | Vietnam", 9, 10),
-            ("86", "Asia | China", 11, 11),
-            ("90", "Europe | Turkey", 10, 10),
-            ("91", "Asia | India", 10, 10),
-            ("92", "Asia | Pakistan", 10, 10),
-            ("93", "Middle East | Afghanistan", 9, 9),
-            ("94", "Asia | Sri Lanka", 9, 9),
-            ("95", "Asia | Myanmar", 8, 10),
-            ("98", "Asia | Iran", 10, 10),
-            ("211", "Africa | South Sudan", 9, 9),
-            ("212", "Africa | Morocco", 9, 9),
-            ("213", "Africa | Algeria", 9, 9),
-            ("216", "Africa | Tunisia", 8, 8),
-            ("218", "Africa | Libya", 9, 9),
-            ("220", "Africa | Gambia", 7, 7),
-            ("221", "Africa | Senegal", 9, 9),
-            ("222", "Africa | Mauritania", 8, 8),
-            ("223", "Africa | Mali", 8, 8),
-            ("224", "Africa | Guinea", 8, 8),
-            ("225", "Africa | Ivory Coast", 8, 8),
-            ("226", "Africa | Burkina Faso", 8, 8),
-            ("227", "Africa | Niger", 8, 8),
-            ("228", "Africa | Togo", 8, 8),
-            ("229", "Africa | Benin", 8, 8),
-            ("230", "Africa | Mauritius", 7, 7),
-            ("231", "Africa | Liberia", 7, 8),
-            ("232", "Africa | Sierra Leone", 8, 8),
-            ("233", "Africa | Ghana", 9, 9),
-            ("234", "Africa | Nigeria", 7, 10),
-            ("235", "Africa | Chad", 8, 8),
-            ("236", "Africa | Central African Republic", 8, 8),
-            ("237", "Africa | Cameroon", 8, 9),
-            ("238", "Africa | Cape Verde", 7, 7),
-            ("239", "Africa | Sao Tome and Principe", 7, 7),
-            ("240", "Africa | Equatorial Guinea", 9, 9),
-            ("241", "Africa | Gabon", 8, 8),
-            ("242", "Africa | Republic of the Congo", 9, 9),
-            ("243", "Africa | Democratic Republic of the Congo", 9, 9),
-            ("244", "Africa | Angola", 9, 9),
-            ("245", "Africa | Guinea-Bissau", 7, 7),
-            ("246", "Asia | British Indian Ocean Territory", 7, 7),
-            ("247", "Africa | Ascension Island", 4, 4),
-            ("254", "Africa | Kenya", 9, 9),
-            ("255", "Africa | Tanzania", 9, 9),
-            ("256", "Africa | Uganda", 9, 9),
-            ("267", "Africa | Botswana", 7, 9),
-            ("298", "Europe | Faroe Islands", 6, 6),
-            ("299", "North America | Greenland", 6, 6),
-            ("350", "Europe | Gibraltar", 8, 8),
-            ("351", "Europe | Portugal", 9, 9),
-            ("352", "Europe | Luxembourg", 6, 9),
-            ("353", "Europe | Ireland", 7, 9),
-            ("355", "Europe | Albania", 9, 9),
-            ("356", "Europe | Malta", 8, 8),
-            ("357", "Europe | Cyprus", 8, 8),
-            ("358", "Europe | Finland", 5, 12),
-            ("359", "Europe | Bulgaria", 7, 9),
-            ("360", "Europe | Vatican City", 4, 4),
-            ("370", "Europe | Lithuania", 8, 8),
-            ("371", "Europe | Latvia", 8, 8),
-            ("372", "Europe | Estonia", 7, 7),
-            ("373", "Europe | Moldova", 8, 8),
-            ("374", "Asia | Armenia", 8, 8),
-            ("375", "Europe | Belarus", 9, 9),
-            ("377", "Europe | Monaco", 6, 9),
-            ("378", "Europe | San Marino", 6, 9),
-            ("380", "Europe | Ukraine", 9, 9),
-            ("381", "Europe | Serbia", 6, 9),
-            ("382", "Europe | Montenegro", 6, 9),
-            ("385", "Europe | Croatia", 7, 9),
-            ("386", "Europe | Slovenia", 8, 8),
-            ("387", "Europe | Bosnia and Herzegovina", 8, 8),
-            ("389", "Europe | North Macedonia", 8, 8),
-            ("421", "Europe | Slovakia", 9, 9),
-            ("423", "Europe | Liechtenstein", 7, 7),
-            ("500", "South America | Falkland Islands", 5, 5),
-            ("501", "Central America | Belize", 7, 7),
-            ("502", "Central America | Guatemala", 8, 8),
-            ("503", "Central America | El Salvador", 8, 8),
-            ("504", "Central America | Honduras", 8, 8),
-            ("505", "Central America | Nicaragua", 8, 8),
-            ("506", "Central America | Costa Rica", 8, 8),
-            ("507", "Central America | Panama", 8, 8),
-            ("508", "North America | Saint Pierre and Miquelon", 6, 6),
-            ("509", "Caribbean | Haiti", 8, 8),
-            ("590", "North America | Guadeloupe", 9, 9),
-            ("591", "South America | Bolivia", 8, 8),
-            ("593", "South America | Ecuador", 9, 9),
-            ("594", "South America | French Guiana", 9, 9),
-            ("595", "South America | Paraguay", 9, 9),
-            ("597", "South America | Suriname", 6, 7),
-            ("599", "North America | Caribbean Netherlands", 7, 7),
-            ("670", "Asia | East Timor", 7, 8),
-            ("672", "Oceania | Norfolk Island", 5, 5),
-            ("673", "Asia | Brunei", 7, 7),
-            ("675", "Oceania | Papua New Guinea", 7, 7),
-            ("676", "Oceania | Tonga", 5, 5),
-            ("677", "Oceania | Solomon Islands", 5, 5),
-            ("678", "Oceania | Vanuatu", 5, 5),
-            ("679", "Oceania | Fiji", 7, 7),
-            ("680", "Oceania | Palau", 7, 7),
-            ("681", "Oceania | Wallis and Futuna", 6, 6),
-            ("682", "Oceania | Cook Islands", 5, 5),
-            ("683", "Oceania | Niue", 4, 4),
-            ("685", "Oceania | Samoa", 7, 7),
-            ("686", "Oceania | Kiribati", 5, 5),
-            ("687", "Oceania | New Caledonia", 6, 6),
-            ("688", "Oceania | Tuvalu", 5, 5),
-            ("689", "Oceania | French Polynesia", 6, 6),
-            ("690", "Oceania | Tokelau", 4, 4),
-            ("691", "Oceania | Micronesia", 7, 7),
-            ("692", "Oceania | Marshall Islands", 7, 7),
-            ("852", "Asia | Hong Kong", 8, 8),
-            ("853", "Asia | Macau", 8, 8),
-            ("855", "Asia | Cambodia", 9, 9),
-            ("856", "Asia | Laos", 9, 9),
-            ("870", "Oceania | Pitcairn Islands", 6, 6),
-            ("880", "Asia | Bangladesh", 10, 10),
-            ("886", "Asia | Taiwan", 9, 9),
-            ("961", "Middle East | Lebanon", 8, 8),
-            ("962", "Middle East | Jordan", 9, 9),
-            ("963", "Middle East | Syria", 9, 9),
-            ("964", "Middle East | Iraq", 10, 10),
-            ("965", "Middle East | Kuwait", 8, 8),
-            ("966", "Middle East | Saudi Arabia", 9, 9),
-            ("967", "Middle East | Yemen", 9, 9),
-            ("968", "Middle East | Oman", 8, 8),
-            ("970", "Middle East | Palestine", 9, 9),
-            ("971", "Middle East | United Arab Emirates", 9, 9),
-            ("972", "Middle East | Israel", 7, 9),
-            ("973", "Middle East | Bahrain", 8, 8),
-            ("974", "Middle East | Qatar", 8, 8),
-            ("975", "Asia | Bhutan", 8, 8),
-            ("976", "Asia | Mongolia", 8, 8),
-            ("977", "Asia | Nepal", 8, 10),
-            ("992", "Asia | Tajikistan", 9, 9),
-            ("993", "Asia | Turkmenistan", 8, 8),
-            ("994", "Asia | Azerbaijan", 9, 9),
-            ("995", "Asia | Georgia", 9, 9),
-            ("996", "Asia | Kyrgyzstan", 9, 9),
-            ("998", "Asia | Uzbekistan", 9, 9),
-        ]
-
-        for country_code, country_region, nsnMin, nsnMax in reversed(
-            patterns
+        nCleanNumber = NON_DIAL_RUN_RE.sub(" ", nCleanNumber).strip()
+
+        for country_code, country_region, nsnMin, nsnMax in country_code_candidates(
+            nCleanNumber
         ):  # Start with Longer Country Codes
             if nCleanNumber.startswith(
                 "+" + country_code
@@ -604,7 +640,7 @@ def validate_phone_number(input):
                     nsnTemp = nCleanNumber.replace("+" + country_code + " ", "", 1)
                 else:
                     nsnTemp = nCleanNumber.replace("+" + country_code, "", 1)
-                numCount = len(re.findall(r"\d", nsnTemp))
+                numCount = len(DIGIT_RE.findall(nsnTemp))
                 if numCount >= nsnMin and numCount <= nsnMax:
                     nCleanNumber = "+" + country_code + " " + nsnTemp
                     clean_digits = "{:02}".format(numCount) + " digits"
@@ -622,7 +658,7 @@ def validate_phone_number(input):
             elif nCleanNumber.startswith(country_code + " 0 "):
                 nRegion, nCountry = country_region.split(" | ")
                 nsnTemp = nCleanNumber.replace(country_code + " 0 ", "", 1)
-                numCount = len(re.findall(r"\d", nsnTemp))
+                numCount = len(DIGIT_RE.findall(nsnTemp))
                 if numCount >= nsnMin and numCount <= nsnMax:
                     nCleanNumber = "+" + country_code + " " + nsnTemp
                     clean_digits = "{:02}".format(numCount) + " digits"
@@ -639,7 +675,7 @@ def validate_phone_number(input):
             elif nCleanNumber.startswith(country_code + " "):
                 nRegion, nCountry = country_region.split(" | ")
                 nsnTemp = nCleanNumber.replace(country_code + " ", "", 1)
-                numCount = len(re.findall(r"\d", nsnTemp))
+                numCount = len(DIGIT_RE.findall(nsnTemp))
                 if numCount >= nsnMin and numCount <= nsnMax:
                     nCleanNumber = "+" + nCleanNumber
                     clean_digits = "{:02}".format(numCount) + " digits"
@@ -655,7 +691,7 @@ def validate_phone_number(input):
                     )
             elif nCleanNumber.startswith(country_code):
                 nsnTemp = nCleanNumber.replace(country_code, "", 1)
-                numCount = len(re.findall(r"\d", nsnTemp))
+                numCount = len(DIGIT_RE.findall(nsnTemp))
                 if numCount >= nsnMin and numCount <= nsnMax:
                     nRegion, nCountry = country_region.split(" | ")
                     nCleanNumber = "+" + country_code + " " + nsnTemp
@@ -669,7 +705,7 @@ def validate_phone_number(input):
 
     # One last country check based on digit length & area code matching
     if nStatus in ["Likely Not Valid", "Invalid"]:
-        nsnTemp = re.sub(r"\D", "", nCleanNumber)
+        nsnTemp = NON_DIGIT_RE.sub("", nCleanNumber)
         numCount = len(nsnTemp)
         if numCount == 10:
             if int(nsnTemp[0]) == 0:
@@ -687,26 +723,23 @@ def validate_phone_number(input):
                         + nsnTemp[:2]
                     )
             else:
-                for iRegion, iCountry, location, areaCode in areaCodes1:
-                    mX = re.search(areaCode, nsnTemp[:3])
-                    if mX:
-                        nStatus = "Valid"
-                        status_ad += "" if location == "" else " - " + location
-                        nRegion = iRegion
-                        nCountry = iCountry
-                        nCleanNumber = (
-                            "+1 ("
-                            + nsnTemp[:3]
-                            + ") "
-                            + nsnTemp[3:6]
-                            + "-"
-                            + nsnTemp[6:10]
-                        )
-                        nReason = location + " Area Code: " + nsnTemp[:3]
-                        break
+                areaCode = AREA_CODE_LOOKUP.get(nsnTemp[:3])
+                if areaCode:
+                    nStatus = "Valid"
+                    nRegion, nCountry, location = areaCode
+                    status_ad += "" if location == "" else " - " + location
+                    nCleanNumber = (
+                        "+1 ("
+                        + nsnTemp[:3]
+                        + ") "
+                        + nsnTemp[3:6]
+                        + "-"
+                        + nsnTemp[6:10]
+                    )
+                    nReason = location + " Area Code: " + nsnTemp[:3]
 
     if nStatus == "Invalid":
-        numCount = len(re.findall(r"\d", nCleanNumber))
+        numCount = len(DIGIT_RE.findall(nCleanNumber))
         if numCount == 0:
             nReason = "Missing Digits"
         elif numCount < 9:
@@ -751,6 +784,134 @@ def validate_phone_number(input):
     }
 
 
+# Results cached by validate_phone_number_cached (CRM data repeats switchboard and junk numbers)
+PHONE_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=PHONE_CACHE_SIZE)
+def _validate_phone_cached(phone_number):
+    return MappingProxyType(validate_phone_number({"phone": phone_number}))
+
+
+def validate_phone_number_cached(phone_number):
+    """
+    Memoized validate_phone_number for a raw phone value, keyed on the trimmed string.
+    Returns a read-only mapping (shared between callers). Non-string values are not cached.
+    """
+    if not isinstance(phone_number, str):
+        return MappingProxyType(validate_phone_number({"phone": phone_number}))
+    # Surrounding whitespace doesn't change the result; whitespace-only values keep one
+    # space so they still validate as blank numbers rather than missing ones
+    return _validate_phone_cached(phone_number.strip() or phone_number[:1])
+
+
+def phone_cache_stats():
+    """Hit/miss counts, current size and hit rate of the validate_phone_number_cached cache"""
+    info = _validate_phone_cached.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+# Fields returned by validate_phone_series unless others are requested
+SERIES_FIELDS = ("nStatus", "nCountry", "nCleanNumber")
+
+# AREA_CODE_LOOKUP as a frame for column-wise lookups, with countries as reported in results
+AREA_CODE_FRAME = pd.DataFrame.from_dict(
+    AREA_CODE_LOOKUP, orient="index", columns=["region", "country", "location"]
+)
+AREA_CODE_FRAME["country"] = AREA_CODE_FRAME["country"].replace(
+    {"Non Geographic": "United States", "US/CA": "United States"}
+)
+AREA_CODE_FRAME["status"] = np.where(
+    AREA_CODE_FRAME["location"].str.contains("Toll-Free", regex=False),
+    "Maybe Valid",
+    "Valid",
+)
+
+# Six identical trailing digits get flagged ("Too Many Xs") by the scalar validator
+REPEATED_SIX_DIGITS = [str(d) * 6 for d in range(10)]
+
+
+def _us_ca_fast_path(values, fields):
+    """
+    Requested fields for the values that are plain US/CA 10-digit numbers with a known area
+    code, computed column-wise. These take the same path through validate_phone_number (first
+    US/CA pattern, area code lookup, nothing after it applies); values with six repeated
+    trailing digits are left to the scalar validator, which flags them.
+    """
+    parts = values.str.strip().str.extract(US_CA_PATTERNS[0][0])
+    area, exchange, line = parts[1], parts[2], parts[3]
+    eligible = area.isin(AREA_CODE_FRAME.index) & ~(exchange.str[1:] + line).isin(
+        REPEATED_SIX_DIGITS
+    )
+    area, exchange, line = area[eligible], exchange[eligible], line[eligible]
+    info = AREA_CODE_FRAME.loc[area.to_numpy()].set_axis(area.index)
+
+    def reason():
+        return info["location"] + " Area Code: " + area
+
+    columns = {
+        "nCleanNumber": lambda: "+1 (" + area + ") " + exchange + "-" + line,
+        "nExtension": lambda: None,
+        "nRegion": lambda: info["region"],
+        "nCountry": lambda: info["country"],
+        "nStatus": lambda: info["status"],
+        "nReason": reason,
+        "nDetails": lambda: info["status"]
+        + " - "
+        + info["region"]
+        + " | "
+        + info["country"]
+        + " - "
+        + reason(),
+    }
+    return pd.DataFrame({field: columns[field]() for field in fields}, index=area.index)
+
+
+def validate_phone_series(phones, fields=SERIES_FIELDS):
+    """
+    Validate a pandas Series of phone values; same results as validate_phone_number per value.
+
+    Values are deduplicated first. Plain US/CA 10-digit numbers are resolved column-wise with
+    str.extract and everything else goes through validate_phone_number_cached. Missing values
+    (None/NaN) validate as missing numbers.
+
+    Returns:
+        DataFrame with one column per requested field, indexed like phones
+    """
+    codes, uniques = pd.factorize(phones, use_na_sentinel=True)
+    uniques = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+
+    is_text = uniques.map(lambda value: isinstance(value, str)).astype(bool)
+    fast = _us_ca_fast_path(uniques[is_text], fields)
+
+    # One slot per unique value, plus a last slot for missing values (factorize code -1)
+    results = {field: np.empty(len(uniques) + 1, dtype=object) for field in fields}
+    for field in fields:
+        results[field][fast.index.to_numpy()] = fast[field].to_numpy(dtype=object)
+
+    missing = validate_phone_number({"phone": None})
+    for field in fields:
+        results[field][-1] = missing[field]
+
+    remaining = np.ones(len(uniques), dtype=bool)
+    remaining[fast.index.to_numpy()] = False
+    for position in np.flatnonzero(remaining):
+        result = validate_phone_number_cached(uniques.iat[position])
+        for field in fields:
+            results[field][position] = result[field]
+
+    return pd.DataFrame(
+        {field: results[field][codes] for field in fields}, index=phones.index
+    )
+
+
 def standardize_header(header):
     clean_header = re.sub(r"[\W]", " ", header).lower().strip()
     clean_header = re.sub(r" +", "_", clean_header)
@@ -761,140 +922,181 @@ def standardize_header(header):
     return header
 
 
-if __name__ == "__main__":
-    # input_file = 'natalie_phone_test.csv'   #Natalie's Phone Test
-    # input_file = 'david_phone_test.csv'     #David's Phone Test
-    # input_file = 'International Leads Routing Checkv2.csv' #Natalie's Original File
-    # input_file = 'Historical DSA Webleads.csv'   #DSA Test
-    input_file = "DFR MQL 2023.csv"  # DFR Test
+# Result fields in the order validate_phone_number returns them (and the CLI writes them)
+RESULT_FIELDS = (
+    "nCleanNumber",
+    "nExtension",
+    "nRegion",
+    "nCountry",
+    "nStatus",
+    "nReason",
+    "nDetails",
+)
 
-    input_file = "./Test/" + input_file
+# CLI defaults: rows per chunk sent to a worker, chunks in flight per worker
+CLI_CHUNK_ROWS = 50000
+CLI_CHUNKS_PER_WORKER = 2
 
-    lowquality = (
-        False  # Make it really easy to just get a clean list of low quality records
-    )
 
-    if lowquality:
-        output_file = input_file.replace(".csv", "_lowquality.csv", 1)
-    else:
-        output_file = input_file.replace(".csv", "_results.csv", 1)
+def validate_phone_chunk(phones):
+    """Result tuples (RESULT_FIELDS order) for a chunk of raw phone values (run in CLI workers)"""
+    results = validate_phone_series(pd.Series(phones, dtype=object), fields=RESULT_FIELDS)
+    return list(results.itertuples(index=False, name=None))
+
+
+def _read_chunks(reader, chunk_rows):
+    while True:
+        rows = list(itertools.islice(reader, chunk_rows))
+        if not rows:
+            return
+        yield rows
+
+
+def _validated_chunks(chunks, phone_index, workers):
+    """(rows, results) per chunk in input order, validating up to a bounded number of chunks ahead"""
+
+    def phones(rows):
+        if phone_index is None:
+            return [None] * len(rows)
+        return [row[phone_index] if phone_index < len(row) else None for row in rows]
+
+    if workers <= 1:
+        for rows in chunks:
+            yield rows, validate_phone_chunk(phones(rows))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for rows in chunks:
+            pending.append((rows, executor.submit(validate_phone_chunk, phones(rows))))
+            if len(pending) >= workers * CLI_CHUNKS_PER_WORKER:
+                rows, future = pending.popleft()
+                yield rows, future.result()
+        while pending:
+            rows, future = pending.popleft()
+            yield rows, future.result()
+
+
+def process_phone_csv(
+    input_file, output_file, lowquality=False, workers=None, chunk_rows=CLI_CHUNK_ROWS
+):
+    """
+    Validate the phone column of a CSV file and write the results, streaming in chunks.
+
+    Chunks are validated across a process pool and written in input order. With lowquality
+    set, only the original columns of low quality records are written (not valid, or outside
+    US/CA). Returns the summary counters.
+    """
+    workers = workers or os.cpu_count() or 1
 
     with open(
         input_file, encoding="utf-8-sig", mode="r", errors="replace"
     ) as infile, open(output_file, mode="w", newline="") as outfile:
-        tStart = time.time()  # Record the start time
+        reader = csv.reader(infile)
+        original_header = next(reader, [])
 
-        reader = csv.DictReader(infile)
-        original_header = reader.fieldnames
-        new_header = [h for h in original_header if h != ""]
+        # Columns with a header are kept (in order); the phone column is found by its header
+        kept_columns = [i for i, h in enumerate(original_header) if h != ""]
+        new_header = [original_header[i] for i in kept_columns]
+        phone_index = None
+        for i, h in enumerate(original_header):
+            if standardize_header(h) == "phone":
+                phone_index = i
         if not lowquality:
-            new_header += [
-                "nCleanNumber",
-                "nExtension",
-                "nRegion",
-                "nCountry",
-                "nStatus",
-                "nReason",
-                "nDetails",
-                "cUS/CA",
-            ]
-
-        # Mapping to find the phone column
-        hDict = {}
-        for h in original_header:
-            hDict[standardize_header(h)] = h
-
-        # print(f"{new_header}")
-
-        writer = csv.DictWriter(
+            new_header += list(RESULT_FIELDS) + ["cUS/CA"]
+
+        writer = csv.writer(
             outfile,
-            fieldnames=new_header,
             delimiter=",",
             quotechar='"',
             quoting=csv.QUOTE_ALL,
         )
-        writer.writeheader()
+        writer.writerow(new_header)
 
         # Track Summary
-        cTotal = 0
-        cExtension = 0
-        cCountry = 0
-        cStatus_Valid = 0
-        cStatus_MaybeValid = 0
-        cStatus_LikelyNotValid = 0
-        cStatus_Invalid = 0
-
-        for original_row in reader:
-            phone_number = (
-                original_row[hDict.get("phone")] if hDict.get("phone") else None
-            )
-            nCleanNumber, nExtension, nRegion, nCountry, nStatus, nReason, nDetails = (
-                validate_phone_number({"phone": phone_number}).values()
-            )
-
-            new_row = {k: v for k, v in original_row.items() if k}
-            if lowquality:
-                if nStatus in ["Likely Not Valid", "Invalid"] or nCountry not in [
-                    "United States",
-                    "Canada",
-                ]:
-                    writer.writerow(new_row)
-            else:
-                new_row.update(
-                    {
-                        "nCleanNumber": nCleanNumber,
-                        "nExtension": nExtension,
-                        "nRegion": nRegion,
-                        "nCountry": nCountry,
-                        "nStatus": nStatus,
-                        "nReason": nReason,
-                        "nDetails": nDetails,
-                        "cUS/CA": nCountry
-                        if nCountry in ["United States", "Canada"]
-                        else "Other",
-                    }
-                )
-                writer.writerow(new_row)
-
-            cTotal += 1
-            if nExtension:
-                cExtension += 1
-            if nCountry:
-                cCountry += 1
-
-            if nStatus == "Valid":
-                cStatus_Valid += 1
-            elif nStatus == "Maybe Valid":
-                cStatus_MaybeValid += 1
-            elif nStatus == "Likely Not Valid":
-                cStatus_LikelyNotValid += 1
-            elif nStatus == "Invalid":
-                cStatus_Invalid += 1
+        counters = {
+            "cTotal": 0,
+            "cExtension": 0,
+            "cCountry": 0,
+            "cStatus_Valid": 0,
+            "cStatus_MaybeValid": 0,
+            "cStatus_LikelyNotValid": 0,
+            "cStatus_Invalid": 0,
+        }
+        status_counters = {
+            "Valid": "cStatus_Valid",
+            "Maybe Valid": "cStatus_MaybeValid",
+            "Likely Not Valid": "cStatus_LikelyNotValid",
+            "Invalid": "cStatus_Invalid",
+        }
+
+        for rows, results in _validated_chunks(
+            _read_chunks(reader, chunk_rows), phone_index, workers
+        ):
+            out_rows = []
+            for row, result in zip(rows, results):
+                nCleanNumber, nExtension, nRegion, nCountry, nStatus, nReason, nDetails = result
+                new_row = [row[i] if i < len(row) else None for i in kept_columns]
+                if lowquality:
+                    if nStatus in ["Likely Not Valid", "Invalid"] or nCountry not in [
+                        "United States",
+                        "Canada",
+                    ]:
+                        out_rows.append(new_row)
+                else:
+                    out_rows.append(
+                        new_row
+                        + list(result)
+                        + [nCountry if nCountry in ["United States", "Canada"] else "Other"]
+                    )
+
+                counters["cTotal"] += 1
+                if nExtension:
+                    counters["cExtension"] += 1
+                if nCountry:
+                    counters["cCountry"] += 1
+                if nStatus in status_counters:
+                    counters[status_counters[nStatus]] += 1
+            writer.writerows(out_rows)
+
+    return counters
+
+
+def print_summary(counters, tDuration):
+    cTotal = counters["cTotal"]
+    cExtension = counters["cExtension"]
+    cCountry = counters["cCountry"]
+    cStatus_Valid = counters["cStatus_Valid"]
+    cStatus_MaybeValid = counters["cStatus_MaybeValid"]
+    cStatus_LikelyNotValid = counters["cStatus_LikelyNotValid"]
+    cStatus_Invalid = counters["cStatus_Invalid"]
+
+    print(f"# Execution Time:    {tDuration}s")
+    print(f"# Total:             {format(cTotal,',')}")
+    if not cTotal:
+        return
+    print(
+        f"# w/ Extension:      {format(cExtension,',')} | {str(round(cExtension / cTotal * 100,1))}%"
+    )
+    print(
+        f"# w/ Country:        {format(cCountry,',')} | {str(round(cCountry / cTotal * 100,1))}%"
+    )
+    print(
+        f"# Phone Valid:       {format(cStatus_Valid,',')} | {str(round(cStatus_Valid / cTotal * 100,1))}%"
+    )
+    print(
+        f"# Phone Maybe Valid: {format(cStatus_MaybeValid,',')} | {str(round(cStatus_MaybeValid / cTotal * 100,1))}%"
+    )
+    print(
+        f"# Phone LikelyNot V: {format(cStatus_LikelyNotValid,',')} | {str(round(cStatus_LikelyNotValid / cTotal * 100,1))}%"
+    )
+    print(
+        f"# Phone Invalid:     {format(cStatus_Invalid,',')} | {str(round(cStatus_Invalid / cTotal * 100,1))}%"
+    )
 
-        tEnd = time.time()  # Record the end time
-        tDuration = round(tEnd - tStart, 1)  # Calculate the Duration
-        print(f"# Execution Time:    {tDuration}s")
-        print(f"# Total:             {format(cTotal,',')}")
-        print(
-            f"# w/ Extension:      {format(cExtension,',')} | {str(round(cExtension / cTotal * 100,1))}%"
-        )
-        print(
-            f"# w/ Country:        {format(cCountry,',')} | {str(round(cCountry / cTotal * 100,1))}%"
-        )
-        print(
-            f"# Phone Valid:       {format(cStatus_Valid,',')} | {str(round(cStatus_Valid / cTotal * 100,1))}%"
-        )
-        print(
-            f"# Phone Maybe Valid: {format(cStatus_MaybeValid,',')} | {str(round(cStatus_MaybeValid / cTotal * 100,1))}%"
-        )
-        print(
-            f"# Phone LikelyNot V: {format(cStatus_LikelyNotValid,',')} | {str(round(cStatus_LikelyNotValid / cTotal * 100,1))}%"
-        )
-        print(
-            f"# Phone Invalid:     {format(cStatus_Invalid,',')} | {str(round(cStatus_Invalid / cTotal * 100,1))}%"
-        )
 
-    # Unit Tests
+def run_unit_tests():
+    """Run the validator's unit tests; prints each failure and returns True when all pass"""
     failure = None
     unitTests = [
         (
@@ -985,8 +1187,75 @@ if __name__ == "__main__":
             print(f"T{i} phone_number: {test}")
             print(f"T{i} Expected->: {rExpected}")
             print(f"T{i} Actual--->: {rActual}")
-            print(f"T{i} aCleanNumber: " + result["nCleanNumber"])
+            print(f"T{i} aCleanNumber: " + str(result["nCleanNumber"]))
             print(f"T{i} aDetails:     " + result["nDetails"] + "\n")
 
-    if not failure:
+    return not failure
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate the phone column of a CSV file (results are added as columns)"
+    )
+    parser.add_argument("input_file", nargs="?", help="CSV file with a phone column")
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_file",
+        help="Output CSV (default: <input>_results.csv, or <input>_lowquality.csv with --lowquality)",
+    )
+    parser.add_argument(
+        "--lowquality",
+        action="store_true",
+        help="Only write low quality records (not valid, or outside US/CA), with their original columns",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count; 1 validates in this process)",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=CLI_CHUNK_ROWS,
+        help=f"Rows per chunk (default: {CLI_CHUNK_ROWS})",
+    )
+    parser.add_argument(
+        "--skip-tests", action="store_true", help="Don't run the unit tests afterwards"
+    )
+    args = parser.parse_args(argv)
+
+    output_file = None
+    if args.input_file:
+        output_file = args.output_file or args.input_file.replace(
+            ".csv", "_lowquality.csv" if args.lowquality else "_results.csv", 1
+        )
+        if output_file == args.input_file:
+            parser.error("output file must differ from the input file")
+
+        tStart = time.time()  # Record the start time
+        counters = process_phone_csv(
+            args.input_file,
+            output_file,
+            lowquality=args.lowquality,
+            workers=args.workers,
+            chunk_rows=args.chunk_rows,
+        )
+        tEnd = time.time()  # Record the end time
+        tDuration = round(tEnd - tStart, 1)  # Calculate the Duration
+        print_summary(counters, tDuration)
+
+    if args.skip_tests:
+        return 0
+    if not run_unit_tests():
+        return 1
+    if output_file:
         print(f"SUCCESS: New File: {output_file}\n")
+    else:
+        print("SUCCESS: Unit tests passed\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
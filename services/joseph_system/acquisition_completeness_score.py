@@ -1,9 +1,111 @@
+import time
+
 import pandas as pd
 import numpy as np
 
-import logging
-
 from completeness_dependency_loader import CompletenessDependencyLoader
+from completeness_ruleset import compile_ruleset, score_completeness
+from scoring_logging import get_logger, log_batch_summary
+
+# Default explicit ruleset (see completeness_ruleset for the rule format)
+ACQUISITION_RULESET = {
+    "first_name": {
+        "rules": [
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower", "values": "invalid_names"},
+        ],
+        "score_choice": [0, 0],
+        "score_default": 100,
+    },
+    "last_name": {
+        "rules": [
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower", "values": "invalid_names"},
+        ],
+        "score_choice": [0, 0],
+        "score_default": 100,
+    },
+    "email_domain": {
+        "rules": [
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower_strip", "values": "invalid_domains"},
+        ],
+        "score_choice": [0, 0],
+        "score_default": 100,
+    },
+    "phone": {
+        "rules": [
+            {"check": "isnull"},
+            {
+                "check": "match",
+                "normalize": "str",
+                "pattern": "invalid_phone_pattern",
+                "negate": True,
+            },
+        ],
+        "score_choice": [0, 0],
+        "score_default": 100,
+    },
+    "state_province": {
+        "rules": [
+            {"check": "isnull"},
+            {
+                "check": "isin",
+                "normalize": "lower_strip",
+                "values": "states_in_rc_territories",
+            },
+            {"check": "notnull"},
+        ],
+        "score_choice": [0, 100, 75],
+        "score_default": 50,
+    },
+    "country": {
+        "rules": [
+            {"check": "isnull"},
+            {
+                "check": "isin",
+                "normalize": "lower_strip",
+                "values": "countries_google_list",
+            },
+            {"check": "notnull"},
+        ],
+        "score_choice": [0, 100, 75],
+        "score_default": 50,
+    },
+    # "employees": {
+    #     "rules": [
+    #         {"check": "isnull"},
+    #         {"check": "le", "value": 0},
+    #     ],
+    #     "score_choice": [0, 100],
+    #     "score_default": 100,
+    # },
+    "sector": {
+        "rules": [
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower_strip", "values": "rc_sectors"},
+            {"check": "notnull"},
+        ],
+        "score_choice": [0, 100, 75],
+        "score_default": 50,
+    },
+    "company": {
+        "rules": [
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower", "values": "invalid_companies"},
+        ],
+        "score_choice": [0, 0],
+        "score_default": 100,
+    },
+    "website_domain": {
+        "rules": [
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower_strip", "values": "invalid_domains"},
+        ],
+        "score_choice": [0, 0],
+        "score_default": 100,
+    },
+}
 
 
 class AcquisitionCompletenessScorer:
@@ -18,21 +120,15 @@ class AcquisitionCompletenessScorer:
         # Initialize CompletenessDependencyLoader (config_path is optional)
         self.dependency_loader = CompletenessDependencyLoader(config_path)
         self.dependencies = self.dependency_loader.load()
+        self.ruleset = compile_ruleset(ACQUISITION_RULESET, self.dependencies)
 
         self.logger = self._initialize_logger()
 
     def _initialize_logger(self):
         """
-        Sets up a logger for the scorer.
+        Returns the shared scoring logger for the scorer (see scoring_logging).
         """
-        logger = logging.getLogger(__name__)
-        logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler()
-        handler.setFormatter(
-            logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        )
-        logger.addHandler(handler)
-        return logger
+        return get_logger("acquisition")
 
     def score(
         self,
@@ -46,9 +142,11 @@ class AcquisitionCompletenessScorer:
         :param df: Input DataFrame to be scored.
         :param column_mapping: Dictionary mapping column names.
         :param column_weights: List of weights for each column.
-        :param ruleset: Dictionary defining rules for scoring. If None, default ruleset is used.
+        :param ruleset: Dictionary defining rules for scoring (declarative checks or boolean masks).
+            If None, default ruleset is used.
         :return: DataFrame with acquisition completeness scores.
         """
+        start = time.perf_counter()
         df = df.copy()
 
         # Default column mapping
@@ -78,149 +176,30 @@ class AcquisitionCompletenessScorer:
             0.125,
         ]
 
-        # Default explicit ruleset
-        if ruleset is None:
-            ruleset = {
-                "first_name": {
-                    "rules": [
-                        df[column_mapping["first_name"]].isnull(),
-                        df[column_mapping["first_name"]]
-                        .astype(str)
-                        .str.lower()
-                        .isin(self.dependencies["invalid_names"]),
-                    ],
-                    "score_choice": [0, 0],
-                    "score_default": 100,
-                },
-                "last_name": {
-                    "rules": [
-                        df[column_mapping["last_name"]].isnull(),
-                        df[column_mapping["last_name"]]
-                        .astype(str)
-                        .str.lower()
-                        .isin(self.dependencies["invalid_names"]),
-                    ],
-                    "score_choice": [0, 0],
-                    "score_default": 100,
-                },
-                "email_domain": {
-                    "rules": [
-                        df[column_mapping["email_domain"]].isnull(),
-                        df[column_mapping["email_domain"]]
-                        .astype(str)
-                        .str.lower()
-                        .str.strip()
-                        .isin(self.dependencies["invalid_domains"]),
-                    ],
-                    "score_choice": [0, 0],
-                    "score_default": 100,
-                },
-                "phone": {
-                    "rules": [
-                        df[column_mapping["phone"]].isnull(),
-                        ~df[column_mapping["phone"]]
-                        .astype(str)
-                        .str.match(
-                            self.dependencies["invalid_phone_pattern"], na=False
-                        ),
-                    ],
-                    "score_choice": [0, 0],
-                    "score_default": 100,
-                },
-                "state_province": {
-                    "rules": [
-                        df[column_mapping["state_province"]].isnull(),
-                        df[column_mapping["state_province"]]
-                        .astype(str)
-                        .str.lower()
-                        .str.strip()
-                        .isin(self.dependencies["states_in_rc_territories"]),
-                        df[column_mapping["state_province"]].notnull(),
-                    ],
-                    "score_choice": [0, 100, 75],
-                    "score_default": 50,
-                },
-                "country": {
-                    "rules": [
-                        df[column_mapping["country"]].isnull(),
-                        df[column_mapping["country"]]
-                        .astype(str)
-                        .str.lower()
-                        .str.strip()
-                        .isin(self.dependencies["countries_google_list"]),
-                        df[column_mapping["country"]].notnull(),
-                    ],
-                    "score_choice": [0, 100, 75],
-                    "score_default": 50,
-                },
-                # "employees": {
-                #     "rules": [
-                #         df[column_mapping["employees"]].isnull(),
-                #         df[column_mapping["employees"]] <= 0,
-                #     ],
-                #     "score_choice": [0, 100],
-                #     "score_default": 100,
-                # },
-                "sector": {
-                    "rules": [
-                        df[column_mapping["sector"]].isnull(),
-                        df[column_mapping["sector"]]
-                        .astype(str)
-                        .str.lower()
-                        .str.strip()
-                        .isin(self.dependencies["rc_sectors"]),
-                        df[column_mapping["sector"]].notnull(),
-                    ],
-                    "score_choice": [0, 100, 75],
-                    "score_default": 50,
-                },
-                "company": {
-                    "rules": [
-                        df[column_mapping["company"]].isnull(),
-                        df[column_mapping["company"]]
-                        .astype(str)
-                        .str.lower()
-                        .isin(self.dependencies["invalid_companies"]),
-                    ],
-                    "score_choice": [0, 0],
-                    "score_default": 100,
-                },
-                "website_domain": {
-                    "rules": [
-                        df[column_mapping["website_domain"]].isnull(),
-                        df[column_mapping["website_domain"]]
-                        .astype(str)
-                        .str.lower()
-                        .str.strip()
-                        .isin(self.dependencies["invalid_domains"]),
-                    ],
-                    "score_choice": [0, 0],
-                    "score_default": 100,
-                },
-            }
+        # Default explicit ruleset (compiled once in __init__)
+        ruleset = (
+            self.ruleset
+            if ruleset is None
+            else compile_ruleset(ruleset, self.dependencies)
+        )
 
         # Scoring logic
-        output_cols = []
-        for key in column_mapping.keys():
-            if key not in ruleset:
-                self.logger.warning(f"No rules defined for column: {key}")
-                continue
-
-            condlist = ruleset[key]["rules"]
-            choicelist = ruleset[key]["score_choice"]
-            df[f"{key}_score"] = np.select(
-                condlist=condlist,
-                choicelist=choicelist,
-                default=ruleset[key]["score_default"],
-            )
-            output_cols.append(f"{key}_score")
-            self.logger.info(f"Scored {key} successfully.")
+        column_times = {}
+        output_cols = score_completeness(
+            df, ruleset, column_mapping, self.logger, column_times
+        )
 
         # Calculate final completeness score
         df["acquisition_completeness_score"] = np.rint(
             np.sum(df[output_cols].values * np.array(column_weights), axis=1)
         )
-        self.logger.info("Successfully calculated acquisition completeness score.")
+        log_batch_summary(
+            self.logger,
+            "acquisition_completeness",
+            len(df),
+            time.perf_counter() - start,
+            column_times,
+        )
         return df
 
 
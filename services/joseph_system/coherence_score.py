@@ -1,16 +1,59 @@
 import logging
+import time
+from collections import ChainMap
 
 import numpy as np
 import pandas as pd
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz
+from rapidfuzz.process import cpdist
 
-from .PhoneValidation_BrianChiosi import validate_phone_number
+from .PhoneValidation_BrianChiosi import phone_cache_stats, validate_phone_series
+from .scoring_logging import get_logger, log_batch_summary
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+logger = get_logger("coherence")
+
+# Columns scored by each coherence component (the defaults of the component methods)
+NAME_COLUMNS = ("first_name", "last_name")
+SIMILARITY_PAIRS = (
+    ("email_domain", "website_domain"),
+    ("email_domain", "zi_website_domain"),
+    ("website_domain", "zi_website_domain"),
+    ("company", "zi_company_name"),
+)
+SIMILARITY_SCORE_NAMES = (
+    "email_vs_website_similarity_score",
+    "email_vs_zi_website_similarity_score",
+    "website_vs_zi_website_similarity_score",
+    "company_vs_zi_company_similarity_score",
+)
+SEGMENT_SOURCE_PAIRS = (("zi_company_country", "zi_employees"),)
+SEGMENT_COLUMNS = ("zi_segment",)
+SEGMENT_PAIRS = (
+    ("rtlm_mql_owner_vp_segment", "segment_name"),
+    ("zi_segment", "segment_name"),
 )
-logger = logging.getLogger(__name__)
+SEGMENT_SCORE_NAMES = (
+    "owner_segment_vs_segment_master_score",
+    "zi_segment_vs_segment_master_score",
+)
+
+
+def fuzzy_ratios(left, right):
+    """fuzz.ratio (rounded to an int 0-100) for each pair left[i], right[i]"""
+    if not len(left):
+        return np.zeros(0, dtype=int)
+    scores = cpdist(left, right, scorer=fuzz.ratio, dtype=np.float64, workers=-1)
+    return np.rint(scores).astype(int)
+
+
+def normalize_similarity_text(values):
+    """Stripped, lowercased text for a column (object array); missing and blank values become None"""
+    text = np.full(len(values), None, dtype=object)
+    present = values.notna().to_numpy()
+    normalized = values[present].astype(str).str.strip().str.lower().to_numpy(dtype=object)
+    normalized[normalized == ""] = None
+    text[present] = normalized
+    return text
 
 
 class CoherenceScorer:
@@ -46,273 +89,409 @@ class CoherenceScorer:
                 return 0
 
             # Calculate similarity using fuzz.ratio
-            return np.round(
-                fuzz.ratio(str(s1).strip().lower(), str(s2).strip().lower()), 4
-            )
+            return fuzzy_ratios([str(s1).strip().lower()], [str(s2).strip().lower()])[0]
         except Exception as e:
             logger.error(f"Error in calculate_similarity: {str(e)}")
             return None
 
+    @staticmethod
+    def _name_validation_rules(df, col):
+        """Rule masks for one name column: (normal_name, valid_char)"""
+        normal_name = df[col].str.match(r"^[A-Za-z ,.'-]+$", na=False)
+        # common naming convention allowing for commas, periods, apostrophes, and hyphens
+        # True = valid, False = invalid
+
+        valid_char_mask = df[col].str.contains(r"[0-9@?#$%^&*\"\\\/()\[\]]", na=False)
+        # checks if name has numbers or special characters
+        # has to be reversed because original will flag True=invalid, False=valid
+
+        valid_char = ~valid_char_mask  # Reversed boolean for valid character check
+        return normal_name, valid_char
+
+    @staticmethod
+    def _name_validation_score(df, col, normal_name, valid_char):
+        condlist = [
+            df[f"{col}_score"] == 0,
+            ~(normal_name)
+            & ~(valid_char),  # Condition 1: Not normal and not valid characters
+            (normal_name)
+            & ~(valid_char),  # Condition 2: Normal but not valid characters
+            ~(normal_name)
+            & (valid_char),  # Condition 3: Not normal and all valid characters
+            (normal_name) & (valid_char),  # Condition 4: Normal and all valid characters
+        ]
+
+        choicelist = [0, 0, 50, 50, 100]
+
+        return np.select(condlist, choicelist, default=-1)
+
     def coherence_name_validation(
-        self, df, name_cols=["first_name", "last_name"], output_rules=False
+        self, df, name_cols=NAME_COLUMNS, output_rules=False
     ):
-        logger.info("Starting name validation")
+        logger.debug("Starting name validation")
         df = df.copy()
         output_cols = []
 
         for col in name_cols:
-            logger.info(f"Validating {col}")
-            normal_name = df[col].str.match(r"^[A-Za-z ,.'-]+$", na=False)
-            # common naming convention allowing for commas, periods, apostrophes, and hyphens
-            # True = valid, False = invalid
-
-            valid_char_mask = df[col].str.contains(
-                r"[0-9@?#$%^&*\"\\\/()\[\]]", na=False
-            )
-            # checks if name has numbers or special characters
-            # has to be reversed because original will flag True=invalid, False=valid
-
-            valid_char = ~valid_char_mask  # Reversed boolean for valid character check
+            logger.debug("Validating %s", col)
+            normal_name, valid_char = self._name_validation_rules(df, col)
 
             if output_rules:
                 df[f"{col}_normal_name"] = normal_name
                 df[f"{col}_invalid_char"] = valid_char
 
-            condlist = [
-                df[f"{col}_score"] == 0,
-                ~(normal_name)
-                & ~(valid_char),  # Condition 1: Not normal and not valid characters
-                (normal_name)
-                & ~(valid_char),  # Condition 2: Normal but not valid characters
-                ~(normal_name)
-                & (valid_char),  # Condition 3: Not normal and all valid characters
-                (normal_name)
-                & (valid_char),  # Condition 4: Normal and all valid characters
-            ]
-
-            choicelist = [0, 0, 50, 50, 100]
-
             output_cols.append(f"{col}_validation_score")
-            df[f"{col}_validation_score"] = np.select(condlist, choicelist, default=-1)
-            logger.info(f"Successfully scored {col}")
+            df[f"{col}_validation_score"] = self._name_validation_score(
+                df, col, normal_name, valid_char
+            )
+            logger.debug("Successfully scored %s", col)
 
         df["name_validation_score"] = np.sum(
             df[output_cols] * (1 / len(output_cols)), axis=1
         )
-        logger.info("Successfully scored full name validation score")
+        logger.debug("Successfully scored full name validation score")
 
         return df.drop(columns=output_cols) if not output_rules else df
 
+    def _similarity_scores(self, df, pairs_to_score, output_score_names):
+        """Similarity score column (int array) for each column pair, by output name"""
+        # Each column is normalized once, even when it appears in several pairs
+        normalized = {}
+        for col in {col for pair in pairs_to_score for col in pair}:
+            normalized[col] = normalize_similarity_text(df[col])
+
+        # Comparison of the columns (same scores as calculate_similarity, computed in bulk)
+        output = {}
+        for (col1, col2), score_col in zip(pairs_to_score, output_score_names):
+            logger.debug("Comparing %s and %s", col1, col2)
+            text1, text2 = normalized[col1], normalized[col2]
+
+            # Only rows with both values present and neither side scored 0 are compared
+            needed = (
+                ~((df[f"{col1}_score"] == 0) | (df[f"{col2}_score"] == 0)).to_numpy()
+                & (text1 != None)  # noqa: E711 (elementwise on object arrays)
+                & (text2 != None)  # noqa: E711
+            )
+
+            scores = np.zeros(len(df), dtype=int)
+            unique_pair_count = 0
+            if needed.any():
+                # Identical pairs (shared domains, repeated company names) are scored once
+                pair_codes, unique_pairs = pd.MultiIndex.from_arrays(
+                    [text1[needed], text2[needed]]
+                ).factorize()
+                unique_scores = fuzzy_ratios(
+                    list(unique_pairs.get_level_values(0)),
+                    list(unique_pairs.get_level_values(1)),
+                )
+                scores[needed] = unique_scores[pair_codes]
+                unique_pair_count = len(unique_pairs)
+
+            output[score_col] = scores
+            logger.debug(
+                "Completed scoring for %s (%d rows compared, %d unique pairs)",
+                score_col,
+                needed.sum(),
+                unique_pair_count,
+            )
+
+        return output
+
     def coherence_similarity_score(
         self,
         df,
-        pairs_to_score=[
-            ("email_domain", "website_domain"),
-            ("email_domain", "zi_website_domain"),
-            ("website_domain", "zi_website_domain"),
-            ("company", "zi_company_name"),
-        ],
-        output_score_names=[
-            "email_vs_website_similarity_score",
-            "email_vs_zi_website_similarity_score",
-            "website_vs_zi_website_similarity_score",
-            "company_vs_zi_company_similarity_score",
-        ],
+        pairs_to_score=SIMILARITY_PAIRS,
+        output_score_names=SIMILARITY_SCORE_NAMES,
     ):
-        logger.info("Starting similarity score calculations")
+        logger.debug("Starting similarity score calculations")
         df = df.copy()
-
-        # Comparison of the columns
-        for (col1, col2), score_col in zip(pairs_to_score, output_score_names):
-            logger.info(f"Comparing {col1} and {col2}")
-            df[score_col] = np.where(
-                (df[f"{col1}_score"] == 0) | (df[f"{col2}_score"] == 0),
-                0,
-                df.apply(
-                    lambda row: self.calculate_similarity(row[col1], row[col2]), axis=1
-                ),
-            )
-            logger.info(f"Completed scoring for {score_col}")
+        for score_col, scores in self._similarity_scores(
+            df, pairs_to_score, output_score_names
+        ).items():
+            df[score_col] = scores
 
         return df
 
+    @staticmethod
+    def _segment_labels(df, country, employee):
+        """Segment name for each row from its company country and employee count"""
+        employees = df[employee]
+        # Each mask is evaluated once and shared by the US/Canada and international rules
+        in_uscan = df[country].isin(["United States", "Canada"])
+        outside_uscan = ~in_uscan
+        soho = (employees >= 0) & (employees <= 19)
+        small_business = (employees >= 20) & (employees <= 99)
+        enterprise = employees >= 5000
+
+        condlist = [
+            (employees.isnull()),
+            in_uscan & soho,
+            in_uscan & small_business,
+            in_uscan & (employees >= 100) & (employees <= 399),
+            in_uscan & (employees >= 400) & (employees <= 4999),
+            in_uscan & enterprise,
+            outside_uscan & soho,
+            outside_uscan & small_business,
+            outside_uscan & (employees >= 100) & (employees <= 4999),
+            outside_uscan & enterprise,
+        ]
+        choicelist = [
+            "No Employee Count",
+            "SOHO",
+            "Small Business",
+            "Mid Market",
+            "Majors",
+            "Enterprise",
+            "SOHO",
+            "Small Business",
+            "Majors",
+            "Enterprise",
+        ]
+        return np.select(condlist, choicelist, default="No Employee Count")
+
     def generate_segment(
         self,
         df,
-        country_emp_source_pairs=[
-            ("zi_company_country", "zi_employees"),
-        ],
-        output_columns=["zi_segment"],
+        country_emp_source_pairs=SEGMENT_SOURCE_PAIRS,
+        output_columns=SEGMENT_COLUMNS,
     ):
-        logger.info("Generating segments")
+        logger.debug("Generating segments")
         df = df.copy()
-        uscan = ["United States", "Canada"]
 
         for (country, employee), output in zip(
             country_emp_source_pairs, output_columns
         ):
-            logger.info(f"Generating segment for {output}")
-            condlist = [
-                (df[employee].isnull()),
-                (df[country].isin(uscan)) & (df[employee] >= 0) & (df[employee] <= 19),
-                (df[country].isin(uscan)) & (df[employee] >= 20) & (df[employee] <= 99),
-                (df[country].isin(uscan))
-                & (df[employee] >= 100)
-                & (df[employee] <= 399),
-                (df[country].isin(uscan))
-                & (df[employee] >= 400)
-                & (df[employee] <= 4999),
-                (df[country].isin(uscan)) & (df[employee] >= 5000),
-                (~df[country].isin(uscan)) & (df[employee] >= 0) & (df[employee] <= 19),
-                (~df[country].isin(uscan))
-                & (df[employee] >= 20)
-                & (df[employee] <= 99),
-                (~df[country].isin(uscan))
-                & (df[employee] >= 100)
-                & (df[employee] <= 4999),
-                (~df[country].isin(uscan)) & (df[employee] >= 5000),
-            ]
-            choicelist = [
-                "No Employee Count",
-                "SOHO",
-                "Small Business",
-                "Mid Market",
-                "Majors",
-                "Enterprise",
-                "SOHO",
-                "Small Business",
-                "Majors",
-                "Enterprise",
-            ]
-            df[output] = np.select(condlist, choicelist, default="No Employee Count")
-            logger.info(f"Successfully segmented {output}")
+            logger.debug("Generating segment for %s", output)
+            df[output] = self._segment_labels(df, country, employee)
+            logger.debug("Successfully segmented %s", output)
 
         return df
 
-    def coherence_segment_score(
-        self,
-        df,
-        pairs_to_score=[
-            ("rtlm_mql_owner_vp_segment", "segment_name"),
-            ("zi_segment", "segment_name"),
-        ],
-        output_score_names=[
-            "owner_segment_vs_segment_master_score",
-            "zi_segment_vs_segment_master_score",
-        ],
+    @staticmethod
+    def _segment_match_scores(
+        columns, pairs_to_score, output_score_names, required_scores=None
     ):
-        logger.info("Scoring segment matches")
-
-        df = self.generate_segment(df)
-
+        """
+        Segment match score column for each segment pair, by output name. columns maps column
+        names to Series; pairs with a missing column are skipped (with a warning, unless
+        required_scores is given and doesn't include the pair's score).
+        """
         if len(pairs_to_score) != len(output_score_names):
             raise ValueError(
                 "The number of column pairs must match the number of output score names"
             )
 
+        # Masks on the master segment side are shared by every pair scored against it
+        master_masks = {}
+        output = {}
         # Loop through the pairs of columns and their corresponding output names
-        for (segment1, segment2), output in zip(pairs_to_score, output_score_names):
-            # Make sure columns exist in the DataFrame before applying np.where
-            if segment1 not in df.columns or segment2 not in df.columns:
-                logger.warning(
-                    f"Columns {segment1} or {segment2} not found in the DataFrame"
+        for (segment1, segment2), score_col in zip(pairs_to_score, output_score_names):
+            # Make sure columns exist before applying the rules
+            if segment1 not in columns or segment2 not in columns:
+                level = (
+                    logging.WARNING
+                    if required_scores is None or score_col in required_scores
+                    else logging.DEBUG
+                )
+                logger.log(
+                    level,
+                    "Columns %s or %s not found in the DataFrame",
+                    segment1,
+                    segment2,
                 )
                 continue  # Skip to the next iteration if columns are missing
 
+            segment, master = columns[segment1], columns[segment2]
+            if segment2 not in master_masks:
+                master_masks[segment2] = (
+                    master == "No Employee Count",
+                    master.isin(["Enterprise", "Majors", "Mid Market"]),
+                    master.isin(["Small Business", "SOHO"]),
+                    (master == "Small Business")
+                    & (columns[f"{segment2}_override"] == "Linked to Franchise Account"),
+                )
+            no_count, mme, smb, franchise = master_masks[segment2]
+
             rules = [
-                (df[segment1] == "No Employee Count")
-                | (df[segment2] == "No Employee Count"),
-                (df[segment1] == "MME")
-                & (df[segment2].isin(["Enterprise", "Majors", "Mid Market"])),
-                (df[segment1] == "SMB")
-                & (df[segment2].isin(["Small Business", "SOHO"])),
-                (df[segment1].isin(["Small Business", "SOHO"]))
-                & (df[segment2] == "Small Business")
-                & (df[f"{segment2}_override"] == "Linked to Franchise Account"),
-                df[segment1] == df[segment2],
+                (segment == "No Employee Count") | no_count,
+                (segment == "MME") & mme,
+                (segment == "SMB") & smb,
+                (segment.isin(["Small Business", "SOHO"])) & franchise,
+                segment == master,
             ]
 
             scores = [0, 100, 100, 100, 100]
 
-            df[output] = np.select(condlist=rules, choicelist=scores, default=0)
+            output[score_col] = np.select(condlist=rules, choicelist=scores, default=0)
 
-            logger.info(f"Successfully scored {output}")
+            logger.debug("Successfully scored %s", score_col)
 
-        return df
+        return output
 
-    def coherence_phone_validation_score(
-        self, df, phone_col="phone", output_col="phone_validation_score"
+    def coherence_segment_score(
+        self,
+        df,
+        pairs_to_score=SEGMENT_PAIRS,
+        output_score_names=SEGMENT_SCORE_NAMES,
     ):
-        logger.info("Validating phone numbers")
-        df = df.copy()
-        df["phone"] = df[phone_col].fillna(0)
+        logger.debug("Scoring segment matches")
+
+        df = self.generate_segment(df)
+
+        for score_col, scores in self._segment_match_scores(
+            df, pairs_to_score, output_score_names
+        ).items():
+            df[score_col] = scores
 
-        validation_results = []
-        for index, row in df.iterrows():
-            validation_results.append(validate_phone_number(row))
+        return df
 
-        phone_status = [item["nStatus"] for item in validation_results]
-        df["phone_validation_results"] = phone_status
+    @staticmethod
+    def _phone_validation_columns(df, phone_col, output_col):
+        """The filled phone, validation status and phone validation score columns"""
+        phone = df[phone_col].fillna(0)
+
+        # Deduplicated, with plain US/CA numbers validated column-wise and the rest
+        # served from the validation cache
+        validation_results = validate_phone_series(phone, fields=("nStatus",))["nStatus"]
+        if logger.isEnabledFor(logging.DEBUG):
+            cache_stats = phone_cache_stats()
+            logger.debug(
+                "Phone validation cache: %d hits, %d misses (hit rate %.1f%%)",
+                cache_stats["hits"],
+                cache_stats["misses"],
+                cache_stats["hit_rate"] * 100,
+            )
 
         condlist = [
             df["phone_score"] == 0,
-            df["phone_validation_results"] == "Valid",
-            df["phone_validation_results"] == "Maybe Valid",
-            df["phone_validation_results"] == "Likely Not Valid",
-            df["phone_validation_results"] == "Invalid",
+            validation_results == "Valid",
+            validation_results == "Maybe Valid",
+            validation_results == "Likely Not Valid",
+            validation_results == "Invalid",
         ]
         choicelist = [0, 100, 75, 25, 0]
 
-        df[output_col] = np.select(condlist, choicelist, default=-1)
-        logger.info(f"Successfully scored {output_col}")
+        scores = np.select(condlist, choicelist, default=-1)
+        logger.debug("Successfully scored %s", output_col)
+
+        return {
+            "phone": phone,
+            "phone_validation_results": validation_results,
+            output_col: scores,
+        }
+
+    def coherence_phone_validation_score(
+        self, df, phone_col="phone", output_col="phone_validation_score"
+    ):
+        logger.debug("Validating phone numbers")
+        df = df.copy()
+        for col, values in self._phone_validation_columns(
+            df, phone_col, output_col
+        ).items():
+            df[col] = values
 
         return df
 
-    def compute_coherence_score(self):
-        logger.info("Starting coherence scoring process")
+    def compute_coherence_score(self, scores_only=False):
+        """Scores the coherence component in a single pass over self.df.
+
+        Every derived column (component scores, the generated segment, phone validation
+        results) is computed once from the input columns and the output frame is built once,
+        rather than copying the whole DataFrame at each scoring step.
+
+        :param scores_only: Return only the component score columns and coherence_score
+            (indexed like self.df); self.df is left unchanged.
+        :return: DataFrame with the coherence scores.
+        """
+        logger.debug("Starting coherence scoring process")
+        start = time.perf_counter()
+        df = self.df
+        derived = {}
+        # Input columns and the columns derived so far, by name
+        columns = ChainMap(derived, df)
+        # Required component scores (other pairs may be skipped quietly)
+        required_columns = list(self.column_mapping.values())
 
-        # Pass self.df to each scoring function
-        logger.info("Scoring Coherence - Name validation")
-        df = self.coherence_name_validation(self.df)
-        # logger.info(f"Columns after name validation scoring: {df.columns}")
+        def add_columns(values):
+            for col, column_values in values.items():
+                derived[col] = pd.Series(column_values, index=df.index)
 
-        logger.info("Scoring Coherence - Domain and Company Name Similarity")
-        df = self.coherence_similarity_score(df)
-        # logger.info(f"Columns after similarity scoring: {df.columns}")
+        step_times = {}
+        step_start = start
 
-        logger.info("Scoring Coherence - Segment Match")
-        df = self.coherence_segment_score(df)
-        # logger.info(f"Columns after segment scoring: {df.columns}")
+        def end_step(step):
+            nonlocal step_start
+            now = time.perf_counter()
+            step_times[step] = now - step_start
+            step_start = now
 
-        logger.info("Scoring Coherence - Phone Validation")
-        df = self.coherence_phone_validation_score(df)
-        # logger.info(f"Columns after phone validation: {df.columns}")
+        logger.debug("Scoring Coherence - Name validation")
+        name_scores = [
+            self._name_validation_score(df, col, *self._name_validation_rules(df, col))
+            for col in NAME_COLUMNS
+        ]
+        add_columns(
+            {"name_validation_score": sum(scores * (1 / len(name_scores)) for scores in name_scores)}
+        )
+        end_step("name_validation")
+
+        logger.debug("Scoring Coherence - Domain and Company Name Similarity")
+        add_columns(self._similarity_scores(df, SIMILARITY_PAIRS, SIMILARITY_SCORE_NAMES))
+        end_step("similarity")
+
+        logger.debug("Scoring Coherence - Segment Match")
+        add_columns(
+            {
+                output: self._segment_labels(df, country, employee)
+                for (country, employee), output in zip(SEGMENT_SOURCE_PAIRS, SEGMENT_COLUMNS)
+            }
+        )
+        add_columns(
+            self._segment_match_scores(
+                columns, SEGMENT_PAIRS, SEGMENT_SCORE_NAMES, required_columns
+            )
+        )
+        end_step("segment")
+
+        logger.debug("Scoring Coherence - Phone Validation")
+        add_columns(
+            self._phone_validation_columns(df, "phone", "phone_validation_score")
+        )
+        end_step("phone_validation")
 
-        logger.info("Calculating Coherence Component Score")
+        logger.debug("Calculating Coherence Component Score")
 
         # Ensure required columns are present for the final score calculation
-        required_columns = list(self.column_mapping.values())
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in required_columns if col not in columns]
 
         if missing_columns:
             logger.error(
-                f"Missing columns for coherence score calculation: {missing_columns}"
+                "Missing columns for coherence score calculation: %s", missing_columns
             )
             raise KeyError(
                 "All columns must be present for successful coherence scoring"
             )
 
         # Sum weighted scores for final coherence score
-        df["coherence_score"] = np.rint(
-            np.sum(df[required_columns] * self.column_weights, axis=1)
+        components = pd.DataFrame({col: columns[col] for col in required_columns})
+        derived["coherence_score"] = np.rint(
+            np.sum(components * self.column_weights, axis=1)
         )
 
-        logger.info("Successfully scored data coherence component")
+        end_step("coherence_score")
 
-        # Update the instance DataFrame
-        self.df = df
+        if scores_only:
+            result = pd.DataFrame(
+                {col: values for col, values in derived.items() if col.endswith("_score")}
+            )
+        else:
+            # Update the instance DataFrame
+            self.df = result = df.assign(**derived)
 
-        return df
+        log_batch_summary(
+            logger, "coherence", len(df), time.perf_counter() - start, step_times
+        )
+        return result
 
 
 # Test the class
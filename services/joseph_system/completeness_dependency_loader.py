@@ -1,9 +1,10 @@
-import logging
 import os
 
 import numpy as np
 import pandas as pd
 
+from scoring_logging import get_logger
+
 
 class CompletenessDependencyLoader:
     def __init__(self, config_path=None):
@@ -21,15 +22,8 @@ class CompletenessDependencyLoader:
         self.logger = self._initialize_logger()
 
     def _initialize_logger(self):
-        """Initializes the logger."""
-        logger = logging.getLogger(__name__)
-        logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler()
-        handler.setFormatter(
-            logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        )
-        logger.addHandler(handler)
-        return logger
+        """Returns the shared scoring logger for the loader (see scoring_logging)."""
+        return get_logger("dependencies")
 
     def load(self):
         """Loads all necessary reference files and returns them as a dictionary."""
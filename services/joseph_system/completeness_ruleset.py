@@ -0,0 +1,279 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Declarative completeness rulesets.
+#
+# A ruleset maps each scored column (a column_mapping key) to
+#   {"rules": [...], "score_choice": [...], "score_default": ...}
+# where the first rule that holds picks the score (np.select semantics).
+#
+# A rule is a check, or a list of checks that must all hold. A check is a dict:
+#   "check":     "isnull", "notnull", "isin", "match" or "le"
+#   "column":    column_mapping key to check (defaults to the column being scored)
+#   "normalize": for isin/match, None (raw values), "str" (astype(str)), "lower"
+#                (astype(str).str.lower()) or "lower_strip" (lower, then str.strip())
+#   "values":    for isin, a list of values or the name of a dependency list
+#   "pattern":   for match, a regex or the name of a dependency pattern
+#   "value":     for le, the upper bound
+#   "negate":    True to flag rows where the check does not hold
+#
+# Rules that are already boolean masks over the DataFrame (the format scorers used to take)
+# are used as they are, so custom rulesets can mix both forms.
+
+NORMALIZATIONS = (None, "str", "lower", "lower_strip")
+
+# Rows sampled to tell repetitive columns (normalized per distinct value) from mostly distinct ones
+CARDINALITY_SAMPLE_ROWS = 2048
+
+Check = namedtuple("Check", ["check", "column", "normalize", "argument", "negate"])
+
+
+def _compile_check(spec, key, dependencies):
+    """Resolve a check dict into a hashable Check (dependency names become their values)"""
+    check = spec["check"]
+    column = spec.get("column", key)
+    normalize = spec.get("normalize")
+    if normalize not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization {normalize!r} in rule for {key}")
+
+    if check in ("isnull", "notnull"):
+        argument = None
+    elif check == "isin":
+        values = spec["values"]
+        if isinstance(values, str):
+            values = dependencies[values]
+        argument = tuple(values)
+    elif check == "match":
+        pattern = spec["pattern"]
+        argument = dependencies.get(pattern, pattern)
+    elif check == "le":
+        argument = spec["value"]
+    else:
+        raise ValueError(f"Unknown check {check!r} in rule for {key}")
+
+    return Check(check, column, normalize, argument, bool(spec.get("negate", False)))
+
+
+def _is_check_spec(rule):
+    return isinstance(rule, dict) or (
+        isinstance(rule, list)
+        and len(rule) > 0
+        and all(isinstance(item, dict) for item in rule)
+    )
+
+
+class CompiledRuleset:
+    """A ruleset with its checks resolved and deduplicated, ready to evaluate against DataFrames."""
+
+    def __init__(self, ruleset, dependencies):
+        """
+        :param ruleset: Dictionary defining rules for scoring (declarative checks and/or masks).
+        :param dependencies: Reference lists and patterns from CompletenessDependencyLoader.
+        """
+        self.checks = []
+        check_ids = {}
+        self.columns = {}
+        # Columns the checks look at (e.g. segment_name for the enrichment segment rules)
+        self.checked_columns = set()
+
+        for key, definition in ruleset.items():
+            rules = []
+            for rule in definition["rules"]:
+                if not _is_check_spec(rule):
+                    # Already evaluated mask
+                    rules.append(rule)
+                    continue
+                ids = []
+                for spec in rule if isinstance(rule, list) else [rule]:
+                    check = _compile_check(spec, key, dependencies)
+                    self.checked_columns.add(check.column)
+                    if check not in check_ids:
+                        check_ids[check] = len(self.checks)
+                        self.checks.append(check)
+                    ids.append(check_ids[check])
+                rules.append(tuple(ids))
+            self.columns[key] = (
+                rules,
+                definition["score_choice"],
+                definition["score_default"],
+            )
+
+    def __contains__(self, key):
+        return key in self.columns
+
+    def evaluate(self, df, column_mapping, keys=None, timings=None):
+        """Scores for each ruleset column in keys (default: all), by key.
+
+        Each column is normalized at most once per normalization (per distinct value unless
+        most values are distinct) and each distinct check is evaluated once, however many rules
+        share it.
+
+        :param df: Input DataFrame to be scored.
+        :param column_mapping: Dictionary mapping column names.
+        :param keys: Ruleset columns to score.
+        :param timings: Optional dictionary to fill with elapsed seconds per column (checks
+            shared between columns count toward the first column using them).
+        :return: Dictionary of score arrays.
+        """
+        repetitive = {}
+        factorized = {}
+        normalized = {}
+        normalized_rows = {}
+        masks = {}
+
+        def is_repetitive(column):
+            # Whether a strided sample of the column is mostly repeated values
+            if column not in repetitive:
+                values = df[column]
+                sample = values.iloc[:: max(1, len(values) // CARDINALITY_SAMPLE_ROWS)]
+                repetitive[column] = sample.nunique(dropna=False) * 2 <= len(sample)
+            return repetitive[column]
+
+        def codes_and_uniques(column):
+            # Distinct non-null values of a column and each row's position among them (-1: null)
+            if column not in factorized:
+                factorized[column] = pd.factorize(df[column])
+            return factorized[column]
+
+        def normalize_values(values, normalize):
+            values = values.astype(str)
+            if normalize in ("lower", "lower_strip"):
+                values = values.str.lower()
+            if normalize == "lower_strip":
+                values = values.str.strip()
+            return values
+
+        def unique_values(column, normalize):
+            # Normalized distinct values; lead columns repeat a lot, so each is normalized once
+            cache_key = (column, normalize)
+            if cache_key not in normalized:
+                if normalize == "str":
+                    values = pd.Series(codes_and_uniques(column)[1]).astype(str)
+                elif normalize == "lower":
+                    values = unique_values(column, "str").str.lower()
+                else:
+                    values = unique_values(column, "lower").str.strip()
+                normalized[cache_key] = values
+            return normalized[cache_key]
+
+        def row_values(column, normalize):
+            # Normalized column (for columns that are mostly distinct values)
+            cache_key = (column, normalize)
+            if cache_key not in normalized_rows:
+                if normalize == "str":
+                    values = df[column].astype(str)
+                elif normalize == "lower":
+                    values = row_values(column, "str").str.lower()
+                else:
+                    values = row_values(column, "lower").str.strip()
+                normalized_rows[cache_key] = values
+            return normalized_rows[cache_key]
+
+        def normalized_check(column, check):
+            # Check on the normalized values, evaluated per distinct value and mapped back to rows
+            def apply(values):
+                if check.check == "isin":
+                    return values.isin(check.argument)
+                return values.str.match(check.argument, na=False)
+
+            if not is_repetitive(column):
+                return apply(row_values(column, check.normalize))
+
+            codes, _ = codes_and_uniques(column)
+            result = np.empty(len(codes), dtype=bool)
+            present = codes >= 0
+            result[present] = apply(unique_values(column, check.normalize)).to_numpy()[
+                codes[present]
+            ]
+            if not present.all():
+                # Null rows normalize by their own type ("None", "nan", ...)
+                result[~present] = apply(
+                    normalize_values(df[column][~present], check.normalize)
+                ).to_numpy()
+            return pd.Series(result, index=df.index)
+
+        def mask(check_id):
+            if check_id not in masks:
+                check = self.checks[check_id]
+                column = column_mapping[check.column]
+                if check.check == "isnull":
+                    result = df[column].isnull()
+                elif check.check == "notnull":
+                    result = df[column].notnull()
+                elif check.check in ("isin", "match") and check.normalize is not None:
+                    result = normalized_check(column, check)
+                elif check.check == "isin":
+                    result = df[column].isin(check.argument)
+                elif check.check == "match":
+                    result = df[column].str.match(check.argument, na=False)
+                else:
+                    result = df[column] <= check.argument
+                masks[check_id] = ~result if check.negate else result
+            return masks[check_id]
+
+        scores = {}
+        for key in self.columns if keys is None else keys:
+            start = time.perf_counter()
+            rules, score_choice, score_default = self.columns[key]
+            condlist = []
+            for rule in rules:
+                if not isinstance(rule, tuple):
+                    condlist.append(rule)
+                    continue
+                condition = mask(rule[0])
+                for check_id in rule[1:]:
+                    condition = condition & mask(check_id)
+                condlist.append(condition)
+            scores[key] = np.select(
+                condlist=condlist, choicelist=score_choice, default=score_default
+            )
+            if timings is not None:
+                timings[key] = time.perf_counter() - start
+        return scores
+
+
+def compile_ruleset(ruleset, dependencies):
+    """
+    Compiles a completeness ruleset.
+
+    :param ruleset: Dictionary defining rules for scoring (returned as is if already compiled).
+    :param dependencies: Reference lists and patterns from CompletenessDependencyLoader.
+    :return: CompiledRuleset.
+    """
+    if isinstance(ruleset, CompiledRuleset):
+        return ruleset
+    return CompiledRuleset(ruleset, dependencies)
+
+
+def score_completeness(df, ruleset, column_mapping, logger, timings=None):
+    """
+    Adds a <key>_score column for each column_mapping key with rules and returns the names of
+    the added columns (shared scoring logic of the completeness scorers).
+
+    :param df: DataFrame to add the score columns to.
+    :param ruleset: CompiledRuleset.
+    :param column_mapping: Dictionary mapping column names.
+    :param logger: Scorer logger.
+    :param timings: Optional dictionary to fill with elapsed seconds per scored column.
+    :return: List of score column names.
+    """
+    keys = []
+    for key in column_mapping.keys():
+        if key not in ruleset:
+            if key in ruleset.checked_columns:
+                # Only an input to other columns' rules
+                logger.debug("No rules defined for context column: %s", key)
+            else:
+                logger.warning("No rules defined for column: %s", key)
+            continue
+        keys.append(key)
+
+    output_cols = []
+    for key, scores in ruleset.evaluate(df, column_mapping, keys, timings).items():
+        df[f"{key}_score"] = scores
+        output_cols.append(f"{key}_score")
+        logger.debug("Scored %s successfully.", key)
+    return output_cols
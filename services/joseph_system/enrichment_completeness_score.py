@@ -1,9 +1,80 @@
+import time
+
 import pandas as pd
 import numpy as np
 
-import logging
-
 from completeness_dependency_loader import CompletenessDependencyLoader
+from completeness_ruleset import compile_ruleset, score_completeness
+from scoring_logging import get_logger, log_batch_summary
+
+# Small Business and SOHO leads are expected to miss some enrichment
+SMALL_SEGMENT = {
+    "check": "isin",
+    "column": "segment_name",
+    "values": ["Small Business", "SOHO"],
+}
+
+# Default explicit ruleset (see completeness_ruleset for the rule format)
+ENRICHMENT_RULESET = {
+    "account_name_zi_cdp": {
+        "rules": [
+            [SMALL_SEGMENT, {"check": "isnull"}],
+            {"check": "isnull"},
+        ],
+        "score_choice": [75, 0],
+        "score_default": 100,
+    },
+    "zi_company_name": {
+        "rules": [
+            [SMALL_SEGMENT, {"check": "isnull"}],
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower", "values": "invalid_companies"},
+        ],
+        "score_choice": [75, 0, 0],
+        "score_default": 100,
+    },
+    "zi_website_domain": {
+        "rules": [
+            [SMALL_SEGMENT, {"check": "isnull"}],
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower_strip", "values": "invalid_domains"},
+        ],
+        "score_choice": [75, 0, 0],
+        "score_default": 100,
+    },
+    "zi_company_state": {
+        "rules": [
+            [SMALL_SEGMENT, {"check": "isnull"}],
+            {"check": "isnull"},
+            {
+                "check": "isin",
+                "normalize": "lower_strip",
+                "values": "states_in_rc_territories",
+            },
+            {"check": "notnull"},
+        ],
+        "score_choice": [75, 0, 100, 75],
+        "score_default": 50,
+    },
+    "zi_company_country": {
+        "rules": [
+            [SMALL_SEGMENT, {"check": "isnull"}],
+            {"check": "isnull"},
+            {"check": "isin", "normalize": "lower", "values": "invalid_companies"},
+        ],
+        "score_choice": [75, 0, 0],
+        "score_default": 100,
+    },
+    "zi_employees": {
+        "rules": [
+            [SMALL_SEGMENT, {"check": "isnull"}],
+            {"check": "isnull"},
+            {"check": "le", "value": 0},
+        ],
+        "score_choice": [75, 0, 100],
+        "score_default": 100,
+    },
+}
 
 
 class EnrichmentCompletenessScorer:
@@ -17,21 +88,15 @@ class EnrichmentCompletenessScorer:
         # Initialize CompletenessDependencyLoader (config_path is optional)
         self.dependency_loader = CompletenessDependencyLoader(config_path)
         self.dependencies = self.dependency_loader.load()
+        self.ruleset = compile_ruleset(ENRICHMENT_RULESET, self.dependencies)
 
         self.logger = self._initialize_logger()
 
     def _initialize_logger(self):
         """
-        Sets up a logger for the scorer.
+        Returns the shared scoring logger for the scorer (see scoring_logging).
         """
-        logger = logging.getLogger(__name__)
-        logger.setLevel(logging.INFO)
-        handler = logging.StreamHandler()
-        handler.setFormatter(
-            logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        )
-        logger.addHandler(handler)
-        return logger
+        return get_logger("enrichment")
 
     def score(
         self,
@@ -45,9 +110,11 @@ class EnrichmentCompletenessScorer:
         :param df: Input DataFrame to be scored.
         :param column_mapping: Dictionary mapping column names.
         :param column_weights: List of weights for each column.
-        :param ruleset: Dictionary defining rules for scoring. If None, default ruleset is used.
+        :param ruleset: Dictionary defining rules for scoring (declarative checks or boolean masks).
+            If None, default ruleset is used.
         :return: DataFrame with acquisition completeness scores.
         """
+        start = time.perf_counter()
         df = df.copy()
 
         # Default column mapping
@@ -64,131 +131,30 @@ class EnrichmentCompletenessScorer:
         # Default column weights
         column_weights = column_weights or [0.10, 0.18, 0.18, 0.18, 0.18, 0.18]
 
-        # Default explicit ruleset
-        if ruleset is None:
-            ruleset = {
-                "account_name_zi_cdp": {
-                    "rules": [
-                        (
-                            df[column_mapping["segment_name"]].isin(
-                                ["Small Business", "SOHO"]
-                            )
-                        )
-                        & (df[column_mapping["account_name_zi_cdp"]].isnull()),
-                        df[column_mapping["account_name_zi_cdp"]].isnull(),
-                    ],
-                    "score_choice": [75, 0],
-                    "score_default": 100,
-                },
-                "zi_company_name": {
-                    "rules": [
-                        (
-                            df[column_mapping["segment_name"]].isin(
-                                ["Small Business", "SOHO"]
-                            )
-                        )
-                        & (df[column_mapping["zi_company_name"]].isnull()),
-                        df[column_mapping["zi_company_name"]].isnull(),
-                        df[column_mapping["zi_company_name"]]
-                        .astype(str)
-                        .str.lower()
-                        .isin(self.dependencies["invalid_companies"]),
-                    ],
-                    "score_choice": [75, 0, 0],
-                    "score_default": 100,
-                },
-                "zi_website_domain": {
-                    "rules": [
-                        (
-                            df[column_mapping["segment_name"]].isin(
-                                ["Small Business", "SOHO"]
-                            )
-                        )
-                        & (df[column_mapping["zi_website_domain"]].isnull()),
-                        df[column_mapping["zi_website_domain"]].isnull(),
-                        df[column_mapping["zi_website_domain"]]
-                        .astype(str)
-                        .str.lower()
-                        .str.strip()
-                        .isin(self.dependencies["invalid_domains"]),
-                    ],
-                    "score_choice": [75, 0, 0],
-                    "score_default": 100,
-                },
-                "zi_company_state": {
-                    "rules": [
-                        (
-                            df[column_mapping["segment_name"]].isin(
-                                ["Small Business", "SOHO"]
-                            )
-                        )
-                        & (df[column_mapping["zi_company_state"]].isnull()),
-                        df[column_mapping["zi_company_state"]].isnull(),
-                        df[column_mapping["zi_company_state"]]
-                        .astype(str)
-                        .str.lower()
-                        .str.strip()
-                        .isin(self.dependencies["states_in_rc_territories"]),
-                        df[column_mapping["zi_company_state"]].notnull(),
-                    ],
-                    "score_choice": [75, 0, 100, 75],
-                    "score_default": 50,
-                },
-                "zi_company_country": {
-                    "rules": [
-                        (
-                            df[column_mapping["segment_name"]].isin(
-                                ["Small Business", "SOHO"]
-                            )
-                        )
-                        & (df[column_mapping["zi_company_country"]].isnull()),
-                        df[column_mapping["zi_company_country"]].isnull(),
-                        df[column_mapping["zi_company_country"]]
-                        .astype(str)
-                        .str.lower()
-                        .isin(self.dependencies["invalid_companies"]),
-                    ],
-                    "score_choice": [75, 0, 0],
-                    "score_default": 100,
-                },
-                "zi_employees": {
-                    "rules": [
-                        (
-                            df[column_mapping["segment_name"]].isin(
-                                ["Small Business", "SOHO"]
-                            )
-                        )
-                        & (df[column_mapping["zi_employees"]].isnull()),
-                        df[column_mapping["zi_employees"]].isnull(),
-                        df[column_mapping["zi_employees"]] <= 0,
-                    ],
-                    "score_choice": [75, 0, 100],
-                    "score_default": 100,
-                },
-            }
+        # Default explicit ruleset (compiled once in __init__)
+        ruleset = (
+            self.ruleset
+            if ruleset is None
+            else compile_ruleset(ruleset, self.dependencies)
+        )
 
         # Scoring logic
-        output_cols = []
-        for key in column_mapping.keys():
-            if key not in ruleset:
-                self.logger.warning(f"No rules defined for column: {key}")
-                continue
-
-            condlist = ruleset[key]["rules"]
-            choicelist = ruleset[key]["score_choice"]
-            df[f"{key}_score"] = np.select(
-                condlist=condlist,
-                choicelist=choicelist,
-                default=ruleset[key]["score_default"],
-            )
-            output_cols.append(f"{key}_score")
-            self.logger.info(f"Scored {key} successfully.")
+        column_times = {}
+        output_cols = score_completeness(
+            df, ruleset, column_mapping, self.logger, column_times
+        )
 
         # Calculate final completeness score
         df["enrichment_completeness_score"] = np.rint(
             np.sum(df[output_cols].values * np.array(column_weights), axis=1)
         )
-        self.logger.info("Successfully calculated enrichment completeness score.")
+        log_batch_summary(
+            self.logger,
+            "enrichment_completeness",
+            len(df),
+            time.perf_counter() - start,
+            column_times,
+        )
         return df
 
 
@@ -0,0 +1,56 @@
+import logging
+
+# All of Joseph's scorers log under one parent logger with a single handler. Per-column
+# progress is logged at DEBUG; each scored batch logs one INFO summary line.
+LOGGER_NAME = "joseph_scoring"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def get_logger(component):
+    """
+    Returns the logger for a scoring component. The shared parent logger gets its handler on
+    first use only, so creating scorers repeatedly doesn't duplicate log lines.
+
+    :param component: Component name (e.g. "acquisition").
+    :return: Logger.
+    """
+    parent = logging.getLogger(LOGGER_NAME)
+    if not parent.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        parent.addHandler(handler)
+        parent.setLevel(logging.INFO)
+        parent.propagate = False
+    return parent.getChild(component)
+
+
+def log_batch_summary(logger, component, rows, elapsed, column_times):
+    """
+    Logs one INFO line for a scored batch: row count, elapsed time and time per column (also
+    attached to the record as structured fields).
+
+    :param logger: Scorer logger.
+    :param component: Scored component (e.g. "acquisition_completeness").
+    :param rows: Number of rows scored.
+    :param elapsed: Elapsed seconds for the batch.
+    :param column_times: Dictionary of elapsed seconds per scored column or step.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    elapsed_ms = round(elapsed * 1000, 1)
+    column_ms = {
+        column: round(seconds * 1000, 1) for column, seconds in column_times.items()
+    }
+    logger.info(
+        "Scored %s: rows=%d elapsed_ms=%.1f column_ms=%s",
+        component,
+        rows,
+        elapsed_ms,
+        column_ms,
+        extra={
+            "component": component,
+            "rows": rows,
+            "elapsed_ms": elapsed_ms,
+            "column_ms": column_ms,
+        },
+    )
@@ -2,6 +2,7 @@ import os
 import sys
 import pandas as pd
 import logging
+from .domain_utils import extract_email_domain, extract_website_domain
 
 # Add Joseph's system to Python path
 joseph_system_path = os.path.join(os.path.dirname(__file__), 'joseph_system')
@@ -10,6 +11,26 @@ dependencies_path = os.path.join(os.path.dirname(__file__), 'joseph_system', 'de
 if joseph_system_path not in sys.path:
     sys.path.insert(0, joseph_system_path)
 
+# Coherence components scored from the Salesforce lead fields (equal weights). The segment
+# comparisons are left out: the lead queries don't select the owner's VP segment or a ZI country
+# (the ZI segment bands depend on it).
+COHERENCE_COLUMN_MAPPING = {
+    "name_validation_score": "name_validation_score",
+    "email_vs_website_similarity_score": "email_vs_website_similarity_score",
+    "email_vs_zi_website_similarity_score": "email_vs_zi_website_similarity_score",
+    "website_vs_zi_website_similarity_score": "website_vs_zi_website_similarity_score",
+    "phone_validation_score": "phone_validation_score",
+    "company_vs_zi_company_similarity_score": "company_vs_zi_company_similarity_score",
+}
+COHERENCE_COLUMN_WEIGHTS = [1 / len(COHERENCE_COLUMN_MAPPING)] * len(COHERENCE_COLUMN_MAPPING)
+
+# Columns of the DataFrame handed to Joseph's scorers
+JOSEPH_COLUMNS = [
+    'Id', 'first_name', 'last_name', 'email_domain', 'phone', 'state_province', 'country', 'sector',
+    'company', 'website_domain', 'account_name_zi_cdp', 'zi_company_name', 'zi_website_domain',
+    'zi_company_state', 'zi_company_country', 'zi_employees', 'segment_name'
+]
+
 class JosephScoringWrapper:
     """
     Simple wrapper for Joseph's scoring system that handles imports and data transformation.
@@ -19,6 +40,7 @@ class JosephScoringWrapper:
         self.logger = logging.getLogger(__name__)
         self._acquisition_scorer = None
         self._enrichment_scorer = None
+        self._coherence_scorer_class = None
         self._initialize_scorers()
     
     def _initialize_scorers(self):
@@ -28,10 +50,13 @@ class JosephScoringWrapper:
             from completeness_dependency_loader import CompletenessDependencyLoader
             from acquisition_completeness_score import AcquisitionCompletenessScorer
             from enrichment_completeness_score import EnrichmentCompletenessScorer
+            from .joseph_system.coherence_score import CoherenceScorer
             
             # Initialize with correct dependencies path
             self._acquisition_scorer = AcquisitionCompletenessScorer(config_path=dependencies_path)
             self._enrichment_scorer = EnrichmentCompletenessScorer(config_path=dependencies_path)
+            # The coherence scorer is built per DataFrame
+            self._coherence_scorer_class = CoherenceScorer
             
             self.logger.info("Joseph's scoring system initialized successfully")
             
@@ -49,52 +74,53 @@ class JosephScoringWrapper:
         Returns:
             pandas.DataFrame: Single-row DataFrame formatted for Joseph's system
         """
+        return self.transform_salesforce_leads_to_dataframe([salesforce_lead])
+    
+    def transform_salesforce_leads_to_dataframe(self, salesforce_leads):
+        """
+        Transform Salesforce lead records into one DataFrame for Joseph's system (one row per lead, in order).
+        
+        Args:
+            salesforce_leads: List of dicts containing Salesforce lead data
+            
+        Returns:
+            pandas.DataFrame: DataFrame formatted for Joseph's system
+        """
+        return pd.DataFrame(
+            [self._lead_row(salesforce_lead) for salesforce_lead in salesforce_leads],
+            columns=JOSEPH_COLUMNS
+        )
+    
+    def _lead_row(self, salesforce_lead):
+        """Joseph's expected column values for one Salesforce lead"""
         # Extract email domain from email
-        email = salesforce_lead.get('Email', '')
-        email_domain = ''
-        if email and '@' in email:
-            email_domain = email.split('@')[1].lower()
+        email_domain = extract_email_domain(salesforce_lead.get('Email', '')) or ''
         
         # Extract website domain from website
-        website = salesforce_lead.get('Website', '')
-        website_domain = ''
-        if website:
-            website = str(website).lower()
-            if website.startswith('http://'):
-                website = website[7:]
-            elif website.startswith('https://'):
-                website = website[8:]
-            if website.startswith('www.'):
-                website = website[4:]
-            if '/' in website:
-                website = website.split('/')[0]
-            website_domain = website
+        website_domain = extract_website_domain(salesforce_lead.get('Website', ''))
         
-        # Create DataFrame with Joseph's expected columns
-        data = {
-            'Id': [salesforce_lead.get('Id', '')],
+        return {
+            'Id': salesforce_lead.get('Id', ''),
             # For acquisition completeness
-            'first_name': [salesforce_lead.get('FirstName', '')],
-            'last_name': [salesforce_lead.get('LastName', '')],
-            'email_domain': [email_domain],
-            'phone': [salesforce_lead.get('Phone', '')],
-            'state_province': [salesforce_lead.get('State', '')],
-            'country': [salesforce_lead.get('Country', '')],
-            'sector': [salesforce_lead.get('Industry', '')],  # Map Industry to sector
-            'company': [salesforce_lead.get('Company', '')],
-            'website_domain': [website_domain],
+            'first_name': salesforce_lead.get('FirstName', ''),
+            'last_name': salesforce_lead.get('LastName', ''),
+            'email_domain': email_domain,
+            'phone': salesforce_lead.get('Phone', ''),
+            'state_province': salesforce_lead.get('State', ''),
+            'country': salesforce_lead.get('Country', ''),
+            'sector': salesforce_lead.get('Industry', ''),  # Map Industry to sector
+            'company': salesforce_lead.get('Company', ''),
+            'website_domain': website_domain,
             
             # For enrichment completeness 
-            'account_name_zi_cdp': [salesforce_lead.get('ZI_Company__c', '')],
-            'zi_company_name': [salesforce_lead.get('ZI_Company__c', '')],
-            'zi_website_domain': [self._extract_zi_website_domain(salesforce_lead.get('ZI_Website__c', ''))],
-            'zi_company_state': [salesforce_lead.get('ZI_State__c', '')],
-            'zi_company_country': [salesforce_lead.get('ZI_Country__c', '')],
-            'zi_employees': [self._convert_to_int(salesforce_lead.get('ZI_Employees__c', ''))],
-            'segment_name': [salesforce_lead.get('SegmentName', '')],  # Need to get this from SF
+            'account_name_zi_cdp': salesforce_lead.get('ZI_Company_Name__c', ''),
+            'zi_company_name': salesforce_lead.get('ZI_Company_Name__c', ''),
+            'zi_website_domain': self._extract_zi_website_domain(salesforce_lead.get('ZI_Website__c', '')),
+            'zi_company_state': salesforce_lead.get('ZI_State__c', ''),
+            'zi_company_country': salesforce_lead.get('ZI_Country__c', ''),
+            'zi_employees': self._convert_to_int(salesforce_lead.get('ZI_Employees__c', '')),
+            'segment_name': salesforce_lead.get('SegmentName', ''),  # Need to get this from SF
         }
-        
-        return pd.DataFrame(data)
     
     def _extract_zi_email_domain(self, zi_email):
         """Extract domain from ZI email field."""
@@ -104,19 +130,7 @@ class JosephScoringWrapper:
     
     def _extract_zi_website_domain(self, zi_website):
         """Extract domain from ZI website field."""
-        if not zi_website:
-            return ''
-        
-        website = str(zi_website).lower()
-        if website.startswith('http://'):
-            website = website[7:]
-        elif website.startswith('https://'):
-            website = website[8:]
-        if website.startswith('www.'):
-            website = website[4:]
-        if '/' in website:
-            website = website.split('/')[0]
-        return website
+        return extract_website_domain(zi_website)
     
     def _convert_to_int(self, value):
         """Convert a value to integer, return 0 if conversion fails."""
@@ -127,52 +141,106 @@ class JosephScoringWrapper:
         except (ValueError, TypeError):
             return 0
     
-    def calculate_acquisition_completeness(self, salesforce_lead):
+    def _score_completeness(self, scorer, df, salesforce_leads, component):
         """
-        Calculate acquisition completeness score for a single Salesforce lead.
+        Score a completeness component for every row of df (one row per lead, in order).
         
-        Args:
-            salesforce_lead: Dict containing Salesforce lead data
-            
         Returns:
-            Dict containing score and details
+            Tuple of (scored DataFrame or None on error, list of per-lead result dicts)
         """
+        total_column = f'{component}_score'
         try:
-            # Transform to DataFrame
-            df = self.transform_salesforce_to_dataframe(salesforce_lead)
-            
             # Calculate score using Joseph's system
-            scored_df = self._acquisition_scorer.score(df)
-            
-            # Extract results from the scored DataFrame
-            result_row = scored_df.iloc[0]
+            scored_df = scorer.score(df)
+        except Exception as e:
+            lead_ids = [lead.get('Id') for lead in salesforce_leads]
+            self.logger.error(f"Error calculating {component.replace('_', ' ')} for leads {lead_ids}: {e}")
+            return None, [self._error_result(component, e) for _ in salesforce_leads]
+        
+        # Individual field scores
+        scored_fields = scored_df.columns.tolist()
+        score_columns = [col for col in scored_fields if col.endswith('_score') and col != total_column]
+        results = []
+        for lead, row in zip(salesforce_leads, scored_df.to_dict('records')):
+            score = float(row.get(total_column, 0))
+            results.append({
+                'score': score,
+                'percentage': score,
+                'component': component,
+                'details': {
+                    'scored_fields': scored_fields,
+                    'field_scores': {col: float(row.get(col, 0)) for col in score_columns},
+                    'lead_id': lead.get('Id')
+                }
+            })
+        return scored_df, results
+    
+    def _score_coherence(self, acquisition_df, enrichment_df, salesforce_leads):
+        """
+        Score Joseph's coherence component from the acquisition and enrichment scored DataFrames
+        (coherence compares the raw fields and skips fields the completeness scorers scored 0).
+        
+        Returns:
+            List of per-lead result dicts
+        """
+        component = 'coherence'
+        try:
+            if acquisition_df is None or enrichment_df is None:
+                raise ValueError("coherence needs the acquisition and enrichment completeness scores")
             
-            # Extract individual field scores
-            field_scores = {}
-            score_columns = [col for col in scored_df.columns if col.endswith('_score')]
-            for col in score_columns:
-                if col != 'acquisition_completeness_score':
-                    field_scores[col] = float(result_row.get(col, 0))
+            enrichment_columns = [col for col in enrichment_df.columns if col not in acquisition_df.columns]
+            df = acquisition_df.join(enrichment_df[enrichment_columns])
+            # Lead records don't carry a segment override
+            df['segment_name_override'] = None
             
-            return {
-                'score': float(result_row.get('acquisition_completeness_score', 0)),
-                'percentage': float(result_row.get('acquisition_completeness_score', 0)),
-                'component': 'acquisition_completeness',
+            scorer = self._coherence_scorer_class(
+                df, column_mapping=COHERENCE_COLUMN_MAPPING, column_weights=COHERENCE_COLUMN_WEIGHTS
+            )
+            scored_df = scorer.compute_coherence_score(scores_only=True)
+        except Exception as e:
+            lead_ids = [lead.get('Id') for lead in salesforce_leads]
+            self.logger.error(f"Error calculating coherence for leads {lead_ids}: {e}")
+            return [self._error_result(component, e) for _ in salesforce_leads]
+        
+        score_columns = list(COHERENCE_COLUMN_MAPPING.values())
+        results = []
+        for lead, row in zip(salesforce_leads, scored_df.to_dict('records')):
+            score = float(row['coherence_score'])
+            results.append({
+                'score': score,
+                'percentage': score,
+                'component': component,
                 'details': {
-                    'scored_fields': scored_df.columns.tolist(),
-                    'field_scores': field_scores,
-                    'lead_id': salesforce_lead.get('Id')
+                    'field_scores': {col: float(row[col]) for col in score_columns},
+                    'lead_id': lead.get('Id')
                 }
-            }
+            })
+        return results
+    
+    def _error_result(self, component, error):
+        """Zero score result for a component that failed"""
+        return {
+            'score': 0,
+            'percentage': 0,
+            'component': component,
+            'details': {'error': str(error)}
+        }
+    
+    def calculate_acquisition_completeness(self, salesforce_lead):
+        """
+        Calculate acquisition completeness score for a single Salesforce lead.
+        
+        Args:
+            salesforce_lead: Dict containing Salesforce lead data
             
-        except Exception as e:
-            self.logger.error(f"Error calculating acquisition completeness for lead {salesforce_lead.get('Id')}: {e}")
-            return {
-                'score': 0,
-                'percentage': 0,
-                'component': 'acquisition_completeness',
-                'details': {'error': str(e)}
-            }
+        Returns:
+            Dict containing score and details
+        """
+        df = self.transform_salesforce_to_dataframe(salesforce_lead)
+        _, results = self._score_completeness(
+            self._acquisition_scorer, df, [salesforce_lead], 'acquisition_completeness'
+        )
+        return results[0]
     
     def calculate_enrichment_completeness(self, salesforce_lead):
         """
@@ -184,58 +252,54 @@ class JosephScoringWrapper:
         Returns:
             Dict containing score and details
         """
-        try:
-            # Transform to DataFrame
-            df = self.transform_salesforce_to_dataframe(salesforce_lead)
-            
-            # Calculate score using Joseph's system
-            scored_df = self._enrichment_scorer.score(df)
-            
-            # Extract results from the scored DataFrame
-            result_row = scored_df.iloc[0]
-            
-            # Extract individual field scores
-            field_scores = {}
-            score_columns = [col for col in scored_df.columns if col.endswith('_score')]
-            for col in score_columns:
-                if col != 'enrichment_completeness_score':
-                    field_scores[col] = float(result_row.get(col, 0))
-            
-            return {
-                'score': float(result_row.get('enrichment_completeness_score', 0)),
-                'percentage': float(result_row.get('enrichment_completeness_score', 0)),
-                'component': 'enrichment_completeness',
-                'details': {
-                    'scored_fields': scored_df.columns.tolist(),
-                    'field_scores': field_scores,
-                    'lead_id': salesforce_lead.get('Id')
-                }
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error calculating enrichment completeness for lead {salesforce_lead.get('Id')}: {e}")
-            return {
-                'score': 0,
-                'percentage': 0,
-                'component': 'enrichment_completeness',
-                'details': {'error': str(e)}
-            }
+        df = self.transform_salesforce_to_dataframe(salesforce_lead)
+        _, results = self._score_completeness(
+            self._enrichment_scorer, df, [salesforce_lead], 'enrichment_completeness'
+        )
+        return results[0]
     
     def calculate_both_scores(self, salesforce_lead):
         """
-        Calculate both acquisition and enrichment completeness scores.
+        Calculate acquisition completeness, enrichment completeness and coherence scores.
         
         Args:
             salesforce_lead: Dict containing Salesforce lead data
             
         Returns:
-            Dict containing both scores
+            Dict containing the three scores
+        """
+        return self.calculate_batch_scores([salesforce_lead])[0]
+    
+    def calculate_batch_scores(self, salesforce_leads):
         """
-        acquisition_result = self.calculate_acquisition_completeness(salesforce_lead)
-        enrichment_result = self.calculate_enrichment_completeness(salesforce_lead)
+        Calculate acquisition completeness, enrichment completeness and coherence scores for a batch
+        of Salesforce leads. Each component is scored once over a single DataFrame of the batch.
         
-        return {
-            'acquisition_completeness': acquisition_result,
-            'enrichment_completeness': enrichment_result,
-            'lead_id': salesforce_lead.get('Id')
-        } 
\ No newline at end of file
+        Args:
+            salesforce_leads: List of dicts containing Salesforce lead data
+            
+        Returns:
+            List of dicts (one per lead, in order) in the calculate_both_scores format
+        """
+        if not salesforce_leads:
+            return []
+        
+        df = self.transform_salesforce_leads_to_dataframe(salesforce_leads)
+        acquisition_df, acquisition_results = self._score_completeness(
+            self._acquisition_scorer, df, salesforce_leads, 'acquisition_completeness'
+        )
+        enrichment_df, enrichment_results = self._score_completeness(
+            self._enrichment_scorer, df, salesforce_leads, 'enrichment_completeness'
+        )
+        coherence_results = self._score_coherence(acquisition_df, enrichment_df, salesforce_leads)
+        
+        return [
+            {
+                'acquisition_completeness': acquisition_result,
+                'enrichment_completeness': enrichment_result,
+                'coherence': coherence_result,
+                'lead_id': salesforce_lead.get('Id')
+            }
+            for salesforce_lead, acquisition_result, enrichment_result, coherence_result
+            in zip(salesforce_leads, acquisition_results, enrichment_results, coherence_results)
+        ]
@@ -0,0 +1,149 @@
+from config.config import Config
+from services.domain_utils import is_free_email_domain
+
+# Rule-based pre-screen for leads whose score band is already fixed by the
+# LLM rubric (see LEAD_QA_SYSTEM_PROMPT section 4). Only leads that no rule can
+# settle with enough confidence are sent to generate_lead_confidence_assessment.
+
+# ZoomInfo fields that count as "enrichment data" for the no-data rule
+ZI_FIELDS = ['ZI_Company_Name__c', 'ZI_Website__c', 'ZI_Employees__c']
+
+# Hard caps and deductions mirrored from the system prompt rubric
+CAP_FREE_EMAIL_ENTERPRISE = 25
+CAP_SUSPICIOUS_ENRICHMENT = 30
+CAP_MISSING_COMPANY_LARGE = 35
+CAP_NOT_IN_TAM = 40
+DEDUCTION_MISSING_COMPANY_LARGE = 25
+DEDUCTION_MISSING_WEBSITE_LARGE = 15
+
+# Score given to leads with no enrichment at all (rubric band 0-19)
+NO_ENRICHMENT_SCORE = 10
+
+
+def _is_empty(value):
+    """Treat None, blank strings and placeholder values as missing"""
+    if value is None:
+        return True
+    return str(value).strip().lower() in ('', 'null', 'none', 'n/a')
+
+
+def _employee_count(lead_data):
+    """Convert ZI_Employees__c to int, default to 0"""
+    try:
+        return int(float(lead_data.get('ZI_Employees__c')))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _base_score(lead_data):
+    """Start from the average of Joseph's completeness scores"""
+    acquisition = lead_data.get('acquisition_completeness_score') or 0
+    enrichment = lead_data.get('enrichment_completeness_score') or 0
+    return round((acquisition + enrichment) / 2)
+
+
+def _apply_rubric(lead_data, has_website):
+    """
+    Apply the rubric's required deductions and hard caps to the base score.
+
+    Returns:
+        score: Final score after deductions and caps
+        bullets: Explanation bullets for every deduction/cap applied
+    """
+    employee_count = _employee_count(lead_data)
+    is_large = employee_count >= 100
+    has_company_name = not _is_empty(lead_data.get('ZI_Company_Name__c'))
+    not_in_tam = bool(lead_data.get('not_in_TAM'))
+    suspicious = bool(lead_data.get('suspicious_enrichment'))
+
+    score = _base_score(lead_data)
+    bullets = []
+
+    # Required deductions
+    if is_large and not has_company_name:
+        score -= DEDUCTION_MISSING_COMPANY_LARGE
+        bullets.append(f"❌ Large firm ({employee_count} employees) missing ZI company name - Rule-based pre-screen, no external knowledge used.")
+    if is_large and not has_website:
+        score -= DEDUCTION_MISSING_WEBSITE_LARGE
+        bullets.append("⚠️ Large-company completeness check: no website on lead or enrichment - Rule-based pre-screen, no external knowledge used.")
+
+    # Hard caps (not_in_TAM needs a missing ZI company name and suspicious_enrichment a present
+    # one, so at most one of the two flags is set)
+    caps = []
+    if suspicious:
+        caps.append(CAP_SUSPICIOUS_ENRICHMENT)
+        bullets.append("❌ Free email + no website raises authenticity doubts for claimed enterprise size - Rule-based pre-screen, no external knowledge used.")
+    if not_in_tam:
+        caps.append(CAP_NOT_IN_TAM)
+        bullets.append(f"❌ Large firm ({employee_count} employees) missing from TAM - Rule-based pre-screen, no external knowledge used.")
+    if is_large and not has_company_name:
+        caps.append(CAP_MISSING_COMPANY_LARGE)
+    if employee_count >= 50 and is_free_email_domain(lead_data.get('email_domain')):
+        caps.append(CAP_FREE_EMAIL_ENTERPRISE)
+
+    if caps:
+        score = min(score, min(caps))
+
+    return max(0, min(100, score)), bullets
+
+
+def prescreen_lead(lead_data):
+    """
+    Try to settle a lead's confidence score locally without calling the LLM.
+
+    Args:
+        lead_data: Lead record including _analyze_lead_flags output and Joseph's scores
+
+    Returns:
+        assessment: Assessment dict in the same shape as generate_lead_confidence_assessment, or None
+        confidence: Confidence (0-1) that the rubric would produce the same band, or 0 when no rule applies
+        rule: Name of the rule that decided the lead, or None
+    """
+    not_in_tam = bool(lead_data.get('not_in_TAM'))
+    suspicious = bool(lead_data.get('suspicious_enrichment'))
+    has_website = not (_is_empty(lead_data.get('Website')) and _is_empty(lead_data.get('ZI_Website__c')))
+
+    # Rule 1: no ZoomInfo enrichment at all -> unusable enrichment (0-19 band)
+    if all(_is_empty(lead_data.get(field)) for field in ZI_FIELDS):
+        assessment = {
+            'confidence_score': NO_ENRICHMENT_SCORE,
+            'explanation_bullets': [
+                "❌ No ZoomInfo enrichment returned for this lead - Rule-based pre-screen, no external knowledge used."
+            ],
+            'corrections': {},
+            'inferences': {}
+        }
+        return assessment, 0.95, 'no_enrichment'
+
+    # Rule 2: suspicious enrichment with no website anywhere -> capped at 25 (suspicious_enrichment
+    # means a free email on a large firm, whose cap is below the suspicious-enrichment cap of 30)
+    if suspicious and not has_website:
+        score, bullets = _apply_rubric(lead_data, has_website)
+        return _build_assessment(score, bullets), 0.9, 'suspicious_no_website'
+
+    # Rule 3: not in TAM with no website to validate against -> capped at 35 (not_in_TAM means a
+    # large firm with no ZI company name, whose cap is below the not-in-TAM cap of 40)
+    if not_in_tam and not has_website:
+        score, bullets = _apply_rubric(lead_data, has_website)
+        confidence = 0.85
+        # Sparse enrichment makes a higher LLM score even less likely
+        if (lead_data.get('enrichment_completeness_score') or 0) < 50:
+            confidence += 0.05
+        return _build_assessment(score, bullets), confidence, 'not_in_tam_no_website'
+
+    return None, 0, None
+
+
+def _build_assessment(score, bullets):
+    """Build an assessment dict matching the LLM output format"""
+    return {
+        'confidence_score': score,
+        'explanation_bullets': bullets,
+        'corrections': {},
+        'inferences': {}
+    }
+
+
+def should_use_prescreen(confidence):
+    """Check whether a pre-screen result is confident enough to skip the LLM"""
+    return Config.PRESCREEN_ENABLED and confidence >= Config.PRESCREEN_CONFIDENCE_THRESHOLD
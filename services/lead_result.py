@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Per-lead analysis result.
+# Batch analysis used to pass each lead around as a plain dict carrying the whole Joseph
+# scoring blob (scored DataFrame column lists, duplicate scores, lead IDs). LeadResult keeps
+# the queried Salesforce fields and analysis outputs in slots, keeps only the per-field
+# Joseph scores the UI shows, and encodes to a compact dict for JSON responses.
+# It also supports the dict-style access (get, [], in) the rest of the pipeline uses.
+
+# Outputs that are only present once set (reported as missing while None, like an absent dict key)
+OPTIONAL_FIELDS = (
+    'joseph_scoring_details', 'confidence_assessment', 'ai_assessment_status', 'assessment_source', 'prescreen_rule'
+)
+
+
+def compact_scoring_details(joseph_scores):
+    """Joseph's scoring details reduced to what the UI shows: per-field scores (or the error) per component"""
+    compact = {}
+    for component, result in (joseph_scores or {}).items():
+        if not isinstance(result, dict):
+            # e.g. the duplicated top-level lead_id
+            continue
+        details = result.get('details') or {}
+        if 'field_scores' in details:
+            compact[component] = {'details': {'field_scores': details['field_scores']}}
+        elif 'error' in details:
+            compact[component] = {'details': {'error': details['error']}}
+    return compact
+
+
+@dataclass(slots=True)
+class LeadResult:
+    """Analysis result for one lead: Salesforce fields, quality flags, Joseph's scores and the AI assessment"""
+
+    # Salesforce fields selected by the batch analysis query (SegmentName comes from SegmentName__r.Name)
+    Id: Optional[str] = None
+    Email: Optional[str] = None
+    First_Channel__c: Optional[str] = None
+    SegmentName: Optional[str] = None
+    LS_Company_Size_Range__c: Optional[str] = None
+    Website: Optional[str] = None
+    Company: Optional[str] = None
+    ZI_Website__c: Optional[str] = None
+    ZI_Company_Name__c: Optional[str] = None
+    ZI_Employees__c: Optional[object] = None
+    FirstName: Optional[str] = None
+    LastName: Optional[str] = None
+    Phone: Optional[str] = None
+    Title: Optional[str] = None
+    Industry: Optional[str] = None
+    State: Optional[str] = None
+    Country: Optional[str] = None
+
+    # Business logic flags and Joseph's scores (from _analyze_lead_flags)
+    not_in_TAM: bool = False
+    suspicious_enrichment: bool = False
+    email_domain: Optional[str] = None
+    acquisition_completeness_score: float = 0
+    enrichment_completeness_score: float = 0
+    coherence_score: float = 0
+    joseph_scoring_details: Optional[dict] = None
+
+    # Assessment outputs
+    confidence_assessment: Optional[dict] = None
+    ai_assessment_status: Optional[str] = None
+    assessment_source: Optional[str] = None
+    prescreen_rule: Optional[str] = None
+
+    # Any other fields set on the result
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_record(cls, record, flags, keep_scoring_metadata=False):
+        """
+        Build a result from a normalized Salesforce record and its _analyze_lead_flags output.
+        Joseph's scoring details are reduced to the per-field scores unless keep_scoring_metadata is set.
+        """
+        result = cls()
+        for key, value in record.items():
+            result[key] = value
+        for key, value in flags.items():
+            result[key] = value
+        if not keep_scoring_metadata and result.joseph_scoring_details is not None:
+            result.joseph_scoring_details = compact_scoring_details(result.joseph_scoring_details)
+        return result
+
+    def get(self, key, default=None):
+        if key in _SLOT_NAME_SET:
+            value = getattr(self, key)
+            if value is None and key in OPTIONAL_FIELDS:
+                return default
+            return value
+        return self.extra.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in _SLOT_NAME_SET:
+            setattr(self, key, value)
+        else:
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+
+    def to_dict(self, compact=True):
+        """
+        Dict form for JSON responses. The compact form (default) leaves out fields that are
+        None; compact=False includes every field.
+        """
+        data = {}
+        for name in _SLOT_NAMES:
+            value = getattr(self, name)
+            if value is None and compact:
+                continue
+            data[name] = value
+        for key, value in self.extra.items():
+            if value is not None or not compact:
+                data[key] = value
+        return data
+
+
+_MISSING = object()
+_SLOT_NAMES = tuple(name for name in LeadResult.__dataclass_fields__ if name != 'extra')
+_SLOT_NAME_SET = frozenset(_SLOT_NAMES)
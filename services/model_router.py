@@ -0,0 +1,92 @@
+import threading
+from contextlib import contextmanager
+from config.config import Config
+
+# Adaptive model routing for AI assessments.
+# Straightforward leads go to the fast (cheaper) model first; leads whose Joseph
+# scores and flags look contradictory go straight to the strong model, and fast
+# responses that fail parsing or land right at a rubric band edge are escalated.
+# confidence_score rates the enrichment, not the model's certainty: a low score is a
+# deliberate verdict on a poor lead, so only scores next to a band edge are re-checked.
+
+TIER_FAST = 'fast'
+TIER_STRONG = 'strong'
+
+# Per-tier concurrency limits, shared across request threads
+_tier_semaphores = {
+    TIER_FAST: threading.BoundedSemaphore(Config.OPENAI_FAST_CONCURRENCY),
+    TIER_STRONG: threading.BoundedSemaphore(Config.OPENAI_STRONG_CONCURRENCY)
+}
+
+
+def model_for_tier(tier):
+    """Get the configured model name for a tier (OPENAI_MODEL for every tier when routing is disabled)"""
+    if not is_routing_enabled():
+        return Config.OPENAI_MODEL
+    return Config.OPENAI_MODEL_FAST if tier == TIER_FAST else Config.OPENAI_MODEL_STRONG
+
+
+def is_routing_enabled():
+    """Routing only applies when enabled and the two tiers use different models"""
+    return Config.MODEL_ROUTING_ENABLED and Config.OPENAI_MODEL_FAST != Config.OPENAI_MODEL_STRONG
+
+
+def choose_initial_tier(lead_data):
+    """
+    Pick the first model tier for a lead from its flags and Joseph's completeness scores.
+
+    Returns:
+        tier: TIER_FAST or TIER_STRONG
+        reason: Short description of the routing decision
+    """
+    if not is_routing_enabled():
+        return TIER_STRONG, 'routing disabled'
+
+    acquisition = lead_data.get('acquisition_completeness_score') or 0
+    enrichment = lead_data.get('enrichment_completeness_score') or 0
+    has_flags = bool(lead_data.get('not_in_TAM') or lead_data.get('suspicious_enrichment'))
+    has_website = bool(lead_data.get('Website') or lead_data.get('ZI_Website__c'))
+
+    # Quality flags alongside website data need real cross-checking of the enrichment
+    if has_flags and has_website:
+        return TIER_STRONG, 'quality flags with website data'
+
+    # Lead-provided and enriched data disagree on how complete the record is
+    if abs(acquisition - enrichment) >= Config.ROUTING_COMPLETENESS_GAP:
+        return TIER_STRONG, 'completeness scores disagree'
+
+    return TIER_FAST, 'simple lead'
+
+
+def should_escalate(assessment, parse_failed):
+    """
+    Decide whether a fast-tier assessment should be retried on the strong model.
+
+    Returns:
+        escalate: True when the strong model should re-assess the lead
+        reason: Short description of the escalation decision (None if not escalated)
+    """
+    if parse_failed:
+        return True, 'fast model response could not be parsed'
+
+    score = assessment.get('confidence_score') if assessment else None
+    if not isinstance(score, (int, float)):
+        return True, 'fast model returned no confidence score'
+
+    # Scores right at a band edge are where the fast model's verdict could go either way
+    for edge in Config.ROUTING_ESCALATION_EDGES:
+        if edge - Config.ROUTING_ESCALATION_MARGIN <= score < edge + Config.ROUTING_ESCALATION_MARGIN:
+            return True, f'ambiguous score {score} near band edge {edge}'
+
+    return False, None
+
+
+@contextmanager
+def tier_slot(tier):
+    """Hold one of the tier's concurrency slots for the duration of a call"""
+    semaphore = _tier_semaphores[tier]
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
@@ -4,10 +4,19 @@ import json
 import requests
 from urllib.parse import urlparse
 import socket
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from services.domain_utils import extract_core_domain, normalize_url_for_comparison, normalize_lead_domains
+from services.ai_metrics import global_ai_metrics
+from services.model_router import TIER_FAST, TIER_STRONG, choose_initial_tier, should_escalate, model_for_tier, tier_slot, is_routing_enabled
 
 # configure openAI access 
 openai.api_key = Config.OPENAI_API_KEY
-client = openai.OpenAI()  # creating client instance 
+client = openai.OpenAI(max_retries=0)  # creating client instance (retries handled in create_chat_completion so they can be counted)
+
+# Transient errors worth retrying
+RETRYABLE_OPENAI_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
 
 # System prompt for lead confidence scoring
 LEAD_QA_SYSTEM_PROMPT = """You are a data quality assistant. Your job is to evaluate the accuracy of enriched company data provided by ZoomInfo for a Salesforce Lead record. You are given both internal data (which we trust to varying degrees) and enriched data. Based on these, you will return a 0-100 confidence score and a short explanation of how reliable the enrichment is. You will also make corrections or educated guesses (inferences) if something is clearly wrong or missing. 
@@ -178,11 +187,145 @@ def test_openai_connection():
     except Exception as e:
         return False, f"OpenAI connection failed: {str(e)}"
 
+class AIDeadlineExceeded(Exception):
+    """Raised when an AI call cannot start before the job deadline"""
+    pass
+
+# Status messages for leads without an assessment (reported as-is in ai_assessment_status)
+AI_STATUS_DEADLINE_EXCEEDED = 'skipped: job deadline exceeded'
+
+# Worker pool for hedged duplicate requests. Primary calls run on their own thread so they
+# never queue behind hedges; a hedge is only sent while a worker is free to run it at once.
+_hedge_executor = ThreadPoolExecutor(max_workers=Config.OPENAI_HEDGE_MAX_WORKERS, thread_name_prefix='openai-hedge')
+_hedge_slots = threading.BoundedSemaphore(Config.OPENAI_HEDGE_MAX_WORKERS)
+
+def _call_timeout(deadline):
+    """Per-call timeout, shortened so a call never runs past the job deadline"""
+    timeout = Config.OPENAI_CALL_TIMEOUT_SECONDS
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AIDeadlineExceeded(AI_STATUS_DEADLINE_EXCEEDED)
+        timeout = min(timeout, remaining)
+    return timeout
+
+def _timeout_status(error):
+    """ai_assessment_status for a timed out call, with the timeout that call actually had"""
+    timeout = getattr(error, 'applied_timeout', Config.OPENAI_CALL_TIMEOUT_SECONDS)
+    if timeout < Config.OPENAI_CALL_TIMEOUT_SECONDS:
+        return f"timeout: no response within {timeout:.1f}s (call cut short by the job deadline)"
+    return f"timeout: no response within {timeout}s"
+
+def _hedge_delay():
+    """Wait this long for the primary call before sending a duplicate (observed p95 once there are enough samples)"""
+    p95_latency = global_ai_metrics.latency_percentile(95, min_samples=Config.OPENAI_HEDGE_MIN_SAMPLES)
+    return p95_latency if p95_latency else Config.OPENAI_HEDGE_DELAY_SECONDS
+
+def create_chat_completion(run_metrics=None, deadline=None, **kwargs):
+    """
+    Create a chat completion with per-call timeouts, retries and optional request hedging,
+    recording tokens, latency, model and retries.
+    
+    Args:
+        run_metrics: Optional AIUsageMetrics for the current analysis run
+        deadline: Optional time.monotonic() value no call may run past
+        **kwargs: Arguments passed to client.chat.completions.create
+        
+    Returns:
+        completion: The OpenAI completion (raises the last error if every attempt fails)
+    """
+    if not Config.OPENAI_HEDGING_ENABLED:
+        return _create_chat_completion_with_retries(run_metrics, deadline, kwargs)
+    
+    # Hedging: if the primary call has been running longer than the p95 latency, send a
+    # duplicate and take whichever succeeds first. The slower result is discarded.
+    primary = _start_primary_call(run_metrics, deadline, kwargs)
+    done, _ = wait([primary], timeout=_hedge_delay())
+    if primary in done:
+        return primary.result()
+    
+    # Every hedge worker is busy - queueing another duplicate would only add to the load
+    if not _hedge_slots.acquire(blocking=False):
+        return primary.result()
+    _record_hedge(run_metrics)
+    hedge = _hedge_executor.submit(_create_chat_completion_with_retries, run_metrics, deadline, kwargs)
+    hedge.add_done_callback(lambda _future: _hedge_slots.release())
+    pending = {primary, hedge}
+    last_error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+    raise last_error
+
+def _start_primary_call(run_metrics, deadline, kwargs):
+    """Run the primary call on its own thread (started before this returns) and return its Future"""
+    future = Future()
+    
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(_create_chat_completion_with_retries(run_metrics, deadline, kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=run, name='openai-primary', daemon=True).start()
+    return future
+
+def _create_chat_completion_with_retries(run_metrics, deadline, kwargs):
+    """Single logical call: retries transient errors, never retries timeouts"""
+    start_time = time.perf_counter()
+    retries = 0
+    
+    while True:
+        try:
+            timeout = _call_timeout(deadline)
+            request_client = client.with_options(timeout=timeout)
+            completion = request_client.chat.completions.create(**kwargs)
+            break
+        except openai.APITimeoutError as e:
+            # A stuck call is not retried - hedging covers slow calls
+            e.applied_timeout = timeout
+            _record_ai_call(run_metrics, kwargs.get('model'), None, time.perf_counter() - start_time, retries, success=False, timed_out=True)
+            raise
+        except RETRYABLE_OPENAI_ERRORS:
+            if retries >= Config.OPENAI_MAX_RETRIES:
+                _record_ai_call(run_metrics, kwargs.get('model'), None, time.perf_counter() - start_time, retries, success=False)
+                raise
+            retries += 1
+            # Exponential backoff between attempts
+            time.sleep(Config.OPENAI_RETRY_BACKOFF_SECONDS * (2 ** (retries - 1)))
+        except AIDeadlineExceeded:
+            raise
+        except Exception:
+            _record_ai_call(run_metrics, kwargs.get('model'), None, time.perf_counter() - start_time, retries, success=False)
+            raise
+    
+    _record_ai_call(run_metrics, completion.model or kwargs.get('model'), completion.usage, time.perf_counter() - start_time, retries, success=True)
+    return completion
+
+def _record_hedge(run_metrics):
+    """Count a hedged duplicate request in the process-wide and run metrics"""
+    for metrics in (global_ai_metrics, run_metrics):
+        if metrics is not None:
+            metrics.record_hedge()
+
+def _record_ai_call(run_metrics, model, usage, latency, retries, success, timed_out=False):
+    """Record a call in the process-wide metrics and the run's metrics (if any)"""
+    prompt_tokens = getattr(usage, 'prompt_tokens', 0) if usage else 0
+    completion_tokens = getattr(usage, 'completion_tokens', 0) if usage else 0
+    for metrics in (global_ai_metrics, run_metrics):
+        if metrics is not None:
+            metrics.record_call(model, prompt_tokens, completion_tokens, latency, retries, success, timed_out)
+
 def test_openai_completion(prompt="Hello! Please respond with 'OpenAI connection test successful.'"):
     """Test OpenAI completion generation"""
     try:
-        completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        completion = create_chat_completion(
+            model=model_for_tier(TIER_FAST),
             temperature=0,
             messages=[
                 {"role": "user", "content": prompt}
@@ -193,114 +336,63 @@ def test_openai_completion(prompt="Hello! Please respond with 'OpenAI connection
     except Exception as e:
         return None, f"Error generating completion: {str(e)}"
 
-def validate_and_clean_assessment(assessment, lead_data):
-    """
-    Remove redundant corrections and inferences that are just URL formatting differences or cross-field duplicates
-    """
-    def extract_core_domain(url):
-        """Extract core domain from URL, removing protocol, www, paths, etc."""
-        if not url:
-            return None
-        
-        # Convert to string and clean
-        url = str(url).strip().lower()
-        
-        # Handle edge cases
-        if url in ['null', 'none', 'n/a', '']:
-            return None
-        
-        # Remove protocols
-        url = url.replace('https://', '').replace('http://', '')
-        
-        # Remove www prefix
-        if url.startswith('www.'):
-            url = url[4:]
-        
-        # Remove trailing slash and paths
-        url = url.split('/')[0]
-        
-        # Remove trailing dots
-        url = url.rstrip('.')
-        
-        return url if url else None
+def is_website_accessible(url):
+    """Check if a website URL is accessible"""
+    if not url:
+        return False, "No URL provided"
     
-    def is_free_email_domain(domain):
-        """Check if a domain is a free email provider"""
-        if not domain:
-            return False
-        
-        # Extract core domain for comparison
-        core_domain = extract_core_domain(domain)
-        if not core_domain:
-            return False
-        
-        return core_domain in BAD_EMAIL_DOMAINS
+    # Normalize the URL
+    url = str(url).strip()
     
-    def are_same_domain(url1, url2):
-        """Check if two URLs represent the same domain"""
-        domain1 = extract_core_domain(url1)
-        domain2 = extract_core_domain(url2)
-        return domain1 and domain2 and domain1 == domain2
+    # Add protocol if missing
+    if not url.startswith(('http://', 'https://')):
+        # Try HTTPS first, then HTTP
+        test_urls = [f'https://{url}', f'http://{url}']
+    else:
+        test_urls = [url]
     
-    def normalize_url_for_comparison(url):
-        """Normalize URL for exact string comparison (handles case, whitespace)"""
-        if not url:
-            return None
-        return str(url).strip().lower()
-    
-    def is_website_accessible(url):
-        """Check if a website URL is accessible"""
-        if not url:
-            return False, "No URL provided"
-        
-        # Normalize the URL
-        url = str(url).strip()
-        
-        # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            # Try HTTPS first, then HTTP
-            test_urls = [f'https://{url}', f'http://{url}']
-        else:
-            test_urls = [url]
-        
-        for test_url in test_urls:
-            try:
-                # Set a reasonable timeout
-                response = requests.head(test_url, timeout=5, allow_redirects=True)
-                
-                # Check if the response is successful (200-399 range)
-                if 200 <= response.status_code < 400:
-                    return True, f"HTTP {response.status_code}"
-                elif response.status_code == 403:
-                    # Some sites block HEAD requests but allow GET
-                    try:
-                        response = requests.get(test_url, timeout=5, allow_redirects=True)
-                        if 200 <= response.status_code < 400:
-                            return True, f"HTTP {response.status_code}"
-                    except:
-                        pass
-                        
-            except requests.exceptions.ConnectionError:
-                # Try to resolve the domain to check if it exists
+    for test_url in test_urls:
+        try:
+            # Set a reasonable timeout
+            response = requests.head(test_url, timeout=5, allow_redirects=True)
+            
+            # Check if the response is successful (200-399 range)
+            if 200 <= response.status_code < 400:
+                return True, f"HTTP {response.status_code}"
+            elif response.status_code == 403:
+                # Some sites block HEAD requests but allow GET
                 try:
-                    parsed = urlparse(test_url)
-                    domain = parsed.netloc
-                    socket.gethostbyname(domain)
-                    return False, f"Domain exists but connection failed"
-                except socket.gaierror:
-                    continue  # Try next URL variant
-            except requests.exceptions.Timeout:
-                return False, "Connection timeout"
-            except requests.exceptions.RequestException as e:
+                    response = requests.get(test_url, timeout=5, allow_redirects=True)
+                    if 200 <= response.status_code < 400:
+                        return True, f"HTTP {response.status_code}"
+                except:
+                    pass
+                    
+        except requests.exceptions.ConnectionError:
+            # Try to resolve the domain to check if it exists
+            try:
+                parsed = urlparse(test_url)
+                domain = parsed.netloc
+                socket.gethostbyname(domain)
+                return False, f"Domain exists but connection failed"
+            except socket.gaierror:
                 continue  # Try next URL variant
-        
-        return False, "Website not accessible"
+        except requests.exceptions.Timeout:
+            return False, "Connection timeout"
+        except requests.exceptions.RequestException as e:
+            continue  # Try next URL variant
     
-    # Get existing website and company values from lead data
-    existing_websites = {
+    return False, "Website not accessible"
+
+def validate_and_clean_assessment(assessment, lead_data):
+    """
+    Remove redundant corrections and inferences that are just URL formatting differences or cross-field duplicates
+    """
+    # Normalize the lead's existing website domains once (value, core domain, comparison string)
+    existing_websites = normalize_lead_domains({
         'Website': lead_data.get('Website'),
         'ZI_Website__c': lead_data.get('ZI_Website__c')
-    }
+    })
     existing_companies = {
         'Company': lead_data.get('Company'),
         'ZI_Company_Name__c': lead_data.get('ZI_Company_Name__c')
@@ -312,8 +404,11 @@ def validate_and_clean_assessment(assessment, lead_data):
         should_keep = True
         
         if field in ['Website', 'ZI_Website__c']:
+            value_domain = extract_core_domain(value)
+            value_normalized = normalize_url_for_comparison(value)
+            
             # Check if this is a free email domain being used as a website
-            if field == 'ZI_Website__c' and is_free_email_domain(value):
+            if field == 'ZI_Website__c' and value_domain in BAD_EMAIL_DOMAINS:
                 should_keep = False
                 print(f"🚫 Removed invalid correction: {field} '{value}' (free email domain not allowed for website)")
             
@@ -325,29 +420,29 @@ def validate_and_clean_assessment(assessment, lead_data):
                     print(f"🚫 Removed invalid correction: {field} '{value}' (website not accessible: {status_msg})")
             
             # Check if this correction is just a formatting change of the same field
-            if should_keep:
-                existing_value = existing_websites.get(field)
-                if existing_value and are_same_domain(existing_value, value):
+            existing = existing_websites.get(field)
+            if should_keep and existing:
+                existing_value, existing_domain, existing_normalized = existing
+                if existing_domain and existing_domain == value_domain:
                     should_keep = False
                     print(f"🧹 Removed redundant correction: {field} '{existing_value}' -> '{value}' (same domain)")
-            
-            # Check for exact string matches (case-insensitive)
-            if should_keep and existing_value:
-                if normalize_url_for_comparison(existing_value) == normalize_url_for_comparison(value):
+                
+                # Check for exact string matches (case-insensitive)
+                elif existing_normalized == value_normalized:
                     should_keep = False
                     print(f"🧹 Removed redundant correction: {field} '{existing_value}' -> '{value}' (exact match)")
             
             # Also check if this correction matches any other website field (cross-field redundancy)
             if should_keep:
-                for other_field, other_value in existing_websites.items():
-                    if other_field != field and other_value:
+                for other_field, (other_value, other_domain, other_normalized) in existing_websites.items():
+                    if other_field != field:
                         # Check domain match
-                        if are_same_domain(other_value, value):
+                        if other_domain and other_domain == value_domain:
                             should_keep = False
                             print(f"🧹 Removed redundant correction: {field} '{value}' (same domain as {other_field}: '{other_value}')")
                             break
                         # Check exact string match
-                        if normalize_url_for_comparison(other_value) == normalize_url_for_comparison(value):
+                        if other_normalized == value_normalized:
                             should_keep = False
                             print(f"🧹 Removed redundant correction: {field} '{value}' (exact match with {other_field}: '{other_value}')")
                             break
@@ -383,8 +478,11 @@ def validate_and_clean_assessment(assessment, lead_data):
                 print(f"🧹 Removed redundant inference: {field} '{value}' (identical to correction)")
         
         if should_keep and field in ['Website', 'ZI_Website__c']:
+            value_domain = extract_core_domain(value)
+            value_normalized = normalize_url_for_comparison(value)
+            
             # Check if this is a free email domain being used as a website
-            if field == 'ZI_Website__c' and is_free_email_domain(value):
+            if field == 'ZI_Website__c' and value_domain in BAD_EMAIL_DOMAINS:
                 should_keep = False
                 print(f"🚫 Removed invalid inference: {field} '{value}' (free email domain not allowed for website)")
             
@@ -397,18 +495,17 @@ def validate_and_clean_assessment(assessment, lead_data):
             
             # Check if any existing website field has the same domain or exact match
             if should_keep:
-                for existing_field, existing_value in existing_websites.items():
-                    if existing_value:
-                        # Check domain match
-                        if are_same_domain(existing_value, value):
-                            should_keep = False
-                            print(f"🧹 Removed redundant inference: {field} '{value}' (same domain as {existing_field}: '{existing_value}')")
-                            break
-                        # Check exact string match
-                        if normalize_url_for_comparison(existing_value) == normalize_url_for_comparison(value):
-                            should_keep = False
-                            print(f"🧹 Removed redundant inference: {field} '{value}' (exact match with {existing_field}: '{existing_value}')")
-                            break
+                for existing_field, (existing_value, existing_domain, existing_normalized) in existing_websites.items():
+                    # Check domain match
+                    if existing_domain and existing_domain == value_domain:
+                        should_keep = False
+                        print(f"🧹 Removed redundant inference: {field} '{value}' (same domain as {existing_field}: '{existing_value}')")
+                        break
+                    # Check exact string match
+                    if existing_normalized == value_normalized:
+                        should_keep = False
+                        print(f"🧹 Removed redundant inference: {field} '{value}' (exact match with {existing_field}: '{existing_value}')")
+                        break
         elif should_keep and field in ['Company', 'ZI_Company_Name__c']:
             # Check if any existing company field has the same name
             for existing_field, existing_value in existing_companies.items():
@@ -435,8 +532,55 @@ def validate_and_clean_assessment(assessment, lead_data):
     
     return assessment
 
-def generate_lead_confidence_assessment(lead_data):
-    """Generate confidence assessment for lead data using OpenAI"""
+def _request_assessment(model, user_prompt, lead_data, run_metrics=None, deadline=None):
+    """
+    Request an assessment from a single model.
+    
+    Returns:
+        assessment: Cleaned assessment dict (or the parse-error placeholder)
+        parse_failed: True when the response was not valid JSON
+    """
+    completion = create_chat_completion(
+        run_metrics=run_metrics,
+        deadline=deadline,
+        model=model,
+        temperature=0.1,  # Low temperature for consistent scoring
+        messages=[
+            {"role": "system", "content": LEAD_QA_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        max_tokens=Config.OPENAI_MAX_TOKENS
+    )
+    
+    response_content = completion.choices[0].message.content
+    if response_content is None:
+        response_content = ""
+    else:
+        response_content = response_content.strip()
+    
+    # Try to parse the JSON response
+    try:
+        assessment = json.loads(response_content)
+        
+        # 🧹 VALIDATE AND CLEAN the assessment to remove redundant URL corrections/inferences
+        assessment = validate_and_clean_assessment(assessment, lead_data)
+        
+        return assessment, False
+    except json.JSONDecodeError:
+        # If JSON parsing fails, return the raw response with an error
+        return {
+            "confidence_score": 0,
+            "explanation_bullets": ["❌ Error parsing AI response - please try again"],
+            "corrections": {},
+            "inferences": {},
+            "raw_response": response_content
+        }, True
+
+def generate_lead_confidence_assessment(lead_data, run_metrics=None, deadline=None):
+    """
+    Generate confidence assessment for lead data using OpenAI.
+    Token usage is recorded in run_metrics if given; no call runs past deadline (a time.monotonic() value).
+    """
     try:
         # Format the lead data for the prompt
         user_prompt = f"""Please analyze this lead data and provide a confidence assessment:
@@ -458,48 +602,61 @@ Lead Data:
 
 Please provide your assessment in the required JSON format."""
 
-        completion = client.chat.completions.create(
-            model=Config.OPENAI_MODEL,
-            temperature=0.1,  # Low temperature for consistent scoring
-            messages=[
-                {"role": "system", "content": LEAD_QA_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=Config.OPENAI_MAX_TOKENS
-        )
+        # Route simple leads to the fast model, hard leads straight to the strong model
+        tier, route_reason = choose_initial_tier(lead_data)
+        model = model_for_tier(tier)
+        with tier_slot(tier):
+            assessment, parse_failed = _request_assessment(model, user_prompt, lead_data, run_metrics, deadline)
         
-        response_content = completion.choices[0].message.content
-        if response_content is None:
-            response_content = ""
-        else:
-            response_content = response_content.strip()
+        escalation_reason = None
+        if tier == TIER_FAST:
+            escalate, escalation_reason = should_escalate(assessment, parse_failed)
+            if escalate:
+                _record_escalation(run_metrics)
+                try:
+                    with tier_slot(TIER_STRONG):
+                        assessment, parse_failed = _request_assessment(model_for_tier(TIER_STRONG), user_prompt, lead_data, run_metrics, deadline)
+                    tier = TIER_STRONG
+                    model = model_for_tier(tier)
+                except Exception as e:
+                    # Keep a usable fast-tier result rather than losing the lead to a failed escalation
+                    if parse_failed:
+                        raise
+                    if isinstance(e, (openai.APITimeoutError, AIDeadlineExceeded)):
+                        escalation_reason = f"{escalation_reason} (escalation timed out, kept fast result)"
+                    else:
+                        escalation_reason = f"{escalation_reason} (escalation failed: {str(e)}, kept fast result)"
         
-        # Try to parse the JSON response
-        try:
-            assessment = json.loads(response_content)
-            
-            # 🧹 VALIDATE AND CLEAN the assessment to remove redundant URL corrections/inferences
-            assessment = validate_and_clean_assessment(assessment, lead_data)
-            
-            return assessment, "Assessment generated successfully"
-        except json.JSONDecodeError:
-            # If JSON parsing fails, return the raw response with an error
-            return {
-                "confidence_score": 0,
-                "explanation_bullets": ["❌ Error parsing AI response - please try again"],
-                "corrections": {},
-                "inferences": {},
-                "raw_response": response_content
-            }, "Warning: Could not parse JSON response, returning raw output"
+        assessment['model_routing'] = {
+            'tier': tier,
+            'model': model,
+            'route_reason': route_reason,
+            'escalated': escalation_reason is not None,
+            'escalation_reason': escalation_reason
+        }
+        
+        if parse_failed:
+            return assessment, "Warning: Could not parse JSON response, returning raw output"
+        return assessment, "Assessment generated successfully"
             
+    except AIDeadlineExceeded:
+        return None, AI_STATUS_DEADLINE_EXCEEDED
+    except openai.APITimeoutError as e:
+        return None, _timeout_status(e)
     except Exception as e:
         return None, f"Error generating assessment: {str(e)}"
 
-def ask_openai(openai_client, system_prompt, user_prompt):
+def _record_escalation(run_metrics):
+    """Count a fast-to-strong escalation in the process-wide and run metrics"""
+    for metrics in (global_ai_metrics, run_metrics):
+        if metrics is not None:
+            metrics.record_escalation()
+
+def ask_openai(openai_client, system_prompt, user_prompt, model=None):
     """calls openai"""
     try:
         completion = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
+            model=model or model_for_tier(TIER_FAST),
             temperature=0,
             messages=[
                 {
@@ -521,6 +678,9 @@ def get_openai_config():
     """Get current OpenAI configuration"""
     return {
         "model": Config.OPENAI_MODEL,
+        "model_fast": Config.OPENAI_MODEL_FAST,
+        "model_strong": Config.OPENAI_MODEL_STRONG,
+        "model_routing_enabled": is_routing_enabled(),
         "max_tokens": Config.OPENAI_MAX_TOKENS,
         "api_key_configured": bool(Config.OPENAI_API_KEY)
     }
\ No newline at end of file
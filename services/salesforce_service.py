@@ -4,6 +4,10 @@ from typing import Optional
 import math
 import time
 from .joseph_wrapper import JosephScoringWrapper
+from .domain_utils import extract_email_domain
+from .lead_prescreen import prescreen_lead, should_use_prescreen
+from .ai_metrics import AIUsageMetrics
+from .lead_result import LeadResult
 
 
 class SalesforceService:
@@ -93,23 +97,12 @@ class SalesforceService:
     
     def _is_free_email_domain(self, email):
         """Check if email uses a free email domain"""
-        if not email:
-            return False
-        try:
-            domain = email.split('@')[1].lower()
-            return bool(domain in BAD_EMAIL_DOMAINS)
-        except (IndexError, AttributeError):
-            return False
+        domain = extract_email_domain(email)
+        return bool(domain and domain in BAD_EMAIL_DOMAINS)
     
     def _extract_email_domain(self, email):
         """Extract domain from email address"""
-        if not email:
-            return None
-        try:
-            domain = email.split('@')[1].lower().strip()
-            return domain if domain else None
-        except (IndexError, AttributeError):
-            return None
+        return extract_email_domain(email)
     
     def _normalize_lead_record(self, lead_record):
         """Normalize lead record by extracting relationship fields and cleaning up structure"""
@@ -129,8 +122,12 @@ class SalesforceService:
         
         return lead_record
     
-    def _analyze_lead_flags(self, lead_record):
-        """Analyze lead data and return business logic flags, email domain, and Joseph's scores"""
+    def _analyze_lead_flags(self, lead_record, joseph_scores=None):
+        """
+        Analyze lead data and return business logic flags, email domain, and Joseph's scores.
+        joseph_scores is the lead's entry from JosephScoringWrapper.calculate_batch_scores when the
+        caller already scored its batch; otherwise the lead is scored on its own.
+        """
         # Extract values with explicit None handling
         zi_employees = lead_record.get('ZI_Employees__c')
         zi_company_name = lead_record.get('ZI_Company_Name__c')
@@ -170,7 +167,8 @@ class SalesforceService:
         )
         
         # Calculate Joseph's scores
-        joseph_scores = self.joseph_scorer.calculate_both_scores(lead_record)
+        if joseph_scores is None:
+            joseph_scores = self.joseph_scorer.calculate_both_scores(lead_record)
         
         return {
             'not_in_TAM': not_in_tam,
@@ -178,9 +176,34 @@ class SalesforceService:
             'email_domain': email_domain,
             'acquisition_completeness_score': joseph_scores['acquisition_completeness']['percentage'],
             'enrichment_completeness_score': joseph_scores['enrichment_completeness']['percentage'],
+            'coherence_score': joseph_scores['coherence']['percentage'],
             'joseph_scoring_details': joseph_scores
         }
     
+    def _assess_lead(self, lead_data, run_metrics=None, deadline=None):
+        """Assess lead confidence with the rule-based pre-screen, falling back to the AI assessment"""
+        # Import here to avoid circular imports
+        from services.openai_service import generate_lead_confidence_assessment, AI_STATUS_DEADLINE_EXCEEDED
+        
+        assessment, prescreen_confidence, rule = prescreen_lead(lead_data)
+        if assessment and should_use_prescreen(prescreen_confidence):
+            lead_data['assessment_source'] = 'prescreen'
+            lead_data['prescreen_rule'] = rule
+            return assessment, f"Pre-screened by rule '{rule}' (confidence {prescreen_confidence:.2f})"
+        
+        # Don't start new AI calls once the job deadline has passed
+        if deadline is not None and time.monotonic() >= deadline:
+            return None, AI_STATUS_DEADLINE_EXCEEDED
+        
+        lead_data['assessment_source'] = 'ai'
+        return generate_lead_confidence_assessment(lead_data, run_metrics=run_metrics, deadline=deadline)
+    
+    def _ai_failure_status(self, ai_message):
+        """Build ai_assessment_status for a lead without an assessment (timeouts and skips are reported as-is)"""
+        if ai_message and ai_message.startswith(('timeout:', 'skipped:')):
+            return ai_message
+        return f'failed: {ai_message}'
+    
     def get_lead_by_id(self, lead_id):
         """Get specific Lead fields by Lead ID with business logic flags"""
         try:
@@ -243,13 +266,16 @@ class SalesforceService:
             result = self.sf.query(base_query)
             
             # Clean up records by normalizing and adding flags
+            # Normalize the lead records (handle relationship fields and cleanup)
+            records = [self._normalize_lead_record(record) for record in result['records']]
+            
+            # Joseph's scores for the whole result set in one pass
+            batch_scores = self.joseph_scorer.calculate_batch_scores(records)
+            
             clean_records = []
-            for record in result['records']:
-                # Normalize the lead record (handle relationship fields and cleanup)
-                record = self._normalize_lead_record(record)
-                
+            for record, joseph_scores in zip(records, batch_scores):
                 # Add business logic flags
-                flags = self._analyze_lead_flags(record)
+                flags = self._analyze_lead_flags(record, joseph_scores)
                 record.update(flags)
                 clean_records.append(record)
             
@@ -357,9 +383,8 @@ class SalesforceService:
             suspicious_enrichment_count = 0
             total_confidence_score = 0
             successful_ai_assessments = 0
-            
-            # Import here to avoid circular imports
-            from services.openai_service import generate_lead_confidence_assessment
+            prescreened_leads = 0
+            ai_metrics = AIUsageMetrics()
             
             # Get all lead data in one batch query (much faster!)
             batch_leads = self._analyze_lead_batch(lead_ids_to_analyze, include_details=True)
@@ -377,15 +402,17 @@ class SalesforceService:
                     
                     # Generate AI confidence assessment if requested
                     if include_ai_assessment:
-                        assessment, ai_message = generate_lead_confidence_assessment(lead_data)
+                        assessment, ai_message = self._assess_lead(lead_data, run_metrics=ai_metrics)
                         if assessment and assessment.get('confidence_score') is not None:
                             lead_data['confidence_assessment'] = assessment
                             lead_data['ai_assessment_status'] = 'success'
                             total_confidence_score += assessment.get('confidence_score', 0)
                             successful_ai_assessments += 1
+                            if lead_data.get('assessment_source') == 'prescreen':
+                                prescreened_leads += 1
                         else:
                             lead_data['confidence_assessment'] = None
-                            lead_data['ai_assessment_status'] = f'failed: {ai_message}'
+                            lead_data['ai_assessment_status'] = self._ai_failure_status(ai_message)
                     
                     # Always include full lead data
                     analyzed_leads.append(lead_data)
@@ -407,7 +434,9 @@ class SalesforceService:
                     'issue_percentage': round((leads_with_issues / actual_analyze_count) * 100, 2) if actual_analyze_count > 0 else 0,
                     'avg_confidence_score': round(avg_confidence_score, 1),
                     'ai_assessments_successful': successful_ai_assessments,
-                    'ai_assessments_failed': actual_analyze_count - successful_ai_assessments
+                    'ai_assessments_failed': actual_analyze_count - successful_ai_assessments,
+                    'prescreened_leads': prescreened_leads,
+                    'ai_metrics': ai_metrics.to_dict()
                 },
                 'leads': analyzed_leads,
                 'query_info': {
@@ -569,18 +598,20 @@ class SalesforceService:
             assert self.sf is not None  # Type hint for linter
             result = self.sf.query(batch_query)
             
+            # Normalize the lead records (handle relationship fields and cleanup)
+            records = [self._normalize_lead_record(record) for record in result['records']]
+            
+            # Joseph's scores for the whole batch in one pass
+            batch_scores = self.joseph_scorer.calculate_batch_scores(records)
+            
             analyzed_leads = []
-            for record in result['records']:
-                # Normalize the lead record (handle relationship fields and cleanup)
-                record = self._normalize_lead_record(record)
-                
+            for record, joseph_scores in zip(records, batch_scores):
                 # Add business logic flags
-                flags = self._analyze_lead_flags(record)
+                flags = self._analyze_lead_flags(record, joseph_scores)
                 
                 if include_details:
-                    # Include all lead data
-                    record.update(flags)
-                    analyzed_leads.append(record)
+                    # Include all lead data (compact result, see LeadResult)
+                    analyzed_leads.append(LeadResult.from_record(record, flags))
                 else:
                     # Include only ID and flags
                     analyzed_leads.append({
@@ -733,9 +764,8 @@ class SalesforceService:
             suspicious_enrichment_count = 0
             total_confidence_score = 0
             successful_ai_assessments = 0
-            
-            # Import here to avoid circular imports
-            from services.openai_service import generate_lead_confidence_assessment
+            prescreened_leads = 0
+            ai_metrics = AIUsageMetrics()
             
             # Get all lead data in one batch query (much faster!)
             batch_leads = self._analyze_lead_batch(lead_ids, include_details=True)
@@ -753,15 +783,17 @@ class SalesforceService:
                     
                     # Generate AI confidence assessment if requested
                     if include_ai_assessment:
-                        assessment, ai_message = generate_lead_confidence_assessment(lead_data)
+                        assessment, ai_message = self._assess_lead(lead_data, run_metrics=ai_metrics)
                         if assessment and assessment.get('confidence_score') is not None:
                             lead_data['confidence_assessment'] = assessment
                             lead_data['ai_assessment_status'] = 'success'
                             total_confidence_score += assessment.get('confidence_score', 0)
                             successful_ai_assessments += 1
+                            if lead_data.get('assessment_source') == 'prescreen':
+                                prescreened_leads += 1
                         else:
                             lead_data['confidence_assessment'] = None
-                            lead_data['ai_assessment_status'] = f'failed: {ai_message}'
+                            lead_data['ai_assessment_status'] = self._ai_failure_status(ai_message)
                     
                     # Always include full lead data
                     analyzed_leads.append(lead_data)
@@ -782,7 +814,9 @@ class SalesforceService:
                     'issue_percentage': round((leads_with_issues / actual_analyze_count) * 100, 2) if actual_analyze_count > 0 else 0,
                     'avg_confidence_score': round(avg_confidence_score, 1),
                     'ai_assessments_successful': successful_ai_assessments,
-                    'ai_assessments_failed': actual_analyze_count - successful_ai_assessments
+                    'ai_assessments_failed': actual_analyze_count - successful_ai_assessments,
+                    'prescreened_leads': prescreened_leads,
+                    'ai_metrics': ai_metrics.to_dict()
                 },
                 'leads': analyzed_leads
             }
@@ -792,7 +826,7 @@ class SalesforceService:
         except Exception as e:
             return None, f"Error analyzing leads from IDs: {str(e)}" 
 
-    def analyze_leads_from_ids_batch_optimized(self, lead_ids, include_ai_assessment=True, batch_size=200, ai_batch_size=50, progress_callback=None):
+    def analyze_leads_from_ids_batch_optimized(self, lead_ids, include_ai_assessment=True, batch_size=200, ai_batch_size=50, progress_callback=None, deadline_seconds=None):
         """
         Analyze leads from a list of Lead IDs with optimized batch processing for large datasets.
         Handles 50k+ Lead IDs efficiently with proper chunking and connection management.
@@ -803,6 +837,7 @@ class SalesforceService:
             batch_size: Size of batches for Salesforce queries (default: 200, max SOQL IN clause)
             ai_batch_size: Size of batches for AI processing (default: 50, for rate limiting)
             progress_callback: Optional callback function for progress updates
+            deadline_seconds: Optional AI time budget for the whole job (default: Config.AI_JOB_DEADLINE_SECONDS, 0 = none)
             
         Returns:
             result: Analysis results with summary and leads data
@@ -838,6 +873,11 @@ class SalesforceService:
             total_leads = len(lead_ids)
             total_batches = math.ceil(total_leads / batch_size)
             
+            # Overall job deadline - leads reached after it are skipped instead of waiting on the AI
+            if deadline_seconds is None:
+                deadline_seconds = Config.AI_JOB_DEADLINE_SECONDS
+            deadline = time.monotonic() + deadline_seconds if deadline_seconds and deadline_seconds > 0 else None
+            
 
             
             # Initialize tracking variables
@@ -847,13 +887,11 @@ class SalesforceService:
             suspicious_enrichment_count = 0
             total_confidence_score = 0
             successful_ai_assessments = 0
+            prescreened_leads = 0
+            ai_metrics = AIUsageMetrics()
             successful_batches = 0
             failed_batches = 0
             
-            # Import here to avoid circular imports
-            if include_ai_assessment:
-                from services.openai_service import generate_lead_confidence_assessment
-            
             # Process leads in batches
             for batch_num in range(total_batches):
                 batch_start_time = time.time()
@@ -914,15 +952,17 @@ class SalesforceService:
                             for lead_data in ai_batch_leads:
                                 try:
                                     # Generate AI confidence assessment
-                                    assessment, ai_message = generate_lead_confidence_assessment(lead_data)
+                                    assessment, ai_message = self._assess_lead(lead_data, run_metrics=ai_metrics, deadline=deadline)
                                     if assessment and assessment.get('confidence_score') is not None:
                                         lead_data['confidence_assessment'] = assessment
                                         lead_data['ai_assessment_status'] = 'success'
                                         total_confidence_score += assessment.get('confidence_score', 0)
                                         successful_ai_assessments += 1
+                                        if lead_data.get('assessment_source') == 'prescreen':
+                                            prescreened_leads += 1
                                     else:
                                         lead_data['confidence_assessment'] = None
-                                        lead_data['ai_assessment_status'] = f'failed: {ai_message}'
+                                        lead_data['ai_assessment_status'] = self._ai_failure_status(ai_message)
                                         
                                 except Exception as e:
                                     lead_data['confidence_assessment'] = None
@@ -937,15 +977,17 @@ class SalesforceService:
                         if include_ai_assessment:
                             for lead_data in batch_leads:
                                 try:
-                                    assessment, ai_message = generate_lead_confidence_assessment(lead_data)
+                                    assessment, ai_message = self._assess_lead(lead_data, run_metrics=ai_metrics, deadline=deadline)
                                     if assessment and assessment.get('confidence_score') is not None:
                                         lead_data['confidence_assessment'] = assessment
                                         lead_data['ai_assessment_status'] = 'success'
                                         total_confidence_score += assessment.get('confidence_score', 0)
                                         successful_ai_assessments += 1
+                                        if lead_data.get('assessment_source') == 'prescreen':
+                                            prescreened_leads += 1
                                     else:
                                         lead_data['confidence_assessment'] = None
-                                        lead_data['ai_assessment_status'] = f'failed: {ai_message}'
+                                        lead_data['ai_assessment_status'] = self._ai_failure_status(ai_message)
                                         
                                 except Exception as e:
                                     lead_data['confidence_assessment'] = None
@@ -999,6 +1041,7 @@ class SalesforceService:
                     'avg_confidence_score': round(avg_confidence_score, 1),
                     'ai_assessments_successful': successful_ai_assessments,
                     'ai_assessments_failed': len(analyzed_leads) - successful_ai_assessments,
+                    'prescreened_leads': prescreened_leads,
                     'processing_stats': {
                         'total_batches': total_batches,
                         'successful_batches': successful_batches,
@@ -1007,7 +1050,11 @@ class SalesforceService:
                         'ai_batch_size': ai_batch_size,
                         'total_processing_time': round(execution_time, 2),
                         'avg_batch_time': round(execution_time / total_batches, 2) if total_batches > 0 else 0,
-                        'leads_per_second': round(len(analyzed_leads) / execution_time, 2) if execution_time > 0 else 0
+                        'leads_per_second': round(len(analyzed_leads) / execution_time, 2) if execution_time > 0 else 0,
+                        'ai_assessments_timed_out': sum(1 for lead in analyzed_leads if str(lead.get('ai_assessment_status', '')).startswith('timeout:')),
+                        'ai_assessments_skipped': sum(1 for lead in analyzed_leads if str(lead.get('ai_assessment_status', '')).startswith('skipped:')),
+                        'deadline_seconds': deadline_seconds,
+                        'ai_metrics': ai_metrics.to_dict()
                     }
                 },
                 'leads': analyzed_leads
@@ -0,0 +1,177 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+import pandas as pd
+from config.config import Config
+
+
+class UploadStore:
+    """
+    Disk-backed cache of uploaded lead files (xlsx, CSV or Parquet).
+    /excel/parse stores the file once and returns an upload ID; later steps (validate,
+    analyze, export) reference that ID instead of re-uploading the bytes, and each parsed
+    sheet is kept as a Parquet file so each file is only parsed once per upload.
+    The least recently used uploads are evicted beyond max_entries, and uploads not
+    touched within the retention period are treated as missing and removed.
+    """
+
+    SOURCE_FILE = 'source'
+    META_FILE = 'meta.json'
+
+    def __init__(self, upload_dir=None, max_entries=None, retention_seconds=None):
+        self.upload_dir = upload_dir or Config.UPLOAD_DIR
+        self.max_entries = max_entries if max_entries is not None else Config.UPLOAD_CACHE_MAX_ENTRIES
+        self.retention_seconds = retention_seconds if retention_seconds is not None else Config.UPLOAD_RETENTION_SECONDS
+        self._lock = threading.Lock()
+
+    def save_upload(self, file_content, filename):
+        """Store an uploaded file (bytes or a readable stream) and return its upload ID"""
+        upload_id = uuid.uuid4().hex
+        upload_path = os.path.join(self.upload_dir, upload_id)
+        os.makedirs(upload_path)
+
+        # Keep the original extension - readers such as openpyxl check it
+        extension = os.path.splitext(filename or '')[1].lower()
+        source_file = self.SOURCE_FILE + (extension if extension[1:].isalnum() else '')
+        source_path = os.path.join(upload_path, source_file)
+        with open(source_path, 'wb') as f:
+            if isinstance(file_content, (bytes, bytearray)):
+                f.write(file_content)
+            else:
+                # Stream large uploads to disk instead of reading them into memory
+                shutil.copyfileobj(file_content, f)
+        with open(os.path.join(upload_path, self.META_FILE), 'w') as f:
+            json.dump({
+                'filename': filename,
+                'source_file': source_file,
+                'size': os.path.getsize(source_path),
+                'created_at': time.time()
+            }, f)
+
+        self.evict()
+        return upload_id
+
+    def get_upload(self, upload_id):
+        """Get upload metadata (filename, size) or None if the upload is unknown/evicted"""
+        upload_path = self._upload_path(upload_id)
+        if not upload_path:
+            return None
+        try:
+            with open(os.path.join(upload_path, self.META_FILE)) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        self._touch(upload_path)
+        return meta
+
+    def source_path(self, upload_id):
+        """Path of an uploaded file on disk, or None if the upload is unknown/evicted"""
+        upload = self.get_upload(upload_id)
+        if not upload:
+            return None
+        source_path = os.path.join(self.upload_dir, upload_id, upload.get('source_file', self.SOURCE_FILE))
+        return source_path if os.path.isfile(source_path) else None
+
+    def delete_upload(self, upload_id):
+        """Remove an upload (e.g. when the file turned out to be unreadable)"""
+        upload_path = self._upload_path(upload_id)
+        if upload_path:
+            shutil.rmtree(upload_path, ignore_errors=True)
+
+    def get_frame(self, upload_id, cache_key, loader):
+        """
+        Get a parsed DataFrame for an upload, parsing it with loader(source_path) on first use.
+
+        Args:
+            upload_id: ID returned by save_upload
+            cache_key: Identifies the parsed view (e.g. sheet name and read options)
+            loader: Callable that parses the uploaded file (given its path) into a DataFrame
+
+        Returns:
+            DataFrame, or None if the upload is unknown/evicted
+        """
+        upload_path = self._upload_path(upload_id)
+        if not upload_path:
+            return None
+
+        # Parquet rather than pickle: the cache directory is on shared temp storage, and
+        # unpickling a planted file would run arbitrary code
+        frame_path = os.path.join(upload_path, f"frame_{hashlib.sha1(repr(cache_key).encode('utf-8')).hexdigest()}.parquet")
+        try:
+            df = pd.read_parquet(frame_path)
+            self._touch(upload_path)
+            return df
+        except FileNotFoundError:
+            pass
+
+        source_path = self.source_path(upload_id)
+        if source_path is None:
+            return None
+        df = loader(source_path)
+
+        # Write to a temporary name first so concurrent readers never see a partial file
+        tmp_path = f"{frame_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, frame_path)
+        except FileNotFoundError:
+            # Upload was evicted while parsing - the frame is still valid for this request
+            pass
+        except (ValueError, TypeError):
+            # Columns Parquet cannot store (e.g. mixed types) - serve the frame uncached
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return df
+
+    def evict(self):
+        """Remove expired uploads and the least recently used ones beyond max_entries"""
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.upload_dir) if entry.is_dir()]
+            except FileNotFoundError:
+                return 0
+
+            now = time.time()
+            entries_by_age = []
+            for entry in entries:
+                try:
+                    entries_by_age.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue
+            entries_by_age.sort(reverse=True)
+
+            removed = 0
+            for index, (last_used, path) in enumerate(entries_by_age):
+                if index >= self.max_entries or now - last_used > self.retention_seconds:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            return removed
+
+    def _upload_path(self, upload_id):
+        """Directory of an upload, or None for malformed/unknown/expired IDs (expired uploads are removed)"""
+        if not upload_id or not isinstance(upload_id, str) or len(upload_id) != 32:
+            return None
+        try:
+            int(upload_id, 16)
+        except ValueError:
+            return None
+        upload_path = os.path.join(self.upload_dir, upload_id)
+        try:
+            last_used = os.stat(upload_path).st_mtime
+        except FileNotFoundError:
+            return None
+        if time.time() - last_used > self.retention_seconds:
+            shutil.rmtree(upload_path, ignore_errors=True)
+            return None
+        return upload_path if os.path.isdir(upload_path) else None
+
+    def _touch(self, upload_path):
+        """Mark an upload as recently used for LRU eviction"""
+        try:
+            os.utime(upload_path)
+        except FileNotFoundError:
+            pass
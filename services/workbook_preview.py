@@ -0,0 +1,213 @@
+import posixpath
+import zipfile
+from xml.etree.ElementTree import iterparse, parse
+from openpyxl import load_workbook
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.xml.constants import ARC_ROOT_RELS, PKG_REL_NS, REL_NS, SHEET_MAIN_NS
+
+# Fast multi-sheet preview for uploaded workbooks.
+# Sizing a sheet through openpyxl scans the whole sheet XML when a writer left out the
+# <dimension> record. The preview instead reads each sheet's dimension record from the
+# top of its XML (zipfile + iterparse), takes only the first rows through openpyxl's
+# read-only worksheets, and falls back to a counted or estimated row total when the
+# record is missing or wrong. Only the documented package layout and openpyxl's public
+# API are used, so the preview does not depend on openpyxl internals.
+
+# Rows parsed per sheet to estimate the row count when there is no dimension record
+ESTIMATE_SAMPLE_ROWS = 1000
+
+# Sheets up to this size (uncompressed XML) are counted exactly instead of estimated
+EXACT_COUNT_MAX_BYTES = 20 * 1024 * 1024
+
+ROW_COUNT_DIMENSION = 'dimension'
+ROW_COUNT_SCAN = 'scan'
+ROW_COUNT_ESTIMATE = 'estimate'
+
+DIMENSION_TAG = f'{{{SHEET_MAIN_NS}}}dimension'
+DATA_TAG = f'{{{SHEET_MAIN_NS}}}sheetData'
+ROW_TAG = f'{{{SHEET_MAIN_NS}}}row'
+SHEET_TAG = f'{{{SHEET_MAIN_NS}}}sheet'
+RELATIONSHIP_TAG = f'{{{PKG_REL_NS}}}Relationship'
+OFFICE_DOCUMENT_TYPE = f'{REL_NS}/officeDocument'
+
+
+class _CountingReader:
+    """File wrapper that tracks how many (uncompressed) bytes the XML parser has consumed"""
+
+    def __init__(self, source):
+        self.source = source
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.source.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _relationship_targets(archive, rels_path):
+    """Relationship Id -> (type, package path of the target) from a .rels part"""
+    base = posixpath.dirname(posixpath.dirname(rels_path))
+    targets = {}
+    with archive.open(rels_path) as src:
+        for rel in parse(src).getroot().iter(RELATIONSHIP_TAG):
+            target = rel.get('Target', '')
+            if target.startswith('/'):
+                path = target.lstrip('/')
+            else:
+                path = posixpath.normpath(posixpath.join(base, target))
+            targets[rel.get('Id')] = (rel.get('Type', ''), path)
+    return targets
+
+
+def _worksheet_paths(archive):
+    """Sheet name -> package path of its XML, following the workbook relationships"""
+    workbook_path = next(
+        path for rel_type, path in _relationship_targets(archive, ARC_ROOT_RELS).values()
+        if rel_type == OFFICE_DOCUMENT_TYPE
+    )
+    workbook_dir, workbook_file = posixpath.split(workbook_path)
+    sheet_targets = _relationship_targets(archive, posixpath.join(workbook_dir, '_rels', f'{workbook_file}.rels'))
+
+    paths = {}
+    with archive.open(workbook_path) as src:
+        for sheet in parse(src).getroot().iter(SHEET_TAG):
+            rel_type, path = sheet_targets.get(sheet.get(f'{{{REL_NS}}}id'), ('', None))
+            if path and 'chartsheet' not in rel_type:
+                paths[sheet.get('name')] = path
+    return paths
+
+
+def _read_dimension(archive, sheet_path):
+    """Max row from the sheet's <dimension> record, reading only up to the start of the cell data"""
+    with archive.open(sheet_path) as src:
+        for _event, element in iterparse(src, events=('start',)):
+            if element.tag == DIMENSION_TAG:
+                try:
+                    return range_boundaries(element.get('ref'))[3]
+                except (TypeError, ValueError):
+                    return None
+            if element.tag == DATA_TAG:
+                return None
+    return None
+
+
+def _count_rows(archive, sheet_path):
+    """
+    Last row number of a sheet from its <row> records.
+
+    Returns:
+        last_row: Last row number seen
+        exact: False when the count was extrapolated from a sample of a large sheet
+    """
+    sheet_size = archive.getinfo(sheet_path).file_size
+    last_row = 0
+    rows_seen = 0
+    with archive.open(sheet_path) as src:
+        counting_src = _CountingReader(src)
+        for _event, element in iterparse(counting_src, events=('end',)):
+            if element.tag != ROW_TAG:
+                continue
+            row_number = element.get('r')
+            last_row = int(row_number) if row_number else last_row + 1
+            rows_seen += 1
+            element.clear()
+            if sheet_size > EXACT_COUNT_MAX_BYTES and rows_seen >= ESTIMATE_SAMPLE_ROWS:
+                # Scale the sampled rows by how much of the sheet XML they took up
+                bytes_per_row = counting_src.bytes_read / max(last_row, 1)
+                return int(sheet_size / bytes_per_row), False
+    return last_row, True
+
+
+def _strip_trailing_none(values):
+    """Row values without the empty cells after the last value"""
+    values = list(values)
+    while values and values[-1] is None:
+        values.pop()
+    return values
+
+
+def _preview_rows(ws, preview_rows):
+    """
+    Header row, first data rows and row numbers from a read-only worksheet.
+
+    Returns:
+        headers: Values of the first non-empty row
+        preview_data: Up to preview_rows rows after the header row
+        header_row: Row number of the header row
+        last_row: Row number of the last row read
+        exhausted: True when the whole sheet was read
+    """
+    # Ignore the stored dimension so rows are neither padded to it nor cut off by a wrong one
+    ws.reset_dimensions()
+    headers = None
+    header_row = 1
+    preview_data = []
+    last_row = 0
+    exhausted = True
+
+    rows = ws.iter_rows(values_only=True)
+    try:
+        for row_number, values in enumerate(rows, 1):
+            if headers is None:
+                if any(value is not None for value in values):
+                    headers = _strip_trailing_none(values)
+                    header_row = row_number
+                last_row = row_number
+                continue
+            if len(preview_data) >= preview_rows:
+                exhausted = False
+                break
+            preview_data.append(_strip_trailing_none(values))
+            last_row = row_number
+    finally:
+        rows.close()
+
+    return headers or [], preview_data, header_row, last_row, exhausted
+
+
+def _preview_sheet(archive, ws, sheet_path, preview_rows):
+    """Headers, first rows and row count of one worksheet"""
+    headers, preview_data, header_row, last_row, exhausted = _preview_rows(ws, preview_rows)
+
+    dimension_max_row = _read_dimension(archive, sheet_path)
+    if exhausted:
+        total_rows, row_count_source = last_row - header_row, ROW_COUNT_SCAN
+    elif dimension_max_row is not None and dimension_max_row > last_row:
+        total_rows, row_count_source = dimension_max_row - header_row, ROW_COUNT_DIMENSION
+    else:
+        counted_rows, exact = _count_rows(archive, sheet_path)
+        total_rows = counted_rows - header_row
+        row_count_source = ROW_COUNT_SCAN if exact else ROW_COUNT_ESTIMATE
+
+    return {
+        'name': ws.title,
+        'headers': headers,
+        'preview_data': preview_data,
+        'total_rows': max(total_rows, len(preview_data)),
+        'row_count_source': row_count_source
+    }
+
+
+def preview_workbook(source, preview_rows=10):
+    """
+    Preview every worksheet of an xlsx workbook without loading full sheets.
+
+    Args:
+        source: Path or file-like object of the workbook
+        preview_rows: Data rows returned per sheet (after the header row)
+
+    Returns:
+        List of dicts (name, headers, preview_data, total_rows, row_count_source) in workbook
+        order. row_count_source is 'dimension' (from the sheet's dimension record), 'scan'
+        (counted exactly) or 'estimate' (extrapolated from a sample of the sheet XML).
+    """
+    with zipfile.ZipFile(source) as archive:
+        sheet_paths = _worksheet_paths(archive)
+        wb = load_workbook(source, read_only=True, data_only=True)
+        try:
+            return [
+                _preview_sheet(archive, ws, sheet_paths[ws.title], preview_rows)
+                for ws in wb.worksheets
+            ]
+        finally:
+            wb.close()
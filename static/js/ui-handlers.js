@@ -5,6 +5,7 @@ let singleLeadResults = null;
 
 // Global variables for Excel upload functionality
 let excelFileData = null;
+let excelUploadId = null; // Server-side cached upload, so later steps don't re-send the file
 let excelPreviewData = null;
 let excelAnalysisResults = null;
 
@@ -159,6 +160,7 @@ function initializeEventHandlers() {
     // Excel upload event handlers
     document.getElementById('excelFile').addEventListener('change', handleExcelFileChange);
     document.getElementById('parseExcelBtn').addEventListener('click', handleParseExcel);
+    document.getElementById('sheetSelect').addEventListener('change', handleSheetChange);
     document.getElementById('validateLeadIdsBtn').addEventListener('click', handleValidateLeadIds);
     document.getElementById('analyzeExcelBtn').addEventListener('click', handleAnalyzeExcel);
     document.getElementById('exportExcelBtn').addEventListener('click', handleExportExcel);
@@ -503,6 +505,15 @@ async function downloadFile(response, defaultFilename) {
 
 // Excel Upload Handlers
 
+function appendExcelSource(formData) {
+    // Reference the cached upload when available; otherwise send the file itself
+    if (excelUploadId) {
+        formData.append('upload_id', excelUploadId);
+    } else {
+        formData.append('file', excelFileData);
+    }
+}
+
 function handleExcelFileChange(e) {
     const file = e.target.files[0];
     const parseBtn = document.getElementById('parseExcelBtn');
@@ -511,6 +522,7 @@ function handleExcelFileChange(e) {
     
     if (file) {
         excelFileData = file;
+        excelUploadId = null;
         parseBtn.disabled = false;
         configDiv.style.display = 'none';
         responseDiv.style.display = 'none';
@@ -525,6 +537,7 @@ function handleExcelFileChange(e) {
         excelAnalysisResults = null;
     } else {
         excelFileData = null;
+        excelUploadId = null;
         parseBtn.disabled = true;
         configDiv.style.display = 'none';
     }
@@ -561,8 +574,11 @@ async function handleParseExcel(e) {
         
         if (response.ok) {
             excelPreviewData = data.data;
+            excelUploadId = data.data.upload_id || null;
             populateExcelSelectors(data.data);
-            responseDiv.innerHTML = `✅ File parsed successfully! Found ${data.data.total_rows} rows in ${data.data.sheet_names.length} sheet(s).\n\nSelect the sheet and Lead ID column, then validate the Lead IDs.`;
+            const firstSheet = data.data.sheets && data.data.sheets[0];
+            const rowCount = (firstSheet && firstSheet.row_count_source === 'estimate' ? '~' : '') + data.data.total_rows;
+            responseDiv.innerHTML = `✅ File parsed successfully! Found ${rowCount} rows in ${data.data.sheet_names.length} sheet(s).\n\nSelect the sheet and Lead ID column, then validate the Lead IDs.`;
             responseDiv.className = 'response success';
             document.getElementById('excelConfig').style.display = 'block';
             document.getElementById('validateLeadIdsBtn').disabled = false;
@@ -583,7 +599,6 @@ async function handleParseExcel(e) {
 
 function populateExcelSelectors(data) {
     const sheetSelect = document.getElementById('sheetSelect');
-    const columnSelect = document.getElementById('leadIdColumn');
     
     // Populate sheet selector
     sheetSelect.innerHTML = '';
@@ -594,9 +609,14 @@ function populateExcelSelectors(data) {
         sheetSelect.appendChild(option);
     });
     
-    // Populate column selector
+    // Populate column selector from the first sheet
+    populateColumnSelector(data.headers);
+}
+
+function populateColumnSelector(headers) {
+    const columnSelect = document.getElementById('leadIdColumn');
     columnSelect.innerHTML = '<option value="">-- Select Lead ID Column --</option>';
-    data.headers.forEach(header => {
+    headers.forEach(header => {
         const option = document.createElement('option');
         option.value = header;
         option.textContent = header;
@@ -604,6 +624,17 @@ function populateExcelSelectors(data) {
     });
 }
 
+function handleSheetChange(e) {
+    // The parse step previews every sheet, so switching sheets doesn't need another request
+    if (!excelPreviewData || !excelPreviewData.sheets) {
+        return;
+    }
+    const sheet = excelPreviewData.sheets.find(s => s.name === e.target.value);
+    if (sheet) {
+        populateColumnSelector(sheet.headers);
+    }
+}
+
 async function handleValidateLeadIds(e) {
     e.preventDefault();
     
@@ -631,7 +662,7 @@ async function handleValidateLeadIds(e) {
     
     try {
         const formData = new FormData();
-        formData.append('file', excelFileData);
+        appendExcelSource(formData);
         formData.append('sheet_name', sheetName);
         formData.append('lead_id_column', leadIdColumn);
         
@@ -723,7 +754,7 @@ async function handleAnalyzeExcel(e) {
     
     try {
         const formData = new FormData();
-        formData.append('file', excelFileData);
+        appendExcelSource(formData);
         formData.append('sheet_name', sheetName);
         formData.append('lead_id_column', leadIdColumn);
         formData.append('max_analyze', '10000'); // Set high limit to analyze all
@@ -823,9 +854,9 @@ async function handleExportExcel(e) {
     button.textContent = 'Exporting...';
     
     try {
-        // Create FormData to re-send the file for export
+        // Create FormData referencing the uploaded file for export
         const formData = new FormData();
-        formData.append('file', excelFileData);
+        appendExcelSource(formData);
         formData.append('sheet_name', sheetName);
         formData.append('lead_id_column', leadIdColumn);
         formData.append('analysis_results', JSON.stringify(excelAnalysisResults.data));
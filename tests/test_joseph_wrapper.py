@@ -0,0 +1,58 @@
+import unittest
+
+from services.joseph_wrapper import JosephScoringWrapper
+
+# Salesforce lead (as returned by SalesforceService after normalization) whose lead and ZoomInfo
+# fields all agree
+CONSISTENT_LEAD = {
+    'Id': '00Q000000000001',
+    'FirstName': 'Jane',
+    'LastName': 'Smith',
+    'Email': 'jane@acme.com',
+    'Phone': '+1 415 555 0100',
+    'Website': 'https://www.acme.com',
+    'Company': 'Acme',
+    'State': 'CA',
+    'Country': 'United States',
+    'Industry': 'Software',
+    'ZI_Company_Name__c': 'Acme',
+    'ZI_Website__c': 'www.acme.com',
+    'ZI_Employees__c': 250,
+    'SegmentName': 'Mid Market',
+}
+
+
+class JosephCoherenceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.wrapper = JosephScoringWrapper()
+
+    def test_consistent_lead_scores_100(self):
+        coherence = self.wrapper.calculate_both_scores(CONSISTENT_LEAD)['coherence']
+        self.assertEqual(coherence['score'], 100.0, coherence['details'])
+
+    def test_company_compared_with_zi_company_name(self):
+        lead = dict(CONSISTENT_LEAD, ZI_Company_Name__c='Globex')
+        field_scores = self.wrapper.calculate_both_scores(lead)['coherence']['details']['field_scores']
+        self.assertLess(field_scores['company_vs_zi_company_similarity_score'], 100)
+
+    def test_enrichment_company_fields_scored_from_zi_company_name(self):
+        with_name = self.wrapper.calculate_both_scores(CONSISTENT_LEAD)['enrichment_completeness']
+        without_name = self.wrapper.calculate_both_scores(
+            dict(CONSISTENT_LEAD, ZI_Company_Name__c=None)
+        )['enrichment_completeness']
+        for field in ('account_name_zi_cdp_score', 'zi_company_name_score'):
+            self.assertEqual(with_name['details']['field_scores'][field], 100.0)
+            self.assertEqual(without_name['details']['field_scores'][field], 0.0)
+        self.assertLess(without_name['score'], with_name['score'])
+
+    def test_batch_matches_single_lead(self):
+        other = dict(CONSISTENT_LEAD, Id='00Q000000000002', Email='john@gmail.com', ZI_Company_Name__c=None)
+        batch = self.wrapper.calculate_batch_scores([CONSISTENT_LEAD, other])
+        for lead, scores in zip([CONSISTENT_LEAD, other], batch):
+            self.assertEqual(scores, self.wrapper.calculate_both_scores(lead))
+
+
+if __name__ == '__main__':
+    unittest.main()
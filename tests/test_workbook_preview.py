@@ -0,0 +1,76 @@
+import io
+import re
+import unittest
+import zipfile
+from unittest import mock
+
+from openpyxl import Workbook
+
+from services import workbook_preview
+from services.workbook_preview import preview_workbook
+
+LEAD_ROWS = 30
+
+
+def build_workbook(with_dimension=True):
+    """xlsx bytes with a Leads sheet (header + LEAD_ROWS rows) and an empty sheet"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Leads'
+    ws.append(['Lead ID', 'Name', None, 'Employees'])
+    for i in range(LEAD_ROWS):
+        ws.append([f'00Q00000000000{i:02d}', f'Lead {i}', None, i if i % 2 else None])
+    wb.create_sheet('Empty')
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    if with_dimension:
+        return buffer.getvalue()
+
+    # Drop the <dimension> records, as some writers do
+    stripped = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as src, zipfile.ZipFile(stripped, 'w') as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename.startswith('xl/worksheets/'):
+                data = re.sub(rb'<dimension[^>]*/>', b'', data)
+            dst.writestr(item, data)
+    return stripped.getvalue()
+
+
+class WorkbookPreviewTest(unittest.TestCase):
+
+    def test_preview_from_dimension_record(self):
+        leads, empty = preview_workbook(io.BytesIO(build_workbook()), preview_rows=3)
+        self.assertEqual(leads['name'], 'Leads')
+        self.assertEqual(leads['headers'], ['Lead ID', 'Name', None, 'Employees'])
+        self.assertEqual(leads['preview_data'], [
+            ['00Q0000000000000', 'Lead 0'],
+            ['00Q0000000000001', 'Lead 1', None, 1],
+            ['00Q0000000000002', 'Lead 2'],
+        ])
+        self.assertEqual(leads['total_rows'], LEAD_ROWS)
+        self.assertEqual(leads['row_count_source'], 'dimension')
+        self.assertEqual((empty['name'], empty['headers'], empty['total_rows']), ('Empty', [], 0))
+
+    def test_rows_counted_without_dimension_record(self):
+        leads = preview_workbook(io.BytesIO(build_workbook(with_dimension=False)), preview_rows=3)[0]
+        self.assertEqual(len(leads['preview_data']), 3)
+        self.assertEqual(leads['total_rows'], LEAD_ROWS)
+        self.assertEqual(leads['row_count_source'], 'scan')
+
+    def test_large_sheet_without_dimension_record_is_estimated(self):
+        with mock.patch.object(workbook_preview, 'EXACT_COUNT_MAX_BYTES', 0), \
+                mock.patch.object(workbook_preview, 'ESTIMATE_SAMPLE_ROWS', 10):
+            leads = preview_workbook(io.BytesIO(build_workbook(with_dimension=False)), preview_rows=3)[0]
+        self.assertEqual(leads['row_count_source'], 'estimate')
+        self.assertGreater(leads['total_rows'], 3)
+
+    def test_whole_sheet_within_preview(self):
+        leads = preview_workbook(io.BytesIO(build_workbook()), preview_rows=50)[0]
+        self.assertEqual(len(leads['preview_data']), LEAD_ROWS)
+        self.assertEqual(leads['total_rows'], LEAD_ROWS)
+        self.assertEqual(leads['row_count_source'], 'scan')
+
+
+if __name__ == '__main__':
+    unittest.main()